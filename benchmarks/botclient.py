@@ -0,0 +1,199 @@
+# Headless classic protocol client, used by the load test and scenario benchmarks.
+# Speaks enough of the protocol (plus a few CPE extensions) to log in, walk, chat, place blocks and switch worlds.
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+import asyncio
+import random
+import struct
+import time
+
+# Size (including packet id) of every server -> client packet of the classic protocol and the supported CPE extensions
+PACKET_SIZES = {
+    0x00: 131, 0x01: 1, 0x02: 1, 0x03: 1028, 0x04: 7, 0x06: 8, 0x07: 74, 0x08: 10,
+    0x09: 7, 0x0a: 5, 0x0b: 4, 0x0c: 2, 0x0d: 66, 0x0e: 65, 0x0f: 2,
+    0x10: 67, 0x11: 69, 0x12: 3, 0x14: 3, 0x15: 134, 0x1a: 86, 0x1b: 2, 0x1f: 2,
+    0x26: 1282, 0x27: 6, 0x28: 65, 0x29: 6, 0x2b: 4, 0x2c: 3, 0x2d: 3, 0x2e: 9, 0x2f: 16
+}
+# CPE extensions the bot asks for. Packets of other extensions are still read (and ignored) if the server sends them anyway
+CLIENT_EXTENSIONS = {"FastMap": 1, "BulkBlockUpdate": 1}
+# Level initialize is 4 bytes longer with FastMap, as it includes the map size
+FASTMAP_LEVEL_INITIALIZE_SIZE = 5
+
+
+def padString(string: str) -> bytes:
+    return string.encode("ascii", errors="replace").ljust(64)[:64]
+
+
+def unpadString(data: bytes) -> str:
+    return data.decode("ascii", errors="replace").rstrip()
+
+
+# Used to summarize bot stats (i.e. latencies)
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+@dataclass
+class BotStats:
+    connectTime: Optional[float] = None  # Seconds from connecting until the first packet from the server
+    firstChunkTime: Optional[float] = None  # Seconds from connecting until the first map chunk
+    spawnTime: Optional[float] = None  # Seconds from connecting until the bot was spawned in the world
+    chatLatencies: list[float] = field(default_factory=list)  # Seconds until each chat message was seen by the bot
+    worldSwitchTimes: list[float] = field(default_factory=list)  # Seconds from /join until the bot was spawned in the new world
+    bytesSent: int = 0
+    bytesReceived: int = 0
+    packetsReceived: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class BotClient:
+    def __init__(self, host: str, port: int, name: str, useCPE: bool = True):
+        self.host: str = host
+        self.port: int = port
+        self.name: str = name
+        self.useCPE: bool = useCPE
+        self.stats: BotStats = BotStats()
+        self.extensions: set[str] = set()  # Extensions both the bot and the server support
+        self.connected: bool = False
+        self.worldSize: tuple[int, int, int] = (0, 0, 0)
+        self.position: tuple[int, int, int] = (0, 0, 0)  # In fixed point units (32 per block)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._readTask: Optional[asyncio.Task] = None
+        self._startTime: float = 0
+        self._spawned: asyncio.Event = asyncio.Event()
+        self._pendingChat: dict[bytes, float] = {}  # Chat Token -> Time Sent
+        self._chatCount: int = 0
+
+    async def connect(self, timeout: float = 30):
+        # Connect and log in, returning once spawned in the world
+        self._startTime = time.perf_counter()
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        self.connected = True
+        self._send(struct.pack("!BB64s64sB", 0x00, 7, padString(self.name), padString(""), 0x42 if self.useCPE else 0x00))
+
+        # Handle CPE negotiation, if the server starts it before identifying itself
+        packetId, body = await asyncio.wait_for(self._readPacket(), timeout)
+        self.stats.connectTime = time.perf_counter() - self._startTime
+        while packetId not in (0x00, 0x10):
+            self._handlePacket(packetId, body)
+            packetId, body = await asyncio.wait_for(self._readPacket(), timeout)
+        if packetId == 0x10:
+            await asyncio.wait_for(self._negotiateCPE(body), timeout)
+
+        # Handle the rest of the packets in the background
+        self._readTask = asyncio.create_task(self._readLoop())
+        await asyncio.wait_for(self._spawned.wait(), timeout)
+
+    async def _negotiateCPE(self, extInfoBody: bytes):
+        _, extensionCount = struct.unpack("!64sh", extInfoBody)
+        serverExtensions = {}
+        while len(serverExtensions) < extensionCount:
+            # Other packets (i.e. chat from other players) can arrive in the middle of negotiation
+            packetId, body = await self._readPacket()
+            if packetId != 0x11:
+                self._handlePacket(packetId, body)
+                continue
+            extName, extVersion = struct.unpack("!64si", body)
+            serverExtensions[unpadString(extName)] = extVersion
+
+        # Reply with the extensions both sides support
+        self.extensions = {name for name, version in CLIENT_EXTENSIONS.items() if serverExtensions.get(name) == version}
+        self._send(struct.pack("!B64sh", 0x10, padString("ObsidianBot"), len(self.extensions)))
+        for extName in self.extensions:
+            self._send(struct.pack("!B64si", 0x11, padString(extName), CLIENT_EXTENSIONS[extName]))
+
+    async def _readPacket(self) -> tuple[int, bytes]:
+        assert self._reader is not None
+        packetId = (await self._reader.readexactly(1))[0]
+        if packetId not in PACKET_SIZES:
+            raise ConnectionError(f"Unknown Packet {packetId}")
+        size = FASTMAP_LEVEL_INITIALIZE_SIZE if packetId == 0x02 and "FastMap" in self.extensions else PACKET_SIZES[packetId]
+        body = await self._reader.readexactly(size - 1)
+        self.stats.bytesReceived += size
+        self.stats.packetsReceived += 1
+        return packetId, body
+
+    async def _readLoop(self):
+        try:
+            while self.connected:
+                packetId, body = await self._readPacket()
+                self._handlePacket(packetId, body)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            if self.connected:
+                self.stats.errors.append(f"Connection Lost - {type(e).__name__}")
+        finally:
+            self.connected = False
+
+    def _handlePacket(self, packetId: int, body: bytes):
+        now = time.perf_counter() - self._startTime
+        if packetId == 0x03 and self.stats.firstChunkTime is None:
+            self.stats.firstChunkTime = now
+        elif packetId == 0x04:
+            self.worldSize = struct.unpack("!hhh", body)
+        elif packetId == 0x07 and body[0] == 255:
+            # Spawned (player id 255 is the bot itself)
+            self.position = struct.unpack("!hhh", body[65:71])
+            if self.stats.spawnTime is None:
+                self.stats.spawnTime = now
+            self._spawned.set()
+        elif packetId == 0x0d and self._pendingChat:
+            for token, sentTime in list(self._pendingChat.items()):
+                if token in body:
+                    self.stats.chatLatencies.append(time.perf_counter() - sentTime)
+                    del self._pendingChat[token]
+        elif packetId == 0x0e:
+            self.stats.errors.append(f"Disconnected - {unpadString(body)}")
+            self.connected = False
+
+    def _send(self, data: bytes):
+        if self._writer is None or not self.connected:
+            return
+        self._writer.write(data)
+        self.stats.bytesSent += len(data)
+
+    def walk(self, maxStep: int = 32):
+        # Take a random step, staying inside the world
+        posX, posY, posZ = self.position
+        sizeX, _, sizeZ = self.worldSize
+        posX = min(max(posX + random.randint(-maxStep, maxStep), 0), max(0, sizeX * 32 - 1))
+        posZ = min(max(posZ + random.randint(-maxStep, maxStep), 0), max(0, sizeZ * 32 - 1))
+        self.position = (posX, posY, posZ)
+        self._send(struct.pack("!BBhhhBB", 0x08, 255, posX, posY, posZ, random.randint(0, 255), 0))
+
+    def chat(self, message: Optional[str] = None):
+        # Send a chat message. Messages without text carry a token, so the time until it is echoed back can be measured
+        if message is None:
+            self._chatCount += 1
+            token = f"{self.name}#{self._chatCount}"
+            self._pendingChat[token.encode("ascii")] = time.perf_counter()
+            message = token
+        self._send(struct.pack("!BB64s", 0x0d, 0xff, padString(message)))
+
+    def placeBlock(self, blockId: int = 1):
+        sizeX, sizeY, sizeZ = self.worldSize
+        if not sizeX or not sizeY or not sizeZ:
+            return
+        self._send(struct.pack("!BhhhBB", 0x05, random.randrange(sizeX), random.randrange(1, sizeY), random.randrange(sizeZ), 0x01, blockId))
+
+    async def switchWorld(self, worldName: str, timeout: float = 30):
+        self._spawned.clear()
+        startTime = time.perf_counter()
+        self.chat(f"/join {worldName}")
+        try:
+            await asyncio.wait_for(self._spawned.wait(), timeout)
+            self.stats.worldSwitchTimes.append(time.perf_counter() - startTime)
+        except asyncio.TimeoutError:
+            self.stats.errors.append(f"World Switch To {worldName} Timed Out")
+
+    async def close(self):
+        self.connected = False
+        if self._readTask is not None:
+            self._readTask.cancel()
+        if self._writer is not None:
+            self._writer.close()
@@ -0,0 +1,160 @@
+# Benchmark for connection throughput and chat round trip latency, under the default asyncio loop and uvloop
+# Usage: python -m benchmarks.connections [--loops asyncio uvloop] [--clients 50] [--messages 50]
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.botclient import PACKET_SIZES, padString
+
+
+# Run an obsidian server in this process. Used as a subprocess by the benchmark.
+def serve(loop: str, port: int):
+    # Set up event loop
+    if loop == "uvloop":
+        import uvloop  # pylint: disable=import-outside-toplevel
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    from obsidian.config import ServerConfig  # pylint: disable=import-outside-toplevel
+    from obsidian.server import Server  # pylint: disable=import-outside-toplevel
+    from obsidian.log import Logger  # pylint: disable=import-outside-toplevel
+
+    async def run():
+        Logger.SERVER_MODE = True
+        Logger.COLOR = False
+
+        # Use a throwaway config and world folder so the benchmark never touches the real server config or worlds
+        tempPath = Path(tempfile.mkdtemp(prefix="obsidian-bench-"))
+        config = ServerConfig("server.json", rootPath=tempPath, hideWarning=True)
+        config.moduleIgnoreList = ["classicubeapi"]
+        config.worldSaveLocation = str(Path(tempPath, "worlds"))
+        config.backupBeforeSave = False
+        config.worldSizeX, config.worldSizeY, config.worldSizeZ = 64, 64, 64
+        config.connectionRateLimit = -1
+        config.ipConnectionRateLimit = -1
+        config.maxHandshakingConnections = -1
+
+        server = Server("127.0.0.1", port, "Benchmark", "Benchmark", color=False, config=config)
+        await server.init()
+        await server.run()
+
+    asyncio.run(run())
+
+
+async def readPacket(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    packetId = (await reader.readexactly(1))[0]
+    return packetId, await reader.readexactly(PACKET_SIZES[packetId] - 1)
+
+
+# Log in as a player. Returns once the player has been spawned.
+async def login(port: int, name: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(struct.pack("!BB64s64sB", 0x00, 7, padString(name), padString(""), 0x00))
+    await writer.drain()
+    while True:
+        packetId, body = await readPacket(reader)
+        # Spawn player packet with id 255 (self)
+        if packetId == 0x07 and body[0] == 255:
+            return reader, writer
+
+
+# Send chat messages one after another, recording how long each takes to be echoed back
+async def chatLatency(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, name: str, messages: int) -> list[float]:
+    latencies = []
+    for messageCount in range(messages):
+        token = f"{name}#{messageCount}".encode("ascii")
+        writer.write(struct.pack("!BB64s", 0x0d, 0xff, padString(token.decode())))
+        start = time.perf_counter()
+        while True:
+            packetId, body = await readPacket(reader)
+            if packetId == 0x0d and token in body:
+                break
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def waitForPort(port: int, timeout: float = 60):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError("Server Did Not Start In Time")
+
+
+async def runClients(port: int, clients: int, messages: int) -> dict[str, float]:
+    await waitForPort(port)
+
+    # Connection throughput: log in all clients at once
+    start = time.perf_counter()
+    connections = await asyncio.gather(*[login(port, f"bench{i}") for i in range(clients)])
+    loginElapsed = time.perf_counter() - start
+
+    # Latency: every client chats at the same time. Every message is broadcast to all clients.
+    results = await asyncio.gather(*[
+        chatLatency(reader, writer, f"bench{i}", messages)
+        for i, (reader, writer) in enumerate(connections)
+    ])
+    latencies = sorted(latency for clientLatencies in results for latency in clientLatencies)
+
+    for _, writer in connections:
+        writer.close()
+
+    return {
+        "loginsPerSecond": clients / loginElapsed,
+        "latencyP50Ms": statistics.median(latencies) * 1000,
+        "latencyP99Ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    }
+
+
+def runBenchmark(loop: str, port: int, clients: int, messages: int) -> dict[str, float]:
+    # Start server in a separate process, so clients do not compete with it for the event loop
+    serverProcess = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.connections", "--serve", "--loop", loop, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        return asyncio.run(runClients(port, clients, messages))
+    finally:
+        serverProcess.kill()
+        serverProcess.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Connection Throughput And Latency Benchmark")
+    parser.add_argument("--loops", type=str, nargs="+", default=["asyncio", "uvloop"], help="Event loops to benchmark")
+    parser.add_argument("--clients", type=int, default=50, help="Number of clients")
+    parser.add_argument("--messages", type=int, default=50, help="Number of chat messages sent by each client")
+    parser.add_argument("--port", type=int, default=25599, help="Port to run the benchmark server on")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--loop", type=str, default="asyncio", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.loop, args.port)
+        sys.exit(0)
+
+    for loopName in args.loops:
+        # Skip uvloop if it is not installed
+        if loopName == "uvloop":
+            try:
+                import uvloop  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+            except ImportError:
+                print("uvloop | Skipped (Not Installed)")
+                continue
+
+        benchResults = runBenchmark(loopName, args.port, args.clients, args.messages)
+        print(
+            f"{loopName} | "
+            f"Logins: {benchResults['loginsPerSecond']:.1f}/s | "
+            f"Chat Latency p50: {benchResults['latencyP50Ms']:.2f}ms p99: {benchResults['latencyP99Ms']:.2f}ms"
+        )
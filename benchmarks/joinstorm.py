@@ -0,0 +1,197 @@
+# Scenario benchmark for many players joining the server, then switching worlds, at the same time.
+# Runs a server in this process (on the main thread) and drives the bots from a separate thread over loopback.
+# Reported memory includes the bots, as they run in the same process.
+# Usage: python -m benchmarks.joinstorm [--clients 100] [--world-size 128] [--no-cpe] [--output results.json]
+from pathlib import Path
+from typing import Optional
+import contextlib
+import statistics
+import argparse
+import tempfile
+import logging
+import asyncio
+import json
+import time
+import sys
+import os
+
+from benchmarks.botclient import BotClient, percentile
+from obsidian.config import ServerConfig
+from obsidian.server import Server
+from obsidian.mapgen import MapGenerators
+from obsidian.log import Logger
+
+# Name of the world bots switch to
+SWITCH_WORLD = "storm"
+
+
+# Returns the current resident memory of the process in bytes, or None if unknown
+def getResidentMemory() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def getPeakMemory() -> Optional[int]:
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": statistics.median(values) if values else 0.0,
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0)
+    }
+
+
+# Records how late the server event loop runs a periodic task, so lag can be looked up for each phase afterwards
+class LagSampler:
+    def __init__(self, interval: float):
+        self.interval: float = interval
+        self.samples: list[tuple[float, float]] = []  # (Timestamp, Lag)
+
+    async def run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            end = time.monotonic()
+            self.samples.append((end, max(0.0, end - start - self.interval)))
+
+    def peak(self, start: float, end: float) -> float:
+        return max((lag for timestamp, lag in self.samples if start <= timestamp <= end), default=0.0)
+
+
+# Runs on the bot thread. Returns the bots and the (start, end) time of each phase.
+async def runStorm(port: int, args: argparse.Namespace) -> tuple[list[BotClient], dict[str, tuple[float, float]]]:
+    bots = [BotClient("127.0.0.1", port, f"storm{i}", useCPE=not args.no_cpe) for i in range(args.clients)]
+    phases = {}
+
+    # Everyone joins at once
+    start = time.monotonic()
+    outcomes = await asyncio.gather(*(bot.connect(args.timeout) for bot in bots), return_exceptions=True)
+    phases["join"] = (start, time.monotonic())
+    for bot, outcome in zip(bots, outcomes):
+        if isinstance(outcome, BaseException):
+            bot.stats.errors.append(f"Login Failed - {type(outcome).__name__}")
+
+    # Let join messages settle before everyone switches worlds at once
+    await asyncio.sleep(args.settle)
+    connected = [bot for bot in bots if bot.connected]
+    start = time.monotonic()
+    await asyncio.gather(*(bot.switchWorld(SWITCH_WORLD, args.timeout) for bot in connected))
+    phases["switch"] = (start, time.monotonic())
+
+    await asyncio.sleep(args.settle)
+    await asyncio.gather(*(bot.close() for bot in bots))
+    return bots, phases
+
+
+async def runJoinStorm(args: argparse.Namespace) -> dict:
+    Logger.SERVER_MODE = True
+    Logger.COLOR = False
+
+    with tempfile.TemporaryDirectory(prefix="obsidian-bench-") as tempPath:
+        # Use a throwaway config and world folder so the benchmark never touches the real server config or worlds
+        config = ServerConfig("server.json", rootPath=Path(tempPath), hideWarning=True)
+        config.moduleIgnoreList = ["classicubeapi"]
+        config.worldSaveLocation = str(Path(tempPath, "worlds"))
+        config.backupBeforeSave = False
+        config.worldSizeX, config.worldSizeY, config.worldSizeZ = args.world_size, args.world_size, args.world_size
+        config.connectionRateLimit = -1
+        config.ipConnectionRateLimit = -1
+        config.maxHandshakingConnections = -1
+        config.enableCPE = not args.no_cpe
+        config.asyncLogging = False
+
+        # Boot server and create the world to switch to
+        server = Server("127.0.0.1", 0, "Benchmark", "Benchmark", color=False, config=config)
+        await server.init()
+        if not server.initialized:
+            raise RuntimeError("Benchmark Server Failed To Initialize")
+        server.worldManager.createWorld(SWITCH_WORLD, args.world_size, args.world_size, args.world_size, 0, MapGenerators.Flat)
+        serverTask = asyncio.create_task(server.run())
+        lagSampler = LagSampler(args.lag_interval)
+        lagTask = asyncio.create_task(lagSampler.run())
+        port = server.server.sockets[0].getsockname()[1]
+
+        # Run bots on their own thread and event loop, so they do not add lag to the server
+        memoryBefore = getResidentMemory()
+        bots, phases = await asyncio.to_thread(asyncio.run, runStorm(port, args))
+        memoryAfter = getResidentMemory()
+
+        lagTask.cancel()
+        server.server.close()
+        serverTask.cancel()
+
+    errors: dict[str, int] = {}
+    for bot in bots:
+        for error in bot.stats.errors:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "clients": args.clients,
+        "worldSize": args.world_size,
+        "cpe": not args.no_cpe,
+        "spawned": sum(1 for bot in bots if bot.stats.spawnTime is not None),
+        "joinSeconds": phases["join"][1] - phases["join"][0],
+        "switchSeconds": phases["switch"][1] - phases["switch"][0],
+        "timeToFirstChunk": summarize([bot.stats.firstChunkTime for bot in bots if bot.stats.firstChunkTime is not None]),
+        "timeToSpawn": summarize([bot.stats.spawnTime for bot in bots if bot.stats.spawnTime is not None]),
+        "worldSwitch": summarize([switchTime for bot in bots for switchTime in bot.stats.worldSwitchTimes]),
+        "joinPeakLag": lagSampler.peak(*phases["join"]),
+        "switchPeakLag": lagSampler.peak(*phases["switch"]),
+        "memoryBefore": memoryBefore,
+        "memoryAfter": memoryAfter,
+        "memoryPeak": max(filter(None, (getPeakMemory(), memoryAfter)), default=None),
+        "bytesReceived": sum(bot.stats.bytesReceived for bot in bots),
+        "errors": errors
+    }
+
+
+def printResults(results: dict):
+    def describe(summary: dict[str, float]) -> str:
+        return f"p50 {summary['p50'] * 1000:.1f}ms p99 {summary['p99'] * 1000:.1f}ms max {summary['max'] * 1000:.1f}ms"
+
+    def megabytes(size: Optional[int]) -> str:
+        return f"{size / 1048576:.1f}MB" if size is not None else "Unknown"
+
+    print(f"{results['spawned']}/{results['clients']} Spawned | World Size {results['worldSize']} | CPE {'On' if results['cpe'] else 'Off'}")
+    print(f"Join Storm | {results['joinSeconds']:.2f}s | Peak Loop Lag {results['joinPeakLag'] * 1000:.1f}ms")
+    print(f"Time To First Chunk | {describe(results['timeToFirstChunk'])}")
+    print(f"Time To Spawn | {describe(results['timeToSpawn'])}")
+    print(f"World Switch Storm | {results['switchSeconds']:.2f}s | Peak Loop Lag {results['switchPeakLag'] * 1000:.1f}ms")
+    print(f"World Switch ({results['worldSwitch']['count']} Switches) | {describe(results['worldSwitch'])}")
+    print(f"Memory | Before: {megabytes(results['memoryBefore'])} | After: {megabytes(results['memoryAfter'])} | Peak: {megabytes(results['memoryPeak'])}")
+    print(f"Received | {results['bytesReceived'] / 1048576:.1f}MB")
+    for error, count in sorted(results["errors"].items(), key=lambda item: item[1], reverse=True):
+        print(f"Error | {count}x {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Join Storm And World Switch Benchmark")
+    parser.add_argument("--clients", type=int, default=100, help="Number of players joining at once")
+    parser.add_argument("--world-size", type=int, default=128, help="Size of both worlds")
+    parser.add_argument("--no-cpe", action="store_true", help="Disable CPE on the server and bots")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds each bot has to join or switch worlds")
+    parser.add_argument("--settle", type=float, default=1, help="Seconds to wait between phases")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Seconds between loop lag measurements")
+    parser.add_argument("--output", type=str, default=None, help="Save results as JSON to this file")
+    args = parser.parse_args()
+
+    # Hide server logs, so they do not mix with the results. Bots disconnecting at the end also makes asyncio warn about failed sends
+    logging.getLogger("asyncio").setLevel(logging.ERROR)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        stormResults = asyncio.run(runJoinStorm(args))
+    printResults(stormResults)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as outputFile:
+            json.dump(stormResults, outputFile, indent=4)
+        print(f"Saved Results To {args.output}")
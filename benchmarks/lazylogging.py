@@ -0,0 +1,49 @@
+# Benchmark for the cost of disabled debug / verbose log calls, eager vs lazy vs guarded
+# Usage: python -m benchmarks.lazylogging [--iterations 200000]
+import argparse
+import os
+import timeit
+
+from obsidian.log import Logger
+
+
+def runLogging(iterations: int, payloadSize: int) -> dict[str, float]:
+    # Log levels are off, like on a production server
+    Logger.DEBUG = False
+    Logger.VERBOSE = False
+
+    # Values similar to what sendPacket logs for every packet
+    connectionInfo = ("127.0.0.1", 51234)
+    packetId, packetName = 0x03, "LevelDataChunk"
+    rawData = os.urandom(payloadSize)
+
+    def eager():
+        Logger.verbose(f"SERVER -> CLIENT | CLIENT: {connectionInfo} | ID: {packetId} {packetName} | SIZE: {payloadSize} | DATA: {rawData}", module="network")
+
+    def lazy():
+        Logger.verbose(lambda: f"SERVER -> CLIENT | CLIENT: {connectionInfo} | ID: {packetId} {packetName} | SIZE: {payloadSize} | DATA: {rawData}", module="network")
+
+    def guarded():
+        if Logger.VERBOSE:
+            Logger.verbose(f"SERVER -> CLIENT | CLIENT: {connectionInfo} | ID: {packetId} {packetName} | SIZE: {payloadSize} | DATA: {rawData}", module="network")
+
+    return {
+        name: timeit.timeit(function, number=iterations) / iterations * 1e9
+        for name, function in (("eager", eager), ("lazy", lazy), ("guarded", guarded))
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Disabled Log Call Overhead Benchmark")
+    parser.add_argument("--iterations", type=int, default=200000, help="Number of log calls per variant")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 66, 1028], help="Sizes of the logged byte payload")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        results = runLogging(args.iterations, size)
+        print(
+            f"{size} Byte Payload | "
+            f"Eager: {results['eager']:.0f}ns | "
+            f"Lazy: {results['lazy']:.0f}ns ({results['eager'] / results['lazy']:.1f}x) | "
+            f"Guarded: {results['guarded']:.0f}ns ({results['eager'] / results['guarded']:.1f}x)"
+        )
@@ -0,0 +1,173 @@
+# Load test harness. Connects many simulated players to a local server, which join, walk, chat, place blocks and switch worlds.
+# Usage: python -m benchmarks.loadtest --port 25565 [--clients 100] [--duration 60] [--worlds default other] [--metrics-port 9100]
+# All clients come from the same ip, so set ipConnectionRateLimit to -1 in the server config before running.
+import argparse
+import asyncio
+import ipaddress
+import random
+import re
+import statistics
+import time
+import urllib.request
+from typing import Optional
+
+from benchmarks.botclient import BotClient, percentile
+
+# Server side histograms and counters shown in the report, when metrics are available
+SERVER_METRICS = {
+    "obsidian_map_send_seconds": "Map Send",
+    "obsidian_command_seconds": "Command",
+    "obsidian_loop_lag_seconds": "Loop Lag",
+    "obsidian_world_save_seconds": "World Save"
+}
+
+
+def isLoopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def scrapeMetrics(port: int) -> dict[str, float]:
+    # Read metrics from the server, returning {name{labels}: value}
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=10) as response:
+        text = response.read().decode("utf-8")
+    samples = {}
+    for line in text.splitlines():
+        match = re.match(r"^([a-zA-Z_:][a-zA-Z0-9_:]*(?:\{.*\})?) (\S+)$", line)
+        if match:
+            samples[match.group(1)] = float(match.group(2))
+    return samples
+
+
+# Run one simulated player for the duration of the test
+async def runBot(bot: BotClient, args: argparse.Namespace, endTime: float):
+    try:
+        await bot.connect()
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        bot.stats.errors.append(f"Login Failed - {type(e).__name__}")
+        await bot.close()
+        return
+
+    # Every action is randomly scheduled at its own rate
+    actions = [(rate, action) for rate, action in (
+        (args.move_rate, "move"),
+        (args.chat_rate, "chat"),
+        (args.block_rate, "block"),
+        (args.switch_rate if len(args.worlds) > 1 else 0, "switch")
+    ) if rate > 0]
+    nextAction = {action: time.monotonic() + random.expovariate(rate) for rate, action in actions}
+
+    while bot.connected and time.monotonic() < endTime and actions:
+        action = min(nextAction, key=nextAction.__getitem__)
+        await asyncio.sleep(max(0.0, nextAction[action] - time.monotonic()))
+        if not bot.connected or time.monotonic() >= endTime:
+            break
+
+        if action == "move":
+            bot.walk()
+        elif action == "chat":
+            bot.chat()
+        elif action == "block":
+            bot.placeBlock()
+        elif action == "switch":
+            await bot.switchWorld(random.choice(args.worlds))
+
+        rate = next(rate for rate, name in actions if name == action)
+        nextAction[action] = time.monotonic() + random.expovariate(rate)
+
+    # Give the last chat messages a chance to come back
+    await asyncio.sleep(min(1.0, max(0.0, endTime - time.monotonic())))
+    await bot.close()
+
+
+async def runLoadTest(args: argparse.Namespace) -> dict:
+    metricsBefore: Optional[dict[str, float]] = scrapeMetrics(args.metrics_port) if args.metrics_port else None
+
+    # Connect clients at the requested rate
+    bots = [BotClient(args.host, args.port, f"bot{i}", useCPE=not args.no_cpe) for i in range(args.clients)]
+    startTime = time.monotonic()
+    endTime = startTime + args.duration
+    tasks = []
+    for bot in bots:
+        tasks.append(asyncio.create_task(runBot(bot, args, endTime)))
+        if args.ramp > 0:
+            await asyncio.sleep(1 / args.ramp)
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - startTime
+
+    metricsAfter: Optional[dict[str, float]] = scrapeMetrics(args.metrics_port) if args.metrics_port else None
+
+    # Collect client side results
+    results = {
+        "clients": len(bots),
+        "loggedIn": sum(1 for bot in bots if bot.stats.spawnTime is not None),
+        "elapsed": elapsed,
+        "firstChunk": [bot.stats.firstChunkTime for bot in bots if bot.stats.firstChunkTime is not None],
+        "spawn": [bot.stats.spawnTime for bot in bots if bot.stats.spawnTime is not None],
+        "chat": [latency for bot in bots for latency in bot.stats.chatLatencies],
+        "worldSwitch": [switchTime for bot in bots for switchTime in bot.stats.worldSwitchTimes],
+        "bytesSent": sum(bot.stats.bytesSent for bot in bots),
+        "bytesReceived": sum(bot.stats.bytesReceived for bot in bots),
+        "errors": {},
+        "server": {}
+    }
+    for bot in bots:
+        for error in bot.stats.errors:
+            results["errors"][error] = results["errors"].get(error, 0) + 1
+
+    # Collect server side results (average over the test)
+    if metricsBefore is not None and metricsAfter is not None:
+        for metricName, label in SERVER_METRICS.items():
+            count = metricsAfter.get(f"{metricName}_count", 0) - metricsBefore.get(f"{metricName}_count", 0)
+            total = metricsAfter.get(f"{metricName}_sum", 0) - metricsBefore.get(f"{metricName}_sum", 0)
+            if count > 0:
+                results["server"][label] = (count, total / count)
+    return results
+
+
+def printResults(results: dict):
+    def describe(values: list[float]) -> str:
+        if not values:
+            return "n/a"
+        return f"p50 {statistics.median(values) * 1000:.1f}ms p99 {percentile(values, 99) * 1000:.1f}ms max {max(values) * 1000:.1f}ms"
+
+    print(f"Clients: {results['loggedIn']}/{results['clients']} Logged In | Elapsed: {results['elapsed']:.1f}s")
+    print(f"Time To First Chunk | {describe(results['firstChunk'])}")
+    print(f"Time To Spawn | {describe(results['spawn'])}")
+    print(f"Chat Latency ({len(results['chat'])} Messages) | {describe(results['chat'])}")
+    print(f"World Switch ({len(results['worldSwitch'])} Switches) | {describe(results['worldSwitch'])}")
+    print(f"Traffic | Sent: {results['bytesSent'] / 1024:.1f}KB | Received: {results['bytesReceived'] / 1024:.1f}KB")
+    for label, (count, average) in results["server"].items():
+        print(f"Server {label} | {count:.0f} Samples | Average {average * 1000:.2f}ms")
+    if results["errors"]:
+        for error, count in sorted(results["errors"].items(), key=lambda item: item[1], reverse=True):
+            print(f"Error | {count}x {error}")
+    else:
+        print("Errors | None")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated Player Load Test")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Server address (loopback only)")
+    parser.add_argument("--port", type=int, default=25565, help="Server port")
+    parser.add_argument("--clients", type=int, default=100, help="Number of simulated players")
+    parser.add_argument("--ramp", type=float, default=20, help="New connections per second. 0 to connect all at once")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run the test for")
+    parser.add_argument("--move-rate", type=float, default=5, help="Movement updates per second, per player")
+    parser.add_argument("--chat-rate", type=float, default=0.2, help="Chat messages per second, per player")
+    parser.add_argument("--block-rate", type=float, default=0.5, help="Block placements per second, per player")
+    parser.add_argument("--switch-rate", type=float, default=0.02, help="World switches per second, per player")
+    parser.add_argument("--worlds", type=str, nargs="+", default=[], help="Worlds to switch between. Needs at least 2 worlds")
+    parser.add_argument("--no-cpe", action="store_true", help="Do not negotiate CPE extensions")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Port the server serves metrics on, for server side latencies")
+    args = parser.parse_args()
+
+    # Never point the load generator at someone else's server
+    if not isLoopback(args.host):
+        parser.error("Load tests can only be run against a server on this machine (loopback address)")
+
+    printResults(asyncio.run(runLoadTest(args)))
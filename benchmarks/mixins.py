@@ -0,0 +1,105 @@
+# Benchmark for the per call overhead of mixins, before and after mixin chains are compiled into one function.
+# Each depth builds a class whose methods get that many mixins (before injections, after injections and overrides passing _super).
+# Usage: python -m benchmarks.mixins [--depths 1 4 8 16] [--number 100000] [--repeat 5]
+import argparse
+import asyncio
+import sys
+
+from obsidian.mixins import Override, Inject, InjectionPoint, MixinRegistry
+from obsidian.log import Logger
+from benchmarks.suite import timeSync, timeAsync
+
+
+# Creates a class with one sync and one async method, and registers it in this module so mixins can find it
+def createTarget(name: str) -> type:
+    def run(self, value):
+        return value + 1
+
+    async def arun(self, value):
+        return value + 1
+
+    for method in (run, arun):
+        method.__qualname__ = f"{name}.{method.__name__}"
+        method.__module__ = __name__
+    target = type(name, (), {"run": run, "arun": arun, "__module__": __name__})
+    setattr(sys.modules[__name__], name, target)
+    return target
+
+
+# Applies depth mixins to each method, cycling through the common kinds
+def applyMixins(target: type, depth: int):
+    for layerNum in range(depth):
+        kind = layerNum % 3
+        if kind == 0:
+            @Inject(target=target.run, at=InjectionPoint.BEFORE)
+            def beforeRun(self, value):
+                pass
+
+            @Inject(target=target.arun, at=InjectionPoint.BEFORE)
+            async def beforeArun(self, value):
+                pass
+        elif kind == 1:
+            @Inject(target=target.run, passResult=True)
+            def afterRun(self, value, *, _output):
+                return _output
+
+            @Inject(target=target.arun, passResult=True)
+            async def afterArun(self, value, *, _output):
+                return _output
+        else:
+            @Override(target=target.run, passSuper=True)
+            def overrideRun(self, value, *, _super):
+                return _super(self, value)
+
+            @Override(target=target.arun, passSuper=True)
+            async def overrideArun(self, value, *, _super):
+                return await _super(self, value)
+
+
+async def runMixinBenchmark(args: argparse.Namespace) -> dict[int, dict[str, float]]:
+    results = {}
+    targets = {}
+
+    # Time every depth with nested wrappers first, as compiling affects every chain at once
+    for depth in args.depths:
+        target = targets[depth] = createTarget(f"MixinTarget{depth}")
+        instance = target()
+        results[depth] = {
+            "syncBaseline": timeSync(lambda: instance.run(1), args.number, args.repeat),
+            "asyncBaseline": await timeAsync(lambda: instance.arun(1), args.number, args.repeat)
+        }
+        applyMixins(target, depth)
+        results[depth]["syncNested"] = timeSync(lambda: instance.run(1), args.number, args.repeat)
+        results[depth]["asyncNested"] = await timeAsync(lambda: instance.arun(1), args.number, args.repeat)
+
+    MixinRegistry.compileChains()
+    if args.show_chains:
+        print(MixinRegistry.describe())
+
+    for depth in args.depths:
+        instance = targets[depth]()
+        results[depth]["syncCompiled"] = timeSync(lambda: instance.run(1), args.number, args.repeat)
+        results[depth]["asyncCompiled"] = await timeAsync(lambda: instance.arun(1), args.number, args.repeat)
+    return results
+
+
+def printResults(results: dict[int, dict[str, float]]):
+    for depth, timings in results.items():
+        for mode in ("sync", "async"):
+            baseline, nested, compiled = timings[f"{mode}Baseline"], timings[f"{mode}Nested"], timings[f"{mode}Compiled"]
+            print(
+                f"{depth} Mixins ({mode.title()}) | Baseline {baseline:.3f}us | Nested {nested:.3f}us | Compiled {compiled:.3f}us | "
+                f"Overhead {nested - baseline:.3f}us -> {compiled - baseline:.3f}us | Speedup {nested / compiled:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixin Call Overhead Benchmark")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 4, 8, 16], help="Number of mixins applied to each method")
+    parser.add_argument("--number", type=int, default=100000, help="Calls per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per timing. The fastest is kept")
+    parser.add_argument("--show-chains", action="store_true", help="Print every mixin chain after compiling")
+    args = parser.parse_args()
+
+    Logger.SERVER_MODE = True
+    printResults(asyncio.run(runMixinBenchmark(args)))
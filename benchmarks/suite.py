@@ -0,0 +1,368 @@
+# Micro benchmark suite for packet, world, command and chat hot paths.
+# Results can be saved as JSON, and compared against a previous run to catch regressions.
+# Usage: python -m benchmarks.suite [--groups packets compression formats blocks commands chat] [--output results.json]
+#        python -m benchmarks.suite --compare baseline.json [--threshold 0.1]
+from pathlib import Path
+from typing import Any, Awaitable, Callable, cast, get_origin, get_type_hints
+import contextlib
+import subprocess
+import argparse
+import datetime
+import platform
+import tempfile
+import asyncio
+import inspect
+import struct
+import random
+import timeit
+import json
+import enum
+import time
+import sys
+import io
+import re
+
+from obsidian.config import ServerConfig
+from obsidian.server import Server
+from obsidian.world import World
+from obsidian.player import Player
+from obsidian.network import NetworkHandler
+from obsidian.blocks import AbstractBlock, Blocks
+from obsidian.packet import Packets, AbstractRequestPacket, AbstractResponsePacket
+from obsidian.worldformat import WorldFormats
+from obsidian.mapgen import MapGenerators
+from obsidian.commands import Commands, _parseArgs
+from obsidian.module import Modules
+from obsidian.log import Logger
+
+# Benchmark groups, in the order they run. Name -> Function(server, args) -> ({Benchmark Name: Microseconds}, {Benchmark Name: Skip Reason})
+BENCHMARK_GROUPS: dict[str, Callable[[Server, argparse.Namespace], Awaitable[tuple[dict[str, float], dict[str, str]]]]] = {}
+# Arguments used for packets where a sample value cannot be made from the type annotation alone
+SAMPLE_ARGUMENTS: dict[str, tuple] = {
+    "LevelDataChunk": (bytearray(1024), 50),
+    "SetTextColor": (255, 255, 255, 255, "a")
+}
+# Commands (activator, arguments) used to benchmark argument parsing. Covers positional, keyword only and custom converted arguments.
+SAMPLE_COMMANDS: list[tuple[str, list[str]]] = [
+    ("tp", ["10", "20", "30", "64", "0"]),
+    ("ban", ["Someone", "Being", "Rude", "In", "Chat"]),
+    ("list", ["{world}"]),
+    ("help", ["2"])
+]
+
+
+def benchmarkGroup(name: str):
+    def internal(function):
+        BENCHMARK_GROUPS[name] = function
+        return function
+    return internal
+
+
+# Returns the fastest time per call in microseconds
+def timeSync(function: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+async def timeAsync(function: Callable[[], Awaitable[Any]], number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def scaled(args: argparse.Namespace, number: int) -> int:
+    return max(1, int(number * args.scale))
+
+
+# Start a server on a random port, with a throwaway config and world folder
+async def startServer(tempPath: Path) -> Server:
+    Logger.SERVER_MODE = True
+    Logger.COLOR = False
+
+    config = ServerConfig("server.json", rootPath=tempPath, hideWarning=True)
+    config.moduleIgnoreList = ["classicubeapi"]
+    config.worldSaveLocation = str(Path(tempPath, "worlds"))
+    config.backupBeforeSave = False
+    config.worldSizeX, config.worldSizeY, config.worldSizeZ = 64, 64, 64
+    config.asyncLogging = False
+
+    server = Server("127.0.0.1", 0, "Benchmark", "Benchmark", color=False, config=config)
+    initLog = io.StringIO()
+    with contextlib.redirect_stdout(initLog):
+        await server.init()
+    if not server.initialized:
+        print(initLog.getvalue())
+        raise RuntimeError("Benchmark Server Failed To Initialize")
+    return server
+
+
+# Creates a flat world with a few random blocks scattered around, so compression has some work to do
+def createWorld(server: Server, name: str, size: int) -> World:
+    mapArray = server.worldManager.generateMap(size, size, size, 0, MapGenerators.Flat)
+    rng = random.Random(0)
+    blockIds = Blocks.getAllBlockIds()
+    for _ in range(len(mapArray) // 50):
+        mapArray[rng.randrange(len(mapArray))] = rng.choice(blockIds)
+    return World(server.worldManager, name, size, size, size, mapArray, seed=0, generator=MapGenerators.Flat, persistent=False)
+
+
+# Creates a player that is not connected. Good enough for code paths that do not send anything.
+def createPlayer(server: Server) -> Player:
+    return Player(server.playerManager, cast(NetworkHandler, None), server, "Benchmark", "Benchmark", "Benchmark", "", False)
+
+
+# Makes a sample value for a packet argument from its type annotation
+def sampleValue(annotation: Any) -> Any:
+    if annotation is bool:
+        return False
+    if annotation is int or annotation is Any:
+        return 1
+    if annotation is float:
+        return 1.0
+    if annotation is str:
+        return "Benchmark Message"
+    if annotation in (bytes, bytearray):
+        return bytearray(1024)
+    if get_origin(annotation) is list:
+        return [1] * 256
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return next(iter(annotation))
+    if isinstance(annotation, type) and issubclass(annotation, AbstractBlock):
+        return Blocks.getBlockById(1)
+    raise TypeError(f"No Sample Value For {annotation}")
+
+
+def sampleArguments(packet: AbstractResponsePacket) -> tuple:
+    if packet.NAME in SAMPLE_ARGUMENTS:
+        return SAMPLE_ARGUMENTS[packet.NAME]
+    typeHints = get_type_hints(packet.serialize)
+    return tuple(
+        sampleValue(typeHints.get(name, Any))
+        for name, param in inspect.signature(packet.serialize).parameters.items()
+        if param.default is inspect.Parameter.empty
+    )
+
+
+# Makes raw packet data from a struct format, with strings filled in and numbers set to 1
+def sampleData(packet: AbstractRequestPacket) -> bytearray:
+    values: list[Any] = [packet.ID]
+    for count, code in re.findall(r"(\d*)([a-zA-Z?])", packet.FORMAT)[1:]:
+        if code in "sp":
+            values.append(b"Benchmark".ljust(int(count or 1))[:int(count or 1)])
+        elif code == "?":
+            values.extend([True] * int(count or 1))
+        elif code != "x":
+            values.extend([1] * int(count or 1))
+    return bytearray(struct.pack(packet.FORMAT, *values))
+
+
+@benchmarkGroup("packets")
+async def benchmarkPackets(server: Server, args: argparse.Namespace):
+    results, skipped = {}, {}
+    number = scaled(args, 2000)
+    # Packets are deserialized without handling the update, so a disconnected player is enough
+    ctx = createPlayer(server)
+
+    for packet in Packets.Response._packetDict.values():
+        try:
+            arguments = sampleArguments(packet)
+            await packet.serialize(*arguments)
+            results[f"packets.serialize.{packet.NAME}"] = await timeAsync(lambda: packet.serialize(*arguments), number, args.repeat)
+        except Exception as e:
+            skipped[f"packets.serialize.{packet.NAME}"] = f"{type(e).__name__}: {e}"
+
+    for packet in Packets.Request._packetDict.values():
+        try:
+            rawData = sampleData(packet)
+            kwargs = {"handleUpdate": False} if "handleUpdate" in inspect.signature(packet.deserialize).parameters else {}
+            await packet.deserialize(ctx, rawData, **kwargs)
+            results[f"packets.deserialize.{packet.NAME}"] = await timeAsync(lambda: packet.deserialize(ctx, rawData, **kwargs), number, args.repeat)
+        except Exception as e:
+            skipped[f"packets.deserialize.{packet.NAME}"] = f"{type(e).__name__}: {e}"
+
+    return results, skipped
+
+
+@benchmarkGroup("compression")
+async def benchmarkCompression(server: Server, args: argparse.Namespace):
+    results, skipped = {}, {}
+    fastMap = Modules.FastMap if "fastmap" in Modules else None
+    for size in args.world_sizes:
+        world = createWorld(server, "benchmark", size)
+        number = scaled(args, max(1, 2_000_000 // len(world.mapArray)))
+        results[f"compression.gzipMap.{size}"] = timeSync(lambda: world.gzipMap(includeSizeHeader=True), number, args.repeat)
+        if fastMap is not None:
+            compressionLevel = fastMap.config.deflateCompressionLevel
+            results[f"compression.deflateMap.{size}"] = timeSync(lambda: type(fastMap).deflateMap(None, world, compressionLevel=compressionLevel), number, args.repeat)
+        else:
+            skipped[f"compression.deflateMap.{size}"] = "FastMap Module Not Loaded"
+    return results, skipped
+
+
+@benchmarkGroup("formats")
+async def benchmarkFormats(server: Server, args: argparse.Namespace):
+    results, skipped = {}, {}
+    world = createWorld(server, "benchmark", args.format_size)
+    number = scaled(args, max(1, 500_000 // len(world.mapArray)))
+    formatPath = Path(server.config.worldSaveLocation or tempfile.gettempdir(), "formats")
+    formatPath.mkdir(parents=True, exist_ok=True)
+
+    for worldFormat in WorldFormats._formatDict.values():
+        # Name the file after the world, as some formats check that they match
+        with open(Path(formatPath, f"{world.name}.{worldFormat.EXTENSIONS[0]}"), "w+b") as fileIO:
+            def saveWorld():
+                fileIO.seek(0)
+                fileIO.truncate()
+                worldFormat.saveWorld(world, fileIO, server.worldManager)
+                fileIO.flush()
+
+            try:
+                saveWorld()
+                results[f"formats.saveWorld.{worldFormat.NAME}"] = timeSync(saveWorld, number, args.repeat)
+                results[f"formats.loadWorld.{worldFormat.NAME}"] = timeSync(
+                    lambda: worldFormat.loadWorld(fileIO, server.worldManager, persistent=False),
+                    number,
+                    args.repeat
+                )
+            except Exception as e:
+                skipped[f"formats.{worldFormat.NAME}"] = f"{type(e).__name__}: {e}"
+    return results, skipped
+
+
+@benchmarkGroup("blocks")
+async def benchmarkBlocks(server: Server, args: argparse.Namespace):
+    results = {}
+    world = createWorld(server, "benchmark", 64)
+    rng = random.Random(0)
+    blockIds = Blocks.getAllBlockIds()
+    for updateCount in (100, 1000, 10000):
+        blockUpdates = {
+            (rng.randrange(world.sizeX), rng.randrange(world.sizeY), rng.randrange(world.sizeZ)): Blocks.getBlockById(rng.choice(blockIds))
+            for _ in range(updateCount)
+        }
+        number = scaled(args, max(1, 100_000 // updateCount))
+        # Only updating the map, and also sending updates to a world without players
+        results[f"blocks.bulkBlockUpdate.{updateCount}.mapOnly"] = await timeAsync(lambda: world.bulkBlockUpdate(blockUpdates, sendPacket=False), number, args.repeat)
+        results[f"blocks.bulkBlockUpdate.{updateCount}.noPlayers"] = await timeAsync(lambda: world.bulkBlockUpdate(blockUpdates), number, args.repeat)
+    return results, {}
+
+
+@benchmarkGroup("commands")
+async def benchmarkCommands(server: Server, args: argparse.Namespace):
+    results, skipped = {}, {}
+    number = scaled(args, 5000)
+    worldName = next(iter(server.worldManager.worlds))
+    for activator, arguments in SAMPLE_COMMANDS:
+        arguments = [argument.format(world=worldName) for argument in arguments]
+        try:
+            command = Commands.getCommandFromActivator(activator)
+            _parseArgs(server, command, arguments)
+            results[f"commands.parseArgs.{activator}"] = timeSync(lambda: _parseArgs(server, command, arguments), number, args.repeat)
+        except Exception as e:
+            skipped[f"commands.parseArgs.{activator}"] = f"{type(e).__name__}: {e}"
+    return results, skipped
+
+
+@benchmarkGroup("chat")
+async def benchmarkChat(server: Server, args: argparse.Namespace):
+    results, skipped = {}, {}
+    number = scaled(args, 5000)
+    player = createPlayer(server)
+
+    messages = {
+        "plain": "Hello there everyone, how is it going today? Building anything cool?",
+        "colors": "%aHello %bthere %ceveryone%%, how is it going \\%dtoday?"
+    }
+    if "textmacros" in Modules:
+        textMacros = Modules.TextMacros
+        macroNames = list(textMacros.textMacros)[:3]
+        start, end = textMacros.config.macroStartChar, textMacros.config.macroEndChar
+        messages["macros"] = "Hello " + " and ".join(f"{start}{name}{end}" for name in macroNames) + " everyone!"
+    else:
+        skipped["chat.parsePlayerMessage.macros"] = "TextMacros Module Not Loaded"
+
+    for messageType, message in messages.items():
+        results[f"chat.parsePlayerMessage.{messageType}"] = timeSync(lambda: player.parsePlayerMessage(message), number, args.repeat)
+    return results, skipped
+
+
+def getCommit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def runSuite(args: argparse.Namespace) -> dict:
+    results: dict[str, float] = {}
+    skipped: dict[str, str] = {}
+    with tempfile.TemporaryDirectory(prefix="obsidian-bench-") as tempPath:
+        server = await startServer(Path(tempPath))
+        try:
+            for groupName in args.groups:
+                # Hide log messages (i.e. warnings from the raw world format), so they do not mix with the results
+                with contextlib.redirect_stdout(io.StringIO()):
+                    groupResults, groupSkipped = await BENCHMARK_GROUPS[groupName](server, args)
+                for name, microseconds in groupResults.items():
+                    print(f"{name} | {microseconds:.2f}us")
+                for name, reason in groupSkipped.items():
+                    print(f"{name} | Skipped ({reason})")
+                results.update(groupResults)
+                skipped.update(groupSkipped)
+        finally:
+            server.server.close()
+
+    return {
+        "commit": getCommit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "unit": "microseconds",
+        "results": results,
+        "skipped": skipped
+    }
+
+
+# Compares results against a baseline, returning names of benchmarks that got slower by more than the threshold
+def compareResults(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"Comparing Against {baseline.get('commit', 'unknown')} (Threshold {threshold * 100:.0f}%)")
+    for name, microseconds in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        change = microseconds / baseline["results"][name] - 1
+        status = "REGRESSION" if change > threshold else "Improved" if change < -threshold else "Same"
+        print(f"{name} | {baseline['results'][name]:.2f}us -> {microseconds:.2f}us ({change * 100:+.1f}%) | {status}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packet, World, Command And Chat Micro Benchmarks")
+    parser.add_argument("--groups", type=str, nargs="+", default=list(BENCHMARK_GROUPS), choices=list(BENCHMARK_GROUPS), help="Benchmark groups to run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times each benchmark is repeated. The fastest run is kept")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the number of iterations of every benchmark")
+    parser.add_argument("--world-sizes", type=int, nargs="+", default=[64, 128, 256], help="World sizes used for map compression")
+    parser.add_argument("--format-size", type=int, default=128, help="World size used for saving and loading worlds")
+    parser.add_argument("--output", type=str, default=None, help="Save results as JSON to this file")
+    parser.add_argument("--compare", type=str, default=None, help="Compare results against a previously saved JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Fraction a benchmark can get slower by before it counts as a regression")
+    args = parser.parse_args()
+
+    suiteResults = asyncio.run(runSuite(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as outputFile:
+            json.dump(suiteResults, outputFile, indent=4)
+        print(f"Saved Results To {args.output}")
+
+    # Exit with an error if anything regressed, so this can be used in CI
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baselineFile:
+            regressed = compareResults(json.load(baselineFile), suiteResults, args.threshold)
+        if regressed:
+            print(f"{len(regressed)} Benchmarks Regressed: {', '.join(regressed)}")
+            sys.exit(1)
@@ -0,0 +1,68 @@
+# Benchmark for WorldPlayerManager join/leave churn
+# Usage: python -m benchmarks.worldplayers [--slots 256] [--fill 0.9] [--iterations 100000]
+from types import SimpleNamespace
+from typing import cast
+import argparse
+import random
+import time
+
+from obsidian.player import Player, WorldPlayerManager
+from obsidian.world import World
+
+
+def runChurn(slots: int, fill: float, iterations: int, seed: int = 0) -> dict[str, float]:
+    # Create a world player manager without a running server. Only the id allocator is exercised.
+    world = cast(World, SimpleNamespace(maxPlayers=slots, name="benchmark"))
+    manager = WorldPlayerManager(world, None)  # type: ignore
+    rng = random.Random(seed)
+
+    # Fill world up to the requested amount of players
+    joined: list[tuple[int, Player]] = []
+    for _ in range(int(slots * fill)):
+        player = cast(Player, object())
+        playerId = manager.allocateId()
+        manager.assignId(playerId, player)
+        joined.append((playerId, player))
+
+    # Randomly have players leave and join again, getting the player list after each change (like a broadcast would)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        leaving = rng.randrange(len(joined))
+        playerId, _player = joined[leaving]
+        manager.deallocateId(playerId)
+        manager.getPlayers()
+
+        player = cast(Player, object())
+        playerId = manager.allocateId()
+        manager.assignId(playerId, player)
+        joined[leaving] = (playerId, player)
+        manager.getPlayers()
+    elapsed = time.perf_counter() - start
+
+    # Broadcasts between joins/leaves should reuse the cached player list
+    start = time.perf_counter()
+    for _ in range(iterations):
+        manager.getPlayers()
+    broadcastElapsed = time.perf_counter() - start
+
+    return {
+        "churnOpsPerSecond": iterations / elapsed,
+        "churnMicroseconds": elapsed / iterations * 1e6,
+        "getPlayersMicroseconds": broadcastElapsed / iterations * 1e6
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WorldPlayerManager Join/Leave Churn Benchmark")
+    parser.add_argument("--slots", type=int, nargs="+", default=[64, 256, 1024], help="Number of player slots in the world")
+    parser.add_argument("--fill", type=float, default=0.9, help="Fraction of slots filled before churning")
+    parser.add_argument("--iterations", type=int, default=100000, help="Number of leave + join cycles")
+    args = parser.parse_args()
+
+    for slotCount in args.slots:
+        results = runChurn(slotCount, args.fill, args.iterations)
+        print(
+            f"{slotCount} Slots | "
+            f"Churn: {results['churnOpsPerSecond']:.0f} ops/s ({results['churnMicroseconds']:.2f}us per leave + join) | "
+            f"getPlayers: {results['getPlayersMicroseconds']:.3f}us"
+        )
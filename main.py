@@ -2,21 +2,26 @@
 Copyright (C) RadioactiveHydra (Edward) 2023
 """
 
+from pathlib import Path
+from typing import Optional
 import argparse
 import asyncio
 import signal
 import sys
+import os
 import traceback
 
 from obsidian.server import Server
 from obsidian.log import Logger
+from obsidian.cluster import ClusterCoordinator, ClusterWorker, isClusterSupported
+from obsidian.constants import SERVER_PATH
 
 # Check python version to see if compatible
 if sys.version_info.major < 3 or sys.version_info.minor < 10:
     raise RuntimeError("Python Version Out Of Date! Minimum Required: 3.10.0")
 
 
-async def main():
+def parseArgs():
     # Initiate Argument Parser
     parser = argparse.ArgumentParser(
         description="Project Obsidian - Open Source Minecraft Classic Server Reverse Engineer And Reimplementation Project"
@@ -31,8 +36,28 @@ async def main():
     parser.add_argument('-q', "--quiet", help="Disabled Logging To File", action="store_true")
     parser.add_argument('-s', "--server", help="Auto-Denys Confirmation Dialogs", action="store_true")
     parser.add_argument('-nc', "--no-color", help="Disable Color While Logging", action="store_true")
-    args = parser.parse_args()
+    parser.add_argument('-u', "--uvloop", help="Use uvloop As The Event Loop (If Installed)", action="store_true")
+    parser.add_argument('-w', "--workers", type=int, nargs='?', help="Number Of Worker Processes To Split Worlds Between (Linux Only)", default=1)
+    return parser.parse_args()
 
+
+def setupEventLoop(useUvloop: bool):
+    # Use the default asyncio event loop unless uvloop is requested
+    if not useUvloop:
+        return
+
+    # uvloop is optional. If it is not installed, fall back to the default event loop
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        Logger.warn("uvloop Is Not Installed! Falling Back To Default asyncio Event Loop.", module="main")
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    Logger.info(f"Using uvloop {uvloop.__version__} As Event Loop", module="main")
+
+
+def setupLogging(args: argparse.Namespace, logPath: Optional[Path] = None):
     # Set Logging Levels
     Logger.DEBUG = args.debug
     Logger.VERBOSE = args.verbose
@@ -41,11 +66,49 @@ async def main():
 
     # Set Up Logging File
     if not args.quiet:
-        Logger.setupLogFile()
+        Logger.setupLogFile(logPath)
+
+
+def runCluster(args: argparse.Namespace):
+    setupLogging(args)
+
+    # Fork worker processes. Each worker returns from spawnWorkers and runs its own server
+    coordinator = ClusterCoordinator(args.workers)
+    cluster = coordinator.spawnWorkers()
+
+    if cluster is not None:
+        # In worker. Never return into the coordinator code
+        exitCode = 0
+        try:
+            setupLogging(args, logPath=Path(SERVER_PATH, "logs", f"worker-{cluster.workerId}"))
+            setupEventLoop(args.uvloop)
+            asyncio.run(main(args, cluster=cluster))
+        except SystemExit as e:
+            exitCode = e.code if isinstance(e.code, int) else 0
+        except Exception as e:
+            Logger.fatal(f"Unhandled Worker Exception - {type(e).__name__}: {e}", module="main", printTb=False)
+            traceback.print_exc()
+            exitCode = 1
+        sys.stdout.flush()
+        os._exit(exitCode)
+
+    # In coordinator
+    asyncio.run(coordinator.run())
+
+
+async def main(args: argparse.Namespace, cluster: Optional[ClusterWorker] = None):
+    # Set Up Logging (Workers set up their own logging before starting)
+    if cluster is None:
+        setupLogging(args)
 
     # Create and Init Main Server
-    server = Server(args.address, args.port, args.name, args.motd, color=True)
+    server = Server(args.address, args.port, args.name, args.motd, color=True, cluster=cluster)
     await server.init()
+
+    # Workers that fail to start are stopped, so the coordinator does not wait on them forever
+    if cluster is not None and not server.initialized:
+        sys.exit(1)
+
     asyncio.create_task(server.run())
 
     # Capture and Handle Crl-C
@@ -77,7 +140,16 @@ async def main():
 # Make sure main gets asynced when run
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        arguments = parseArgs()
+        if arguments.workers > 1 and not isClusterSupported():
+            Logger.warn("Multiple Workers Are Only Supported On Linux! Falling Back To A Single Process.", module="main")
+            arguments.workers = 1
+
+        if arguments.workers > 1:
+            runCluster(arguments)
+        else:
+            setupEventLoop(arguments.uvloop)
+            asyncio.run(main(arguments))
     except Exception as e:
         Logger.fatal(f"Unhandled Server Exception - {type(e).__name__}: {e}", module="main", printTb=False)
         traceback.print_exc()
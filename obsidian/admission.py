@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+import time
+
+from obsidian.log import Logger
+
+if TYPE_CHECKING:
+    from obsidian.server import Server
+
+
+# Simple token bucket used for rate limiting
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "lastUpdate")
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        self.rate: float = rate  # Tokens added per second
+        self.capacity: float = capacity  # Max number of tokens in the bucket
+        self.tokens: float = capacity
+        self.lastUpdate: float = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.lastUpdate) * self.rate)
+        self.lastUpdate = now
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        # Take one token out of the bucket. Returns False if bucket is empty
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def isFull(self, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        return self.tokens >= self.capacity
+
+
+# Returned by AdmissionController when a connection is admitted.
+# Released once the connection finishes logging in (or disconnects), freeing up its handshake slot.
+class AdmissionTicket:
+    __slots__ = ("controller", "ip", "released")
+
+    def __init__(self, controller: AdmissionController, ip: str):
+        self.controller: AdmissionController = controller
+        self.ip: str = ip
+        self.released: bool = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller.handshakingConnections -= 1
+
+
+# Decides whether new connections are accepted, before any resources are allocated for them.
+# Limits the rate of new connections (globally and per ip), as well as how many connections can be logging in at once.
+class AdmissionController:
+    def __init__(self, server: Server):
+        self.server: Server = server
+        self.handshakingConnections: int = 0  # Number of admitted connections that have not finished logging in yet
+        self.rejectedConnections: int = 0  # Number of connections rejected since startup
+        self._globalBucket: Optional[TokenBucket] = None
+        self._ipBuckets: dict[str, TokenBucket] = {}
+        self._lastPrune: float = time.monotonic()
+
+    def admit(self, ip: str) -> Optional[AdmissionTicket]:
+        config = self.server.config
+        now = time.monotonic()
+
+        # Check if too many connections are currently logging in
+        if config.maxHandshakingConnections >= 0 and self.handshakingConnections >= config.maxHandshakingConnections:
+            return self._reject(ip, "Too Many Connections Logging In")
+
+        # Check per ip rate limit
+        if config.ipConnectionRateLimit >= 0:
+            bucket = self._ipBuckets.get(ip)
+            if bucket is None:
+                bucket = self._ipBuckets[ip] = TokenBucket(config.ipConnectionRateLimit, config.ipConnectionBurst, now)
+            # Config may have been reloaded since bucket was created
+            bucket.rate, bucket.capacity = config.ipConnectionRateLimit, config.ipConnectionBurst
+            if not bucket.consume(now):
+                return self._reject(ip, "Ip Connection Rate Limit Exceeded")
+
+        # Check global rate limit
+        if config.connectionRateLimit >= 0:
+            if self._globalBucket is None:
+                self._globalBucket = TokenBucket(config.connectionRateLimit, config.connectionBurst, now)
+            self._globalBucket.rate, self._globalBucket.capacity = config.connectionRateLimit, config.connectionBurst
+            if not self._globalBucket.consume(now):
+                return self._reject(ip, "Global Connection Rate Limit Exceeded")
+
+        # Every once in a while, forget ips whose buckets have refilled so the dict does not grow forever
+        if now - self._lastPrune > 60:
+            self._pruneBuckets(now)
+
+        self.handshakingConnections += 1
+        return AdmissionTicket(self, ip)
+
+    def _reject(self, ip: str, reason: str) -> None:
+        # Rejections are only logged in debug mode, as they are expected to happen in bulk during connection floods
+        self.rejectedConnections += 1
+        Logger.debug(f"Rejecting Connection From {ip} - {reason}", module="admission")
+        return None
+
+    def _pruneBuckets(self, now: float):
+        self._lastPrune = now
+        self._ipBuckets = {ip: bucket for ip, bucket in self._ipBuckets.items() if not bucket.isFull(now)}
@@ -0,0 +1,568 @@
+from __future__ import annotations
+
+from typing import Optional, Callable, Any, TYPE_CHECKING
+from contextvars import ContextVar
+from collections import deque
+import asyncio
+import base64
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import zlib
+
+from obsidian.log import Logger
+from obsidian.config import AbstractConfig
+from obsidian.player import PlayerManager
+from obsidian.packet import Packets
+from obsidian.mixins import Override, Inject, InjectionPoint
+from obsidian.errors import ServerError, ClientError, FatalError
+
+if TYPE_CHECKING:
+    from obsidian.server import Server
+    from obsidian.network import NetworkHandler
+
+# Max size of a single message sent between processes
+IPC_MESSAGE_SIZE = 1 << 18
+# Max number of file descriptors passed along with a single message
+IPC_MAX_FDS = 4
+
+# Set while handling a message that came from another worker, so it does not get forwarded back into the cluster
+_relayedMessage: ContextVar[bool] = ContextVar("relayedMessage", default=False)
+
+
+def isClusterSupported() -> bool:
+    # Sharing a port between processes needs SO_REUSEPORT, and handing off connections needs fd passing over unix sockets
+    return sys.platform.startswith("linux") and hasattr(socket, "SO_REUSEPORT") and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+
+def getWorldWorker(worldName: str, workerCount: int) -> int:
+    # Worlds are assigned to workers by the hash of their name, so every worker agrees on who loads which world file
+    return zlib.crc32(worldName.encode()) % workerCount
+
+
+# Message channel between the coordinator and a worker process.
+# Built on a unix SOCK_SEQPACKET socket pair, so message boundaries are kept and file descriptors can be passed along.
+class IpcChannel:
+    def __init__(self, sock: socket.socket, name: str):
+        self.sock: socket.socket = sock
+        self.name: str = name
+        self.closed: bool = False
+        self._onMessage: Optional[Callable[[dict[str, Any], list[int]], None]] = None
+        self._onClose: Optional[Callable[[], None]] = None
+        self._pending: deque[tuple[bytes, list[int]]] = deque()  # Messages waiting for the socket to become writable
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, onMessage: Callable[[dict[str, Any], list[int]], None], onClose: Callable[[], None]):
+        self._onMessage = onMessage
+        self._onClose = onClose
+        self._loop = asyncio.get_running_loop()
+        self.sock.setblocking(False)
+        self._loop.add_reader(self.sock.fileno(), self._onReadable)
+
+    def send(self, message: dict[str, Any], fds: list[int] = []):
+        if self.closed:
+            Logger.debug(f"Dropping Message {message.get('type')} To Closed Channel {self.name}", module="cluster-ipc")
+            return
+
+        data = json.dumps(message).encode()
+        if len(data) > IPC_MESSAGE_SIZE:
+            raise ServerError(f"Ipc Message {message.get('type')} Is Too Large ({len(data)} Bytes)")
+
+        # Keep messages in order if some are already waiting to be sent
+        if not self._pending:
+            try:
+                socket.send_fds(self.sock, [data], fds)
+                return
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                # Other process is gone. The reader will notice and close the channel
+                Logger.debug(f"Dropping Message {message.get('type')} To Channel {self.name} - {type(e).__name__}: {e}", module="cluster-ipc")
+                return
+
+        # Socket is full. Keep copies of the fds, as the caller is free to close theirs once send returns
+        Logger.verbose(f"Channel {self.name} Is Full. Queueing Message {message.get('type')}", module="cluster-ipc")
+        self._pending.append((data, [os.dup(fd) for fd in fds]))
+        if self._loop is not None and len(self._pending) == 1:
+            self._loop.add_writer(self.sock.fileno(), self._onWritable)
+
+    def _onWritable(self):
+        while self._pending:
+            data, fds = self._pending[0]
+            try:
+                socket.send_fds(self.sock, [data], fds)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                Logger.error(f"Error While Sending To Channel {self.name} - {type(e).__name__}: {e}", module="cluster-ipc", printTb=False)
+                self.close()
+                return
+            self._pending.popleft()
+            for fd in fds:
+                os.close(fd)
+        if self._loop is not None:
+            self._loop.remove_writer(self.sock.fileno())
+
+    def _onReadable(self):
+        while not self.closed:
+            try:
+                data, fds, flags, _ = socket.recv_fds(self.sock, IPC_MESSAGE_SIZE, IPC_MAX_FDS)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError:
+                # Other process exited without reading everything sent to it
+                self.close()
+                return
+            except OSError as e:
+                Logger.error(f"Error While Reading From Channel {self.name} - {type(e).__name__}: {e}", module="cluster-ipc", printTb=False)
+                self.close()
+                return
+
+            # Empty read means the other process has closed its end
+            if not data:
+                self.close()
+                return
+
+            try:
+                if flags & (socket.MSG_TRUNC | socket.MSG_CTRUNC):
+                    raise ServerError("Message Was Truncated")
+                message = json.loads(data)
+            except (ServerError, ValueError) as e:
+                Logger.error(f"Dropping Invalid Message From Channel {self.name} - {type(e).__name__}: {e}", module="cluster-ipc", printTb=False)
+                for fd in fds:
+                    os.close(fd)
+                continue
+
+            if self._onMessage is not None:
+                try:
+                    self._onMessage(message, fds)
+                except Exception as e:
+                    Logger.error(f"Error While Handling Message {message.get('type')} From Channel {self.name} - {type(e).__name__}: {e}", module="cluster-ipc")
+
+    def receiveBlocking(self) -> Optional[dict[str, Any]]:
+        # Used during startup, before any event loop is running. Returns None if the other process exited
+        self.sock.setblocking(True)
+        data = self.sock.recv(IPC_MESSAGE_SIZE)
+        if not data:
+            return None
+        return json.loads(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._loop is not None:
+            self._loop.remove_reader(self.sock.fileno())
+            self._loop.remove_writer(self.sock.fileno())
+        for _, fds in self._pending:
+            for fd in fds:
+                os.close(fd)
+        self._pending.clear()
+        self.sock.close()
+        if self._onClose is not None:
+            self._onClose()
+
+
+# Runs in the parent process when the server is started with multiple workers.
+# Forks the worker processes, keeps track of global state (which worker every player and world is on),
+# and relays messages between workers. Does not run a minecraft server itself.
+class ClusterCoordinator:
+    def __init__(self, workerCount: int):
+        self.workerCount: int = workerCount
+        self.processes: dict[int, int] = {}  # Worker Id -> Process Id
+        self.channels: dict[int, IpcChannel] = {}  # Worker Id -> Channel To Worker
+        self.players: dict[str, int] = {}  # Username -> Worker Id
+        self.worldOwners: dict[str, int] = {}  # World Name -> Worker Id
+        self.stopping: bool = False
+        self._stopped: Optional[asyncio.Event] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def spawnWorkers(self) -> Optional[ClusterWorker]:
+        # Forks all worker processes. Returns None in the coordinator, and the ClusterWorker in each worker process.
+        # Must be called before any event loop is created, as event loops do not survive a fork.
+        for workerId in range(self.workerCount):
+            coordinatorSock, workerSock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+            # Flush output before forking so buffered logs are not written twice
+            sys.stdout.flush()
+            if Logger.LOGFILE is not None:
+                Logger.LOGFILE.flush()
+
+            pid = os.fork()
+            if pid == 0:
+                # In worker. Close every coordinator end inherited from the parent
+                coordinatorSock.close()
+                for channel in self.channels.values():
+                    channel.sock.close()
+                return ClusterWorker(workerId, self.workerCount, IpcChannel(workerSock, "coordinator"))
+
+            # In coordinator
+            workerSock.close()
+            self.processes[workerId] = pid
+            self.channels[workerId] = IpcChannel(coordinatorSock, f"worker-{workerId}")
+            Logger.info(f"Started Worker {workerId} (Pid {pid})", module="cluster")
+
+            # Wait for each worker to finish starting before starting the next,
+            # so workers do not race each other creating config and world files
+            message = self.channels[workerId].receiveBlocking()
+            if message is None or message.get("type") != "ready":
+                self.stopWorkers()
+                raise FatalError(f"Worker {workerId} Failed To Start")
+            for worldName in message["worlds"]:
+                self.worldOwners[worldName] = workerId
+            Logger.info(f"Worker {workerId} Ready With Worlds [{', '.join(message['worlds'])}]", module="cluster")
+
+        return None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+
+        # Start listening to messages from workers
+        for workerId, channel in self.channels.items():
+            channel.start(
+                lambda message, fds, workerId=workerId: self._handleMessage(workerId, message, fds),
+                lambda workerId=workerId: self._handleWorkerExit(workerId)
+            )
+
+        # Pass stop signals on to the workers. Each worker shuts itself down cleanly
+        for stopSignal in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(stopSignal, self.stopWorkers)
+
+        # Let every worker know where all the worlds are
+        self.broadcastWorlds()
+        Logger.info(f"Cluster Running With {self.workerCount} Workers", module="cluster")
+
+        # Wait until every worker has exited
+        await self._stopped.wait()
+        Logger.info("All Workers Stopped", module="cluster")
+
+    def stopWorkers(self):
+        # Ignore repeated stop signals
+        if self.stopping:
+            return
+        self.stopping = True
+        for workerId, pid in self.processes.items():
+            Logger.info(f"Stopping Worker {workerId}", module="cluster")
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def broadcastWorlds(self):
+        for channel in self.channels.values():
+            channel.send({"type": "worlds", "owners": self.worldOwners})
+
+    def _relay(self, sourceWorker: int, message: dict[str, Any]):
+        for workerId, channel in self.channels.items():
+            if workerId != sourceWorker:
+                channel.send(message)
+
+    def _handleMessage(self, workerId: int, message: dict[str, Any], fds: list[int]):
+        Logger.verbose(f"Received Message {message} From Worker {workerId}", module="cluster")
+        try:
+            messageType = message.get("type")
+            if messageType == "worlds":
+                # Worker created or removed worlds
+                self.worldOwners = {name: owner for name, owner in self.worldOwners.items() if owner != workerId}
+                for worldName in message["worlds"]:
+                    self.worldOwners.setdefault(worldName, workerId)
+                self.broadcastWorlds()
+            elif messageType == "reservePlayer":
+                # Usernames and player limit are enforced across all workers
+                username = message["username"]
+                error = None
+                if username in self.players:
+                    error = "This Username Is Taken!"
+                elif message["maxPlayers"] is not None and len(self.players) >= message["maxPlayers"]:
+                    error = "Server Is Full!"
+                else:
+                    self.players[username] = workerId
+                self.channels[workerId].send({"type": "reply", "requestId": message["requestId"], "error": error})
+            elif messageType == "releasePlayer":
+                # Ignore releases from workers that no longer own the player (Player was handed off)
+                if self.players.get(message["username"]) == workerId:
+                    del self.players[message["username"]]
+            elif messageType in ("globalMessage", "configChanged"):
+                self._relay(workerId, message)
+            elif messageType == "handoff":
+                # Pass the player's connection on to the worker that owns the target world
+                targetWorker = self.worldOwners.get(message["state"]["world"])
+                if targetWorker is None or targetWorker not in self.channels or not fds:
+                    Logger.warn(f"Cannot Hand Off Player {message['state']['username']} To World {message['state']['world']}. Dropping Connection.", module="cluster")
+                    self.players.pop(message["state"]["username"], None)
+                else:
+                    Logger.debug(f"Handing Off Player {message['state']['username']} From Worker {workerId} To Worker {targetWorker}", module="cluster")
+                    self.players[message["state"]["username"]] = targetWorker
+                    self.channels[targetWorker].send(message, fds[:1])
+            else:
+                Logger.warn(f"Unknown Message Type {messageType} From Worker {workerId}", module="cluster")
+        finally:
+            # Passed fds have been duplicated into the target worker by now
+            for fd in fds:
+                os.close(fd)
+
+    def _createTask(self, coro):
+        # Keep a reference to background tasks so they do not get garbage collected
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _handleWorkerExit(self, workerId: int):
+        self.channels.pop(workerId, None)
+
+        # The channel can close before the worker process has exited, so wait for it in the background
+        if workerId in self.processes:
+            self._createTask(self._reapWorker(workerId, self.processes[workerId]))
+
+        # Forget everything the worker owned
+        self.players = {username: owner for username, owner in self.players.items() if owner != workerId}
+        self.worldOwners = {name: owner for name, owner in self.worldOwners.items() if owner != workerId}
+        self.broadcastWorlds()
+
+    async def _reapWorker(self, workerId: int, pid: int):
+        # Poll without blocking, so the coordinator keeps running while the worker shuts down
+        while True:
+            exitedPid, status = os.waitpid(pid, os.WNOHANG)
+            if exitedPid != 0:
+                break
+            await asyncio.sleep(0.1)
+        self.processes.pop(workerId, None)
+
+        exitCode = os.waitstatus_to_exitcode(status)
+        if self.stopping:
+            Logger.info(f"Worker {workerId} Stopped (Exit Code {exitCode})", module="cluster")
+        else:
+            Logger.error(f"Worker {workerId} Exited Unexpectedly (Exit Code {exitCode})", module="cluster", printTb=False)
+
+        if not self.processes and self._stopped is not None:
+            self._stopped.set()
+
+
+# Runs in each worker process, next to the server.
+# Talks to the coordinator to keep players unique across the cluster, forward global messages,
+# sync config changes, and hand players off to the worker that owns the world they are joining.
+class ClusterWorker:
+    def __init__(self, workerId: int, workerCount: int, channel: IpcChannel):
+        self.workerId: int = workerId
+        self.workerCount: int = workerCount
+        self.channel: IpcChannel = channel
+        self.worldOwners: dict[str, int] = {}  # World Name -> Worker Id. Sent by coordinator
+        self._server: Optional[Server] = None
+        self._requests: dict[int, asyncio.Future] = {}
+        self._nextRequestId: int = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def server(self) -> Server:
+        if self._server is None:
+            raise ServerError("Cluster Worker Is Not Attached To A Server!")
+        return self._server
+
+    def ownsWorldFile(self, worldName: str) -> bool:
+        # Whether this worker should load (or create) the world on startup
+        return getWorldWorker(worldName, self.workerCount) == self.workerId
+
+    def getWorldOwner(self, worldName: str) -> Optional[int]:
+        return self.worldOwners.get(worldName)
+
+    def isRemoteWorld(self, worldName: str) -> bool:
+        owner = self.worldOwners.get(worldName)
+        return owner is not None and owner != self.workerId
+
+    def attach(self, server: Server):
+        # Called once the server has loaded its worlds
+        self._server = server
+        self.channel.start(self._handleMessage, self._handleDisconnect)
+        self._installHooks()
+
+    def announceReady(self):
+        Logger.info(f"Worker {self.workerId} Ready", module="cluster")
+        self.channel.send({"type": "ready", "worlds": list(self.server.worldManager.worlds)})
+
+    def announceWorlds(self):
+        # Worlds may be created before the worker is attached (during startup). Those are sent along with the ready message
+        if self._server is None:
+            return
+        self.channel.send({"type": "worlds", "worlds": list(self.server.worldManager.worlds)})
+
+    def _installHooks(self):
+        cluster = self
+
+        # Forward global messages to every other worker
+        @Override(target=PlayerManager.sendGlobalMessage, passSuper=True)
+        async def sendGlobalMessage(self, message: str | list, *args, _super: Callable, **kwargs):
+            if _relayedMessage.get() or cluster.server.stopping:
+                return await _super(self, message, *args, **kwargs)
+
+            cluster.channel.send({"type": "globalMessage", "message": message})
+            # Messages sent while handling this one (such as each line of a list) have already been forwarded
+            token = _relayedMessage.set(True)
+            try:
+                return await _super(self, message, *args, **kwargs)
+            finally:
+                _relayedMessage.reset(token)
+
+        # Let other workers know when the server config changes (bans, operators, etc)
+        @Inject(target=AbstractConfig.save, at=InjectionPoint.AFTER)
+        def notifyConfigSave(self, *args, **kwargs):
+            if self is cluster.server.config:
+                cluster.channel.send({"type": "configChanged"})
+
+    def _createTask(self, coro):
+        # Keep a reference to background tasks so they do not get garbage collected
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _handleMessage(self, message: dict[str, Any], fds: list[int]):
+        Logger.verbose(f"Received Message {message.get('type')} From Coordinator", module="cluster")
+        messageType = message.get("type")
+
+        # Only handoff messages carry fds
+        if messageType == "handoff" and fds:
+            self._createTask(self._adoptConnection(message["state"], fds[0]))
+            fds = fds[1:]
+        for fd in fds:
+            os.close(fd)
+
+        if messageType == "worlds":
+            self.worldOwners = message["owners"]
+        elif messageType == "reply":
+            future = self._requests.pop(message["requestId"], None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        elif messageType == "globalMessage":
+            self._createTask(self._relayGlobalMessage(message["message"]))
+        elif messageType == "configChanged":
+            self._createTask(self._reloadConfig())
+        elif messageType != "handoff":
+            Logger.warn(f"Unknown Message Type {messageType} From Coordinator", module="cluster")
+
+    def _handleDisconnect(self):
+        # Coordinator is gone. Nothing left to coordinate with, so shut down
+        if not self.server.stopping:
+            Logger.error("Lost Connection To Cluster Coordinator. Stopping Worker.", module="cluster", printTb=False)
+            self._createTask(self.server.stop())
+
+    async def _request(self, message: dict[str, Any]) -> dict[str, Any]:
+        # Send a message to the coordinator and wait for its reply
+        requestId = self._nextRequestId
+        self._nextRequestId += 1
+        future = asyncio.get_running_loop().create_future()
+        self._requests[requestId] = future
+        try:
+            self.channel.send({**message, "requestId": requestId})
+            return await asyncio.wait_for(future, timeout=self.server.config.handshakeTimeout)
+        finally:
+            self._requests.pop(requestId, None)
+
+    async def reservePlayer(self, username: str):
+        # Make sure the username is not in use on another worker, and that the cluster is not full
+        reply = await self._request({"type": "reservePlayer", "username": username, "maxPlayers": self.server.config.serverMaxPlayers})
+        if reply["error"] is not None:
+            raise ClientError(reply["error"])
+
+    def releasePlayer(self, username: str):
+        self.channel.send({"type": "releasePlayer", "username": username})
+
+    async def handoffPlayer(self, handler: NetworkHandler, worldName: str, login: bool = False):
+        # Pass the player's connection over to the worker that owns the world
+        player = handler.player
+        if player is None:
+            raise ServerError("Trying To Hand Off Connection Before Player Is Initialized!")
+        if not self.isRemoteWorld(worldName):
+            raise ServerError(f"World {worldName} Is Not Owned By Another Worker")
+        Logger.info(f"Handing Off Player {player.name} To Worker {self.worldOwners[worldName]} For World {worldName}", module="cluster")
+
+        # Stop reading from the client. Anything not read yet is passed along to the new worker
+        transport = handler.writer.transport
+        transport.pause_reading()
+        handler.dispatcher.cancelMovementUpdates()
+
+        # Change Server Information To Include "Switching Server..."
+        if not login:
+            await handler.dispatcher.sendPacket(Packets.Response.ServerIdentification, self.server.protocolVersion, self.server.name, f"Joining {worldName}...", 0x00)
+
+        # Everything sent so far must reach the client before the socket changes hands
+        deadline = time.monotonic() + self.server.config.sendTimeout
+        while transport.get_write_buffer_size() > 0:
+            if time.monotonic() > deadline:
+                transport.resume_reading()
+                raise ClientError("Timed Out While Switching Worlds")
+            await asyncio.sleep(0.01)
+
+        # Data read from the socket but not processed yet. StreamReader has no public way to get it,
+        # so this relies on the internal buffer of CPython's StreamReader. Without it, unprocessed data is lost
+        pendingData = getattr(handler.reader, "_buffer", None)
+        if pendingData is None:
+            Logger.warn(f"Cannot Read Unprocessed Data Of {handler.connectionInfo} While Handing Off Player. Data May Be Lost", module="cluster")
+            pendingData = b""
+
+        state = {
+            "world": worldName,
+            "login": login,
+            "username": player.username,
+            "displayName": player.name,
+            "verificationKey": player.verificationKey,
+            "authenticated": player.authenticated,
+            "clientSoftware": player.clientSoftware,
+            "supportsCPE": player.supportsCPE,
+            "extensions": [[extension.name, extension.version] for extension in player._extensions],
+            "pendingData": base64.b64encode(bytes(pendingData)).decode()
+        }
+
+        # Remove player from this worker without announcing a disconnect
+        await self.server.playerManager.deletePlayer(player, reason=None if login else f"Switching World To {worldName}")
+        handler.isConnected = False
+
+        # Send the socket over and close this worker's copy of it
+        self.channel.send({"type": "handoff", "state": state}, [transport.get_extra_info("socket").fileno()])
+        transport.abort()
+
+    async def _adoptConnection(self, state: dict[str, Any], fd: int):
+        # Take over a connection handed off by another worker
+        # Avoid circular import
+        from obsidian.network import NetworkHandler  # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(fileno=fd)
+        try:
+            # Data the previous worker received but did not process yet comes before anything new from the socket
+            reader = asyncio.StreamReader()
+            reader.feed_data(base64.b64decode(state["pendingData"]))
+            protocol = asyncio.StreamReaderProtocol(reader)
+            transport, _ = await loop.connect_accepted_socket(lambda: protocol, sock)
+            writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        except Exception as e:
+            Logger.error(f"Failed To Adopt Connection For Player {state['displayName']} - {type(e).__name__}: {e}", module="cluster")
+            sock.close()
+            self.releasePlayer(state["username"])
+            return
+
+        handler = NetworkHandler(self.server, reader, writer)
+        await handler.initConnection(handoff=state)
+
+        # If the handoff failed before the player was recreated, closing the connection did not free up the username
+        if handler.player is None:
+            self.releasePlayer(state["username"])
+
+    async def _relayGlobalMessage(self, message: str | list):
+        # Runs in its own task, so the flag only applies to this message
+        _relayedMessage.set(True)
+        await self.server.playerManager.sendGlobalMessage(message)
+
+    async def _reloadConfig(self):
+        # Config was saved by another worker. Read it back in without writing it again
+        Logger.info("Server Config Changed On Another Worker. Reloading Config.", module="cluster")
+        config = self.server.config
+        with open(config.configPath, "r", encoding="utf-8") as configFile:
+            config._load(configFile)  # pylint: disable=protected-access
+
+        # Kick players that were banned on another worker
+        for player in self.server.playerManager.getPlayers():
+            if config.isPlayerBanned(player.username) or config.isIpBanned(player.networkHandler.ip):
+                await player.networkHandler.closeConnection("You Have Been Banned By An Operator", notifyPlayer=True, chatMessage="Banned")
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Union, Type, Generic, get_args, get_origin, TYPE_CHECKING
+from typing import Any, Callable, Optional, Union, Type, Generic, get_args, get_origin, TYPE_CHECKING
 from dataclasses import dataclass, field
 from types import UnionType, GenericAlias, NoneType
 import inspect
 
-from obsidian.module import Submodule, AbstractModule, AbstractSubmodule, AbstractManager
+from obsidian.module import Submodule, AbstractModule, AbstractSubmodule, AbstractManager, LazyModule, ModuleManager
 from obsidian.utils.ptl import PrettyTableLite
+from obsidian.utils.prefixtrie import PrefixTrie
 from obsidian.log import Logger
 from obsidian.errors import (
     InitRegisterError,
     CommandError,
     ServerError,
     ConverterError,
+    ModuleError,
 )
 from obsidian.types import formatName, T, asciistr
 
@@ -33,6 +35,8 @@ class AbstractCommand(AbstractSubmodule[T], Generic[T]):
     # TODO: Maybe enforce this as a tuple?
     ACTIVATORS: list[str] = field(default_factory=list)
     OP: bool = False
+    # How to parse arguments for execute. Built when the command is registered
+    argumentPlan: Optional[ArgumentPlan] = field(default=None, init=False, repr=False, compare=False)
 
     def __repr__(self):
         return f"<Command {self.NAME}>"
@@ -57,6 +61,14 @@ class AbstractCommand(AbstractSubmodule[T], Generic[T]):
                 raise ConverterError(f"Command {argument} Not Found!")
 
 
+# Placeholder For A Command Of A Lazy Module
+# Looking the command up loads the module, which replaces the placeholder with the real command
+@dataclass
+class LazyCommand(AbstractCommand[LazyModule]):
+    def __repr__(self):
+        return f"<Lazy Command {self.NAME}>"
+
+
 # == Command Utils ==
 
 def _typeToString(annotation) -> str:
@@ -82,68 +94,81 @@ def _typeToString(annotation) -> str:
     return "Unknown"
 
 
-# Take Parameter Info + Argument Info To Automatically Convert Types
-def _convertArgs(ctx: Server, name: str, param: inspect.Parameter, arg: Any):
-    Logger.debug(f"Transforming Argument Data For Argument {name} with data '{arg}'", module="converter")
+# Wraps a converter with the errors raised for bad values, so failed conversions show up as command errors
+def _wrapConversionErrors(name: str, annotation: Any, converter: Callable[[Server, str], Any]) -> Callable[[Server, str], Any]:
+    def convert(ctx: Server, arg: str):
+        try:
+            return converter(ctx, arg)
+        except ValueError:
+            raise CommandError(f"Arg '{name}' Expected {getattr(annotation, '__name__', 'Unknown')} But Got '{type(arg).__name__}'")
+        except TypeError:
+            # Probably cant instantiate. Raise an error so it does not silently fail
+            raise ConverterError(f"Cant instantiate type. {getattr(annotation, '__name__', 'Unknown')} Cannot Convert Types. Try adding a _convertArgument method to add custom conversions.")
+    return convert
+
+
+# Take Parameter Info To Build A Function That Automatically Converts Arguments To The Right Type
+# Everything that only depends on the type is worked out here once, instead of every time a command is run
+def _compileConverter(name: str, annotation: Any, kind: inspect._ParameterKind) -> Callable[[Server, str], Any]:
+    Logger.verbose(f"Compiling Converter For Argument {name} Of Type {annotation}", module="converter")
 
     # If There Is No Type To Convert, Ignore
-    if param.annotation == inspect._empty:
-        return arg
-
-    # Try to parse, if error, cancel
-    try:
-        # Check if the type has an custom arg converter
-        # This supports execute(self, ctx: Player, player2: Player)
-        if hasattr(param.annotation, "_convertArgument") and callable(param.annotation._convertArgument):
-            Logger.debug("Argument Type has _convertArgument. Using that to convert", module="converter")
+    if annotation == inspect._empty:
+        return lambda ctx, arg: arg
+
+    # Check if the type has an custom arg converter
+    # This supports execute(self, ctx: Player, player2: Player)
+    if hasattr(annotation, "_convertArgument") and callable(annotation._convertArgument):
+        def convertCustom(ctx: Server, arg: str):
             try:
-                return param.annotation._convertArgument(ctx, arg)
+                return annotation._convertArgument(ctx, arg)
             except ConverterError as e:
                 raise CommandError(e)
-        # Check if type is a generic class and a var positional argument. Special considerations for those cases.
-        # This supports execute(self, ctx: Player, *args: Tuple[int])
-        if isinstance(param.annotation, GenericAlias) and param.kind == param.VAR_POSITIONAL:
-            Logger.debug("Argument Type is part of a VAR_POSITIONAL iterable. Converting based on base type", module="converter")
-            nested_type = get_args(param.annotation)[0]  # Getting the first type. This may cause issues, but oh well.
-            return _convertArgs(ctx, name, inspect.Parameter(param.name, param.kind, annotation=nested_type), arg)
-        # Check if type is a union (also encapsulates optional types). If so, loop through all types and try to convert to them.
-        # This supports execute(self, ctx: Player, arg1: int | str, arg2: Optional[Player])
-        if get_origin(param.annotation) is Union or get_origin(param.annotation) is UnionType:
-            Logger.debug("Argument Type is part of a Union. Attempting to convert to each type", module="converter")
-            union_types = get_args(param.annotation)  # Getting the different types.
-            # Try every type in order and check if it works
-            for annotation in union_types:
-                Logger.debug(f"Attempting to convert to type {annotation}", module="converter")
-                # If the type is a None type, ignore for now...
-                # This fixes some unexpected behavior with Optional s
-                if annotation is NoneType:
-                    Logger.debug("Argument Type is NoneType. Skipping", module="converter")
-                    continue
-                # Attempting to convert...
+        return _wrapConversionErrors(name, annotation, convertCustom)
+
+    # Check if type is a generic class and a var positional argument. Special considerations for those cases.
+    # This supports execute(self, ctx: Player, *args: Tuple[int])
+    if isinstance(annotation, GenericAlias) and kind == inspect.Parameter.VAR_POSITIONAL:
+        nested_type = get_args(annotation)[0]  # Getting the first type. This may cause issues, but oh well.
+        return _wrapConversionErrors(name, annotation, _compileConverter(name, nested_type, kind))
+
+    # Check if type is a union (also encapsulates optional types). If so, try to convert to each type in order.
+    # This supports execute(self, ctx: Player, arg1: int | str, arg2: Optional[Player])
+    if get_origin(annotation) is Union or get_origin(annotation) is UnionType:
+        union_types = get_args(annotation)  # Getting the different types.
+        # None types are ignored. This fixes some unexpected behavior with Optional s
+        converters = [_compileConverter(name, unionType, kind) for unionType in union_types if unionType is not NoneType]
+        expected = " or ".join([getattr(unionType, "__name__", "Unknown") for unionType in union_types if unionType is not NoneType])
+
+        def convertUnion(ctx: Server, arg: str):
+            for converter in converters:
                 try:
-                    return _convertArgs(ctx, name, inspect.Parameter(param.name, param.kind, annotation=annotation), arg)
+                    return converter(ctx, arg)
                 except CommandError:
                     Logger.debug("Conversion failed. Trying next type", module="converter")
-
             # If none of the types work, raise an error
-            raise CommandError(
-                f"Arg '{name}' expected {' or '.join([getattr(annotation, '__name__', 'Unknown') for annotation in union_types if annotation is not NoneType])} but got '{type(arg).__name__}'"
-            )
-        # Check if type is an "ignore type" -> Types that are not supported by the converter
-        # Any is ignored, as any type is allowed. GenericAlias is allowed to python satisfy type checking LOL
-        if param.annotation is Any or param.annotation is GenericAlias:
-            Logger.debug("Argument Type is part of ignored types.", module="converter")
-            return arg
-        # Check if the type is a boolean, run special logic to convert it
-        if param.annotation is bool:
-            Logger.debug("Argument Type is a boolean. Attempting to convert", module="converter")
-            if arg.lower() in ["true", "t", "yes", "y", "1"]:
+            raise CommandError(f"Arg '{name}' expected {expected} but got '{type(arg).__name__}'")
+        return _wrapConversionErrors(name, annotation, convertUnion)
+
+    # Check if type is an "ignore type" -> Types that are not supported by the converter
+    # Any is ignored, as any type is allowed. GenericAlias is allowed to python satisfy type checking LOL
+    if annotation is Any or annotation is GenericAlias:
+        return lambda ctx, arg: arg
+
+    # Check if the type is a boolean, run special logic to convert it
+    if annotation is bool:
+        def convertBool(ctx: Server, arg: str):
+            if arg.lower() in ("true", "t", "yes", "y", "1"):
                 return True
-            if arg.lower() in ["false", "f", "no", "n", "0"]:
+            if arg.lower() in ("false", "f", "no", "n", "0"):
                 return False
             raise CommandError(f"Arg '{name}' Expected {' or '.join(['True', 'False'])} But Got '{arg}'")
-        # Check if the type is a string. If so, tell the developer that stringed types are not supported.
-        if isinstance(param.annotation, str):
+        return convertBool
+
+    # Check if the type is a string. If so, tell the developer that stringed types are not supported.
+    # This is only raised once the command is run, so commands like this can still be registered
+    if isinstance(annotation, str):
+        def convertString(ctx: Server, arg: str):
             # TODO: ONCE PEP 563 – Postponed Evaluation of Annotations (https://peps.python.org/pep-0563/) IS INTEGRATED,
             # NEED TO FIND A WAY TO MAKE ARGUMENT PARSING WORK WITH ONLY STRINGS!!!
             raise ServerError(
@@ -151,23 +176,57 @@ def _convertArgs(ctx: Server, name: str, param: inspect.Parameter, arg: Any):
                 "[IMPORTANT] Check if you have `from __future__ import annotations` added to the top of the file!\n"
                 "If so, REMOVE IT! Modules do not support this feature yet (PEP 563 - Postponed Evaluation of Annotation)!\n"
             )
+        return convertString
 
-        # Transform the argument
-        Logger.debug(f"Converting Argument of Type {param.annotation}", module="converter")
-        transformed = param.annotation(arg)
+    # Transform the argument
+    def convertType(ctx: Server, arg: str):
+        transformed = annotation(arg)
         # Check if transformation is successful
-        if isinstance(transformed, param.annotation):
+        if isinstance(transformed, annotation):
             return transformed
 
         # Add edge case for asciistr
-        if isinstance(transformed, str) and param.annotation is asciistr:
+        if isinstance(transformed, str) and annotation is asciistr:
             return transformed
-        raise ConverterError(f"Unexpected Conversion. Expected {param.annotation} But Got {type(transformed)}")
-    except ValueError:
-        raise CommandError(f"Arg '{name}' Expected {getattr(param.annotation, '__name__', 'Unknown')} But Got '{type(arg).__name__}'")
-    except TypeError:
-        # Probably cant instantiate. Raise an error so it does not silently fail
-        raise ConverterError(f"Cant instantiate type. {getattr(param.annotation, '__name__', 'Unknown')} Cannot Convert Types. Try adding a _convertArgument method to add custom conversions.")
+        raise ConverterError(f"Unexpected Conversion. Expected {annotation} But Got {type(transformed)}")
+    return _wrapConversionErrors(name, annotation, convertType)
+
+
+# One Parameter Of A Command, With Its Converter Ready To Use
+@dataclass
+class ArgumentStep:
+    name: str
+    kind: inspect._ParameterKind
+    default: Any  # inspect._empty If The Argument Is Required
+    convert: Callable[[Server, str], Any]
+
+
+# How To Parse Arguments For A Command. Built Once From The Signature Of The Execute Function
+@dataclass
+class ArgumentPlan:
+    execute: Callable  # Execute function the plan was built for. Plan is rebuilt if it gets replaced (i.e. by mixins)
+    steps: list[ArgumentStep]
+    numParams: int  # Number of parameters, not including 'ctx'
+    hasCtx: bool  # Whether the 'ctx' parameter exists
+
+
+def _compileArgumentPlan(command: AbstractCommand) -> ArgumentPlan:
+    Logger.debug(f"Compiling Argument Plan For Command {command.NAME}", module="command")
+    # Extract Parameters From Execute Function
+    params = list(inspect.signature(command.execute).parameters.items())
+    steps = [
+        ArgumentStep(name, param.kind, param.default, _compileConverter(name, param.annotation, param.kind))
+        for name, param in params[1:]
+    ]
+    return ArgumentPlan(type(command).execute, steps, len(params) - 1, len(params) > 0)
+
+
+# Returns the argument plan of a command, building it if the command does not have one or its execute function changed
+def _getArgumentPlan(command: AbstractCommand) -> ArgumentPlan:
+    plan = command.argumentPlan
+    if plan is None or plan.execute is not type(command).execute:
+        plan = command.argumentPlan = _compileArgumentPlan(command)
+    return plan
 
 
 # Parse Command Argument Into Args and KWArgs In Accordance To Command Information
@@ -178,75 +237,63 @@ def _parseArgs(ctx: Server, command: AbstractCommand, data: list):
     # Define Important Vars
     args = []
     kwargs = {}
-    # Extract Parameters From Execute Function
-    params = inspect.signature(command.execute).parameters
-    # Create Iterators To Parse Through Params and Data
-    paramsIter = iter(params.items())
-    dataIter = iter(data)
+    plan = _getArgumentPlan(command)
+    # Position Of Next Value To Parse
+    index = 0
 
     # Parse Out The 'ctx' parameter
-    try:
-        next(paramsIter)
-    except StopIteration:
+    if not plan.hasCtx:
         # InitRegisterError Because Command Was Improperly Formed + We Want To Skip The Player Error
         raise InitRegisterError(f"Command {command.NAME} Is Missing Parameter 'ctx'")
 
-    # Loop Through Rest Of Iterators To Parse Data
-    for name, param in paramsIter:
-        Logger.verbose(f"Parsing Parameter {name}", module="command")
+    # Loop Through Rest Of Parameters To Parse Data
+    for step in plan.steps:
         # Check Parameter Type To Determining Parsing Method
         # -> Positional Methods (AKA POSITIONAL_OR_KEYWORD)
         # -> Keyword Only Methods (AKA KEYWORD_ONLY)
         # -> Positional "Rest" Methods (AKA VAR_POSITIONAL)
 
-        if param.kind == param.POSITIONAL_OR_KEYWORD:
-            Logger.debug("Parsing Parameter As Positional Or Keyword", module="command")
+        if step.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD:
             # Parse as Normal Keyword
-            try:
+            if index < len(data):
                 # Convert Type
-                transformed = _convertArgs(ctx, name, param, next(dataIter))
-                args.append(transformed)
-            except StopIteration:
+                args.append(step.convert(ctx, data[index]))
+                index += 1
+            else:
                 # Not Enough Data, Check If Error Or Use Default Value
-                if param.default == inspect._empty:
-                    raise CommandError(f"Expected Field '{name}' But Got Nothing")
-                args.append(param.default)
+                if step.default is inspect._empty:
+                    raise CommandError(f"Expected Field '{step.name}' But Got Nothing")
+                args.append(step.default)
 
-        elif param.kind == param.KEYWORD_ONLY:
-            Logger.debug("Parsing Parameter As Keyword Only", module="command")
+        elif step.kind is inspect.Parameter.KEYWORD_ONLY:
             # KWarg Only Params Mean "Consume Rest"
-            rest = []
-            for value in dataIter:
-                rest.append(value)
+            rest = data[index:]
+            index = len(data)
 
             # If Empty, Check If Default Value Was Requested
             if not rest:
-                if param.default == inspect._empty:
-                    raise CommandError(f"Expected Field '{name}' But Got Nothing")
-                kwargs[name] = param.default
+                if step.default is inspect._empty:
+                    raise CommandError(f"Expected Field '{step.name}' But Got Nothing")
+                kwargs[step.name] = step.default
             else:
                 # Join and Convert
-                joinedRest = " ".join(rest)
-                kwargs[name] = _convertArgs(ctx, name, param, joinedRest)
+                kwargs[step.name] = step.convert(ctx, " ".join(rest))
             # End of loop. Ignore rest
             break
 
-        elif param.kind == param.VAR_POSITIONAL:
-            Logger.debug("Parsing Parameter As Var Positional", module="command")
+        elif step.kind is inspect.Parameter.VAR_POSITIONAL:
             # Var Positional means to just append all extra values to the end of the function
-            for value in dataIter:
-                transformed = _convertArgs(ctx, name, param, value)
-                args.append(transformed)
+            for value in data[index:]:
+                args.append(step.convert(ctx, value))
+            index = len(data)
 
         else:
-            raise ServerError(f"Unknown Parameter Type {param.kind}")
+            raise ServerError(f"Unknown Parameter Type {step.kind}")
 
     # At the end, if there were extra values, give error
-    try:
-        next(dataIter)
-        raise CommandError(f"Too Many Arguments! Expected: {len(params)-1} Got: {len(data)}")
-    except StopIteration:
-        return args, kwargs
+    if index < len(data):
+        raise CommandError(f"Too Many Arguments! Expected: {plan.numParams} Got: {len(data)}")
+    return args, kwargs
 
 
 # Internal Command Manager Singleton
@@ -259,6 +306,11 @@ class _CommandManager(AbstractManager):
         self._commandDict: dict[str, AbstractCommand] = {}
         # Create Cache Of Activator to Obj
         self._activators: dict[str, AbstractCommand] = {}
+        # Tries of activators and lowercase command names, for case insensitive lookups, completion and suggestions
+        self._activatorTrie: PrefixTrie[AbstractCommand] = PrefixTrie()
+        self._nameTrie: PrefixTrie[AbstractCommand] = PrefixTrie()
+        # Changes every time commands are added or removed, so anything built from the command list knows when to rebuild
+        self.registryVersion: int = 0
 
     # Registration. Called by Command Decorator
     def register(self, commandClass: Type[AbstractCommand], module: AbstractModule) -> AbstractCommand:
@@ -282,9 +334,7 @@ class _CommandManager(AbstractManager):
                 Logger.debug(f"Command {command.NAME} is overriding command {self._commandDict[command.NAME].NAME}", module=f"{module.NAME}-submodule-init")
                 # Un-registering All Activators for the Command Being Overwritten. Prevents Issues!
                 Logger.debug(f"Un-registering activators for command {self._commandDict[command.NAME].NAME}", module=f"{module.NAME}-submodule-init")
-                for activator in list(self._commandDict[command.NAME].ACTIVATORS):
-                    # Deleting from Cache
-                    del self._activators[activator]
+                self._removeActivators(self._commandDict[command.NAME])
 
         # Checking If Command Name Is Already In Commands List
         # Ignoring if OVERRIDE is set
@@ -299,7 +349,7 @@ class _CommandManager(AbstractManager):
             command.ACTIVATORS = [formatName(command.NAME)]
         # Add Activators To Command Cache
         Logger.debug(f"Adding Activators {command.ACTIVATORS} To Activator Cache", module=f"{module.NAME}-submodule-init")
-        for activator in command.ACTIVATORS:
+        for activatorIndex, activator in enumerate(command.ACTIVATORS):
             Logger.verbose(f"Adding Activator {activator}", module=f"{module.NAME}-submodule-init")
             # CHECK IF ACTIVATOR IS VALID
             # Checking If:
@@ -312,16 +362,95 @@ class _CommandManager(AbstractManager):
             if (activator == "") or (activator.strip() != activator) or (activator.isdecimal()) or (not activator.islower()) or (not activator.isalnum()):
                 raise InitRegisterError(f"Command Activator '{activator}' for Command {command.NAME} Is Not Valid!")
             # If Activator Already Exists, Error
-            if activator not in self._activators:
-                self._activators[activator] = command
-            else:
+            if activator in self._activators or activator in command.ACTIVATORS[:activatorIndex]:
                 raise InitRegisterError(f"Another Command Has Already Registered Command Activator {activator}")
 
-        # Add Command to Commands List
-        self._commandDict[command.NAME] = command
+        # Work out how to parse arguments now, so running the command does not have to inspect execute every time
+        command.argumentPlan = _compileArgumentPlan(command)
+
+        # Add Command and Activators to Commands List
+        self._addCommand(command)
 
         return command
 
+    # Adds a command and its activators to every lookup. Activators have to be checked beforehand
+    def _addCommand(self, command: AbstractCommand):
+        for activator in command.ACTIVATORS:
+            self._activators[activator] = command
+            self._activatorTrie.add(activator, command)
+        self._commandDict[command.NAME] = command
+        # If two names only differ in case, the first command registered keeps the case insensitive name
+        sameName = self._nameTrie.get(command.NAME.lower())
+        if sameName is None or sameName.NAME == command.NAME:
+            self._nameTrie.add(command.NAME.lower(), command)
+        self.registryVersion += 1
+
+    # Removes the activators of a command from every lookup, if they still point to that command
+    def _removeActivators(self, command: AbstractCommand):
+        for activator in command.ACTIVATORS:
+            if self._activators.get(activator) is command:
+                del self._activators[activator]
+                self._activatorTrie.remove(activator)
+        self.registryVersion += 1
+
+    # Removes a command (and its activators) from every lookup
+    def _removeCommand(self, command: AbstractCommand):
+        self._removeActivators(command)
+        del self._commandDict[command.NAME]
+        if self._nameTrie.get(command.NAME.lower()) is command:
+            self._nameTrie.remove(command.NAME.lower())
+            # Give the case insensitive name to another command with the same name, if there is one
+            for otherCommand in self._commandDict.values():
+                if otherCommand.NAME.lower() == command.NAME.lower():
+                    self._nameTrie.add(otherCommand.NAME.lower(), otherCommand)
+                    break
+
+    # Registers the placeholder commands of a lazy module, using the information saved in the module manifest
+    def registerLazy(self, module: LazyModule) -> list[LazyCommand]:
+        Logger.debug(f"Registering Placeholder Commands For Lazy Module {module.NAME}", module="lazy-module")
+        commands = [
+            LazyCommand(
+                commandInfo["name"],
+                commandInfo["description"],
+                commandInfo["version"],
+                False,
+                self,
+                module,
+                ACTIVATORS=list(commandInfo["activators"]),
+                OP=commandInfo["op"]
+            )
+            for commandInfo in module.COMMANDS
+        ]
+
+        # Check everything first, so a conflict does not leave half of the module registered
+        activators = [activator for command in commands for activator in command.ACTIVATORS]
+        for command in commands:
+            if command.NAME in self._commandDict:
+                raise InitRegisterError(f"Command {command.NAME} has already been registered!")
+        for activator in activators:
+            if activator in self._activators or activators.count(activator) > 1:
+                raise InitRegisterError(f"Another Command Has Already Registered Command Activator {activator}")
+
+        for command in commands:
+            self._addCommand(command)
+        return commands
+
+    # Removes the placeholder commands of a lazy module, so the real commands can be registered
+    def unregisterLazy(self, module: LazyModule):
+        for command in list(self._commandDict.values()):
+            if isinstance(command, LazyCommand) and command.MODULE is module:
+                self._removeCommand(command)
+
+    # Returns the real command for placeholder commands, loading their lazy module
+    def loadLazyCommand(self, command: AbstractCommand) -> AbstractCommand:
+        if not isinstance(command, LazyCommand):
+            return command
+        try:
+            ModuleManager.loadLazyModule(command.MODULE.NAME)
+        except ModuleError:
+            raise CommandError(f"Command {command.NAME} Failed To Load!")
+        return self._commandDict[command.NAME]
+
     # Generate a Pretty List of Commands
     def generateTable(self):
         try:
@@ -337,24 +466,53 @@ class _CommandManager(AbstractManager):
             Logger.error(f"Error While Printing Table - {type(e).__name__}: {e}", module="table")
             return None
 
+    # Returns every activator starting with prefix, in alphabetical order. Used for completing commands
+    def getActivatorsWithPrefix(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        activators = []
+        for activator, _ in self._activatorTrie.withPrefix(prefix):
+            if limit is not None and len(activators) >= limit:
+                break
+            activators.append(activator)
+        return activators
+
+    # Returns activators the player might have meant when a command is not found
+    # Activators starting with name come first (i.e. /hookp -> /hookprofile), then activators within a few typos
+    def suggestActivators(self, name: str, limit: int = 2) -> list[str]:
+        if not name:
+            return []
+        suggestions = self.getActivatorsWithPrefix(name, limit=limit)
+        if len(suggestions) < limit:
+            # Allow more typos for longer names, but not so many that everything matches
+            maxDistance = 1 if len(name) <= 4 else 2
+            for _, activator, _ in self._activatorTrie.closest(name, maxDistance):
+                if activator not in suggestions:
+                    suggestions.append(activator)
+        return suggestions[:limit]
+
     # FUnction To Get Command Object From Command Name
-    def getCommandFromName(self, name: str) -> AbstractCommand:
+    # If loadLazy is False, placeholder commands of lazy modules are returned as is (see loadLazyCommand)
+    def getCommandFromName(self, name: str, loadLazy: bool = True) -> AbstractCommand:
         if name in self._activators:
-            return self._activators[name]
+            if not loadLazy:
+                return self._activators[name]
+            return self.loadLazyCommand(self._activators[name])
+        suggestions = self.suggestActivators(name)
+        if suggestions:
+            raise CommandError(f"Unknown Command '{name}'. Try {', '.join(['/' + activator for activator in suggestions])}")
         raise CommandError(f"Unknown Command '{name}'")
 
     # Function To Get Command Object From Command Name
     def getCommand(self, command: str, ignoreCase: bool = True) -> AbstractCommand:
         if ignoreCase:
-            for cName, cObject in self._commandDict.items():
-                if cName.lower() == command.lower():
-                    return cObject
-            raise KeyError(command)
-        return self._commandDict[command]
+            cObject = self._nameTrie.get(command.lower())
+            if cObject is None:
+                raise KeyError(command)
+            return self.loadLazyCommand(cObject)
+        return self.loadLazyCommand(self._commandDict[command])
 
     # Function To Get Command Object From Command Name
     def getCommandFromActivator(self, command: str) -> AbstractCommand:
-        return self._activators[command]
+        return self.loadLazyCommand(self._activators[command])
 
     # Handles _CommandManager["item"]
     def __getitem__(self, *args, **kwargs) -> AbstractCommand:
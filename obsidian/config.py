@@ -10,6 +10,7 @@ import copy
 from obsidian.constants import SERVER_PATH
 from obsidian.types import UsernameType, IpType
 from obsidian.log import Logger
+from obsidian.utils.iptrie import IpPrefixTrie
 
 
 @dataclass
@@ -150,6 +151,9 @@ class AbstractConfig:
 class ServerConfig(AbstractConfig):
     # Module Configuration
     moduleIgnoreList: list[str] = field(default_factory=list)  # Module Init Ignore List
+    flattenMixins: bool = True  # Compile the mixins of each method into one function after all modules are loaded
+    debugMixins: bool = False  # Log every mixin chain after all modules are loaded
+    moduleManifest: bool = True  # Reuse the module list and dependency graph from the last start if no module files changed
     # Server Configuration
     operatorsList: list[UsernameType] = field(default_factory=list)  # List Of Operators
     bannedIps: list[IpType] = field(default_factory=list)  # List Of Ips that are banned (Reject Connection)
@@ -186,10 +190,92 @@ class ServerConfig(AbstractConfig):
     checkValidSpawn: bool = True  # Check if the world spawn is valid. If not, generate new one!
     gzipCompressionLevel: int = 9  # Int Containing Level Of Gzip Compression
     defaultMOTD: list[str] = field(default_factory=lambda: ["&aServer Powered By Obsidian"])  # Default MOTD
+    # Network Configuration
+    movementUpdateInterval: float = 0.0  # Minimum seconds between position updates of one player sent to a client. 0 to send every update
+    movementBacklogThreshold: int = 16384  # Size (in bytes) of a client's write buffer before position updates to it start getting throttled
+    movementMaxInterval: float = 1.0  # Maximum seconds between position updates sent to a throttled client
+    movementFarDistance: int = 64  # Distance (in blocks) past which players receive position updates at a reduced rate. -1 to disable
+    movementFarInterval: float = 0.2  # Minimum seconds between position updates for far away players
+    sendTimeout: float = 15  # Seconds a client can go without reading sent data before it is considered stalled
+    maxWriteBufferSize: int = 1048576  # Size (in bytes) of a client's write buffer before it is considered a slow client. -1 to disable
+    slowClientPolicy: str = "kick"  # Action taken on slow clients. "kick" disconnects them, "throttle" drops chat and slows position updates to them until they catch up, only disconnecting them if they stall for sendTimeout
+    # Socket Configuration
+    tcpNoDelay: bool = True  # Send packets right away instead of batching small packets together (Nagle's algorithm)
+    socketSendBufferSize: Optional[int] = None  # Size (in bytes) of the kernel send buffer of each connection. None to use OS default
+    socketReceiveBufferSize: Optional[int] = None  # Size (in bytes) of the kernel receive buffer of each connection. None to use OS default
+    listenBacklog: int = 100  # Max number of connections waiting to be accepted
+    # Connection Admission Configuration
+    connectionRateLimit: float = 20  # Max new connections per second across the whole server. -1 to disable
+    connectionBurst: int = 50  # Max number of new connections accepted at once across the whole server
+    ipConnectionRateLimit: float = 1  # Max new connections per second from a single ip. -1 to disable
+    ipConnectionBurst: int = 5  # Max number of new connections accepted at once from a single ip
+    maxHandshakingConnections: int = 64  # Max number of connections logging in at the same time. -1 to disable
+    handshakeTimeout: float = 5  # Seconds a new connection has to finish the login protocol (identification and CPE negotiation)
     # Logger Configuration
     logBuffer: int = 1  # Number of Log Messages to be buffered before flushed to file
+    asyncLogging: bool = True  # Write logs from a background thread, so slow consoles and disks do not stall the server
+    logQueueSize: int = 10000  # Max number of log messages waiting to be written by the background thread
+    logOverflowPolicy: str = "dropNew"  # What to do when the log queue is full. "dropNew", "dropOld", or "block"
+    jsonLogging: bool = False  # Also write structured JSON-lines logs to logs/json
+    jsonLogMaxSize: int = 16777216  # Size in bytes before starting a new JSON log file. -1 to disable
+    jsonLogRotateInterval: int = 86400  # Seconds before starting a new JSON log file. -1 to disable
+    jsonLogMaxSegments: int = 30  # Number of old (compressed) JSON log files to keep. -1 to keep all
+    startupReportSteps: int = 5  # Number of slowest startup steps (module imports, world loads, etc) logged once initialized
+    # Metrics Configuration
+    metricsEnabled: bool = False  # Record performance metrics (packets, bytes, save and map send times, etc)
+    metricsPort: int = -1  # Serve metrics in Prometheus text format on this port (localhost only). -1 to disable. Workers use port + worker id
     # Default World Generation Config
     worldSizeX: int = 256  # Default Size X
     worldSizeY: int = 256  # Default Size Y
     worldSizeZ: int = 256  # Default Size Z
     worldSeed: Optional[int] = None
+
+    def __post_init__(self, *args, **kwargs):
+        # Build lookups with default values, in case config is never loaded
+        self.rebuildLookups()
+        super().__post_init__(*args, **kwargs)
+
+    # The list-based configs are stored as lists in the config file, but are checked on every connection, login, and block placement.
+    # Materialize them into sets (and a prefix trie for CIDR ip ranges), which are rebuilt every time the config is loaded or saved.
+    def rebuildLookups(self):
+        Logger.debug("Rebuilding Config Lookups", module="config")
+        self._bannedIpSet: set[str] = {ip for ip in self.bannedIps if "/" not in ip}
+        self._bannedIpRanges: IpPrefixTrie = IpPrefixTrie()
+        for ipRange in self.bannedIps:
+            if "/" in ipRange:
+                try:
+                    self._bannedIpRanges.add(ipRange)
+                except ValueError:
+                    Logger.warn(f"Ignoring Invalid Banned Ip Range {ipRange}", module="config")
+        self._bannedPlayerSet: set[str] = set(self.bannedPlayers)
+        self._operatorSet: set[str] = set(self.operatorsList)
+        # Count changes to disabled commands, so anything built from them (i.e. help pages) knows when to rebuild
+        disabledCommandSet = set(self.disabledCommands)
+        if disabledCommandSet != getattr(self, "_disabledCommandSet", None):
+            self.disabledCommandsVersion: int = getattr(self, "disabledCommandsVersion", 0) + 1
+        self._disabledCommandSet: set[str] = disabledCommandSet
+        self._disallowedBlockSet: set[int] = set(self.disallowedBlocks)
+
+    def _load(self, fileIO: io.TextIOWrapper):
+        super()._load(fileIO)
+        self.rebuildLookups()
+
+    def _save(self, fileIO: io.TextIOWrapper):
+        super()._save(fileIO)
+        self.rebuildLookups()
+
+    def isIpBanned(self, ip: str) -> bool:
+        # Only walk the range trie if there are any banned ranges
+        return ip in self._bannedIpSet or (len(self._bannedIpRanges) > 0 and ip in self._bannedIpRanges)
+
+    def isPlayerBanned(self, username: str) -> bool:
+        return username in self._bannedPlayerSet
+
+    def isOperator(self, username: str) -> bool:
+        return username in self._operatorSet
+
+    def isCommandDisabled(self, commandName: str) -> bool:
+        return commandName in self._disabledCommandSet
+
+    def isBlockDisallowed(self, blockId: int) -> bool:
+        return blockId in self._disallowedBlockSet
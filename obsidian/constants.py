@@ -27,12 +27,16 @@ CRITICAL_RESPONSE_ERRORS = [
 # Message Constants
 MAX_MESSAGE_LENGTH = 64
 
+# CPE Constants
+MAX_CPE_EXTENSIONS = 256  # Max number of extensions a client can announce during CPE negotiation
+
 # Console Color
 CSI = "\u001b["  # ANSI Color Header
 
 # Module Constants
 MODULES_FOLDER = "modules"
 MODULES_IMPORT = "obsidian.modules"
+MODULES_MANIFEST = "cache/modules.json"
 
 # Managers
 # Dynamically generated list of registered managers.
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 from pathlib import Path
+from collections import deque
 import time
 import traceback
 import datetime
+import threading
+import atexit
 import sys
+import re
 
-from typing import Optional
-from obsidian.constants import Color, SERVER_PATH
+from typing import Optional, Callable, Any
+from contextvars import ContextVar
+from obsidian.constants import Color, CSI, SERVER_PATH
+from obsidian.logsink import JsonLogSink
+
+# Player whose connection is currently being handled. Set by the network handler,
+# and used to tag structured log records with the player and world they came from.
+_logPlayer: ContextVar[Any] = ContextVar("logPlayer", default=None)
+# Matches ANSI color codes, which are left out of structured log records
+_colorCodes = re.compile(re.escape(CSI) + r"[0-9;]*m")
 
 
 class Logger:
@@ -15,11 +27,23 @@ class Logger:
     VERBOSE = False
     SERVER_MODE = False
     LOGFILE = None
+    JSON_SINK: Optional[JsonLogSink] = None
     COLOR = Color.SYSTEM_SUPPORTS_COLORS
     # These might be somewhat dangerous if the server crashes and stuff isn't logged.
     # Either way, its an option for servers with slower RWs.
     BUFFER_SIZE = 1
     MESSAGES_LOGGED = 0
+    # Background Writer. While running, log records are queued and formatted / written by a separate thread,
+    # so slow consoles and disks do not block the caller (usually the event loop).
+    QUEUE: Optional[deque] = None
+    QUEUE_SIZE = 10000  # Max number of records waiting to be written
+    OVERFLOW_POLICY = "dropNew"  # What to do when the queue is full. Either "dropNew", "dropOld", or "block"
+    BATCH_SIZE = 1000  # Max number of records written at once
+    MESSAGES_DROPPED = 0
+    _writerThread: Optional[threading.Thread] = None
+    _writerWake: threading.Event = threading.Event()
+    _writerStopping: bool = False
+    _writerBusy: bool = False
 
     @staticmethod
     def _getTimestamp():
@@ -43,8 +67,165 @@ class Logger:
         print(f"Logging to {logPath}")
 
     @classmethod
-    def _log(cls, message: str, tags: tuple[str, ...] = tuple(), color: str = Color.NONE, textColor: str = Color.NONE):
-        cls.MESSAGES_LOGGED += 1
+    def setupJsonLog(cls, logPath: Optional[Path] = None, name: str = "obsidian", maxSize: int = -1, rotateInterval: float = -1, maxSegments: int = -1):
+        # Setup LogPath If Not Defined
+        if logPath is None:
+            logPath = Path(SERVER_PATH, "logs", "json")
+        # Close previous sink, if any
+        cls.closeJsonLog()
+        cls.JSON_SINK = JsonLogSink(logPath, name=name, maxSize=maxSize, rotateInterval=rotateInterval, maxSegments=maxSegments)
+        # Make sure the file is closed cleanly when the process exits
+        atexit.register(cls.closeJsonLog)
+
+    @classmethod
+    def closeJsonLog(cls):
+        if cls.JSON_SINK is not None:
+            cls.JSON_SINK.close()
+            cls.JSON_SINK = None
+
+    @classmethod
+    def setPlayerContext(cls, player: Any):
+        # Tag log records made from the current task (and tasks it creates) with this player
+        _logPlayer.set(player)
+
+    @classmethod
+    def startWriter(cls, queueSize: Optional[int] = None, overflowPolicy: Optional[str] = None):
+        # Start the background writer thread. Safe to call multiple times
+        if queueSize is not None:
+            cls.QUEUE_SIZE = queueSize
+        if overflowPolicy is not None:
+            if overflowPolicy not in ("dropNew", "dropOld", "block"):
+                raise ValueError(f"Unknown Log Overflow Policy {overflowPolicy}")
+            cls.OVERFLOW_POLICY = overflowPolicy
+        if cls._writerThread is not None and cls._writerThread.is_alive():
+            return
+
+        cls._writerStopping = False
+        cls.QUEUE = deque()
+        cls._writerThread = threading.Thread(target=cls._writerLoop, name="LogWriter", daemon=True)
+        cls._writerThread.start()
+        # Make sure queued records are written when the process exits
+        atexit.register(cls.stopWriter)
+
+    @classmethod
+    def stopWriter(cls):
+        # Stop the background writer, writing out anything still queued
+        queue, writerThread = cls.QUEUE, cls._writerThread
+        if queue is None or writerThread is None:
+            return
+        cls._writerStopping = True
+        cls._writerWake.set()
+        writerThread.join(timeout=5)
+
+        # Go back to writing directly. Write out anything the writer did not get to
+        cls.QUEUE = None
+        cls._writerThread = None
+        if queue:
+            cls._writeRecords(list(queue))
+
+    @classmethod
+    def flush(cls):
+        # Wait until the background writer has written everything queued so far
+        while cls.QUEUE and cls._writerThread is not None and cls._writerThread.is_alive():
+            time.sleep(0.005)
+        while cls._writerBusy:
+            time.sleep(0.005)
+        if cls.LOGFILE is not None:
+            cls.LOGFILE.flush()
+
+    @classmethod
+    def _writerLoop(cls):
+        queue = cls.QUEUE
+        if queue is None:
+            return
+        reportedDrops = 0
+        while True:
+            # Sleep until woken up or until the next poll. Producers do not wake the writer, to keep logging cheap
+            if not queue:
+                if cls._writerStopping:
+                    return
+                cls._writerWake.wait(0.05)
+                cls._writerWake.clear()
+                continue
+
+            # Take a batch of records off the queue
+            cls._writerBusy = True
+            batch = []
+            try:
+                while len(batch) < cls.BATCH_SIZE:
+                    batch.append(queue.popleft())
+            except IndexError:
+                pass
+
+            # Let the user know if messages were dropped since the last batch
+            if cls.MESSAGES_DROPPED != reportedDrops:
+                batch.append((
+                    f"Log Queue Full! Dropped {cls.MESSAGES_DROPPED - reportedDrops} Log Messages",
+                    (cls._getTimestamp(), "warn", "logger"),
+                    Color.YELLOW,
+                    Color.WHITE,
+                    None
+                ))
+                reportedDrops = cls.MESSAGES_DROPPED
+
+            cls._writeRecords(batch, flushFile=True)
+            cls._writerBusy = False
+
+    @classmethod
+    def _enqueue(cls, queue: deque, record: tuple):
+        # Check if queue is full, and handle overflow according to policy
+        if len(queue) >= cls.QUEUE_SIZE:
+            if cls.OVERFLOW_POLICY == "block":
+                while len(queue) >= cls.QUEUE_SIZE and cls._writerThread is not None and cls._writerThread.is_alive():
+                    cls._writerWake.set()
+                    time.sleep(0.001)
+            elif cls.OVERFLOW_POLICY == "dropOld":
+                try:
+                    queue.popleft()
+                except IndexError:
+                    pass
+                cls.MESSAGES_DROPPED += 1
+            else:
+                cls.MESSAGES_DROPPED += 1
+                return
+        queue.append(record)
+
+    @classmethod
+    def _writeRecords(cls, records: list[tuple], flushFile: bool = False):
+        # Format and write multiple records at once
+        consoleLines = []
+        fileLines = []
+        for message, tags, color, textColor, _ in records:
+            consoleOutput, fileOutput = cls._formatRecord(message, tags, color, textColor)
+            consoleLines.append(consoleOutput)
+            fileLines.append(fileOutput)
+
+        # Log Structured Records Into JSON Log (If Fail Skip)
+        if cls.JSON_SINK is not None:
+            try:
+                cls.JSON_SINK.write([cls._formatJson(record) for record in records])
+            except Exception as e:
+                print(f"Error While Handing Log Message - {type(e).__name__}: {e}")
+
+        # Log Strings Into LogFile (If Fail Skip)
+        if cls.LOGFILE is not None:
+            try:
+                cls.LOGFILE.write("".join(fileLines))
+                if flushFile:
+                    cls.LOGFILE.flush()
+            except Exception as e:
+                print(f"Error While Handing Log Message - {type(e).__name__}: {e}")
+
+        # Print Final Strings
+        try:
+            sys.stdout.write("\n".join(consoleLines) + "\n")
+            sys.stdout.flush()
+        except Exception:
+            pass
+
+    @classmethod
+    def _formatRecord(cls, message: str, tags: tuple[str, ...], color: str, textColor: str) -> tuple[str, str]:
+        # Generates the console output (with colors) and the log file output for a log record
         # Generating Message (Add Tags, Message, Format, Etc)
         output = ""
         # Adding Tags
@@ -64,24 +245,74 @@ class Logger:
                 output += f"{textColor}{message}{Color.BACK_RESET}"
             else:
                 output += f"{message}"
+        # Reset color at the end of the line
+        output += Color.RESET
+
+        # Generate Log File Output (Tags and Message, No Colors)
+        fileOutput = "".join(f"[{str(tag).upper()}]" for tag in tags)
+        if len(tags) != 0:
+            fileOutput += f": {message}\n"
+        else:
+            fileOutput += f"{message}\n"
+
+        return output, fileOutput
+
+    @staticmethod
+    def _getContext() -> tuple[float, Optional[str], Optional[str]]:
+        # Capture when and for which player / world a record was logged.
+        # Done by the caller, as the background writer runs in a different thread (and context).
+        player = _logPlayer.get()
+        if player is None:
+            return time.time(), None, None
+        worldPlayerManager = getattr(player, "worldPlayerManager", None)
+        return time.time(), getattr(player, "name", None), worldPlayerManager.world.name if worldPlayerManager is not None else None
+
+    @classmethod
+    def _formatJson(cls, record: tuple) -> dict[str, Any]:
+        # Generates the structured JSON log entry for a log record
+        message, tags, _, _, context = record
+        timestamp, player, world = context if context is not None else (time.time(), None, None)
+        if CSI in message:
+            message = _colorCodes.sub("", message)
+        entry: dict[str, Any] = {
+            "timestamp": datetime.datetime.fromtimestamp(timestamp).astimezone().isoformat(timespec="milliseconds"),
+            "level": tags[1] if len(tags) > 1 else None,
+            "module": tags[2] if len(tags) > 2 else None,
+            "message": message
+        }
+        if player is not None:
+            entry["player"] = player
+        if world is not None:
+            entry["world"] = world
+        return entry
+
+    @classmethod
+    def _log(cls, message: str, tags: tuple[str, ...] = tuple(), color: str = Color.NONE, textColor: str = Color.NONE):
+        cls.MESSAGES_LOGGED += 1
+        # If the background writer is running, leave formatting and writing to it
+        context = cls._getContext() if cls.JSON_SINK is not None else None
+        queue = cls.QUEUE
+        if queue is not None:
+            cls._enqueue(queue, (message, tags, color, textColor, context))
+            return
+
+        # Otherwise, write it out right away
+        output, fileOutput = cls._formatRecord(message, tags, color, textColor)
+        # Log Structured Record Into JSON Log (If Fail Skip)
+        if cls.JSON_SINK is not None:
+            try:
+                cls.JSON_SINK.write([cls._formatJson((message, tags, color, textColor, context))])
+            except Exception as e:
+                print(f"Error While Handing Log Message - {type(e).__name__}: {e}")
         # Log String Into LogFile (If Fail Skip)
         if cls.LOGFILE is not None:
             try:
-                # Write Tags
-                for tag in tags:
-                    cls.LOGFILE.write(f"[{str(tag).upper()}]")
-                # Write Message
-                if len(tags) != 0:
-                    cls.LOGFILE.write(f": {message}\n")
-                else:
-                    cls.LOGFILE.write(f"{message}\n")
+                cls.LOGFILE.write(fileOutput)
                 # Save File If Buffer Is Reached
                 if cls.MESSAGES_LOGGED % cls.BUFFER_SIZE == 0:
                     cls.LOGFILE.flush()
             except Exception as e:
                 print(f"Error While Handing Log Message - {type(e).__name__}: {e}")
-        # Reset color at the end of the line
-        output += Color.RESET
         # Print Final String
         print(output)
 
@@ -91,6 +322,8 @@ class Logger:
             while True:
                 # Give user Warning, and ask them for further input
                 cls.warn(f"{message} (y/n)", module="confirmation")
+                # Make sure the prompt is shown before waiting for input
+                cls.flush()
                 userInput = input()
                 if userInput.lower() in ["y", "yes"]:
                     cls._log("")
@@ -147,9 +380,14 @@ class Logger:
             textColor=Color.WHITE
         )
 
+    # Debug and verbose messages can be passed in as a callable (such as lambda: f"..."),
+    # which is only called to render the message if that log level is enabled.
+    # For very hot code (loops), check Logger.DEBUG or Logger.VERBOSE before logging instead.
     @classmethod
-    def debug(cls, message: str, module: str = "unknown"):
+    def debug(cls, message: str | Callable[[], str], module: str = "unknown"):
         if cls.DEBUG:
+            if callable(message):
+                message = message()
             cls._log(
                 str(message),
                 tags=(cls._getTimestamp(), "debug", module),
@@ -158,8 +396,11 @@ class Logger:
             )
 
     @classmethod
-    def verbose(cls, message: str, module: str = "unknown"):
-        if cls.DEBUG and cls.VERBOSE:
+    def verbose(cls, message: str | Callable[[], str], module: str = "unknown"):
+        # VERBOSE is checked first, as it is off far more often than DEBUG
+        if cls.VERBOSE and cls.DEBUG:
+            if callable(message):
+                message = message()
             cls._log(
                 str(message),
                 tags=(cls._getTimestamp(), "verbose", module),
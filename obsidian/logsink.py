@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Optional, Any, TextIO
+from pathlib import Path
+import datetime
+import threading
+import shutil
+import gzip
+import json
+import time
+import os
+
+
+# Writes log records as JSON lines, starting a new file once the current one gets too big or too old.
+# Rotated files are gzipped by a background thread, and only the newest maxSegments of them are kept.
+class JsonLogSink:
+    def __init__(
+        self,
+        logPath: Path,
+        name: str = "obsidian",
+        maxSize: int = -1,  # Max size of a file in bytes before rotating. -1 to disable
+        rotateInterval: float = -1,  # Max age of a file in seconds before rotating. -1 to disable
+        maxSegments: int = -1  # Max number of rotated files to keep. -1 to keep all
+    ):
+        self.logPath: Path = logPath
+        self.name: str = name
+        self.maxSize: int = maxSize
+        self.rotateInterval: float = rotateInterval
+        self.maxSegments: int = maxSegments
+        self._lock: threading.Lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._size: int = 0
+        self._openedAt: float = 0
+
+        # Open current file
+        self.logPath.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+        # Clean up after a previous run that was stopped while compressing
+        for tempFile in self.logPath.glob(f"{self.name}.*.jsonl.gz.tmp"):
+            tempFile.unlink()
+        leftovers = sorted(self.logPath.glob(f"{self.name}.*.jsonl"))
+        if leftovers:
+            self._startCompression(leftovers)
+
+    @property
+    def filePath(self) -> Path:
+        return Path(self.logPath, f"{self.name}.jsonl")
+
+    def _open(self):
+        self._file = open(self.filePath, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._openedAt = time.time()
+
+    def write(self, records: list[dict[str, Any]]):
+        with self._lock:
+            # Sink may have been closed while the process is exiting
+            if self._file is None:
+                return
+
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            self._file.write(data)
+            self._file.flush()
+            # Size is tracked in bytes (not characters), to match the file size read when opening it
+            self._size += len(data.encode("utf-8"))
+
+            # Check if its time to start a new file
+            if (self.maxSize >= 0 and self._size >= self.maxSize) or (self.rotateInterval >= 0 and time.time() - self._openedAt >= self.rotateInterval):
+                self._rotate()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+
+        # Rename the current file, and open a new one in its place
+        rotatedPath = Path(self.logPath, f"{self.name}.{datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S-%f')}.jsonl")
+        os.replace(self.filePath, rotatedPath)
+        self._open()
+
+        self._startCompression([rotatedPath])
+
+    def _startCompression(self, segments: list[Path]):
+        threading.Thread(target=self._compressSegments, args=(segments,), name="LogCompressor", daemon=True).start()
+
+    def _compressSegments(self, segments: list[Path]):
+        for segment in segments:
+            try:
+                # Compress into a temporary file first, so a half written file is never mistaken for a finished one
+                tempPath = segment.with_suffix(".jsonl.gz.tmp")
+                with open(segment, "rb") as sourceFile, gzip.open(tempPath, "wb") as compressedFile:
+                    shutil.copyfileobj(sourceFile, compressedFile)
+                os.replace(tempPath, segment.with_suffix(".jsonl.gz"))
+                segment.unlink()
+            except OSError as e:
+                # Not using Logger, as that would write back into this sink
+                print(f"Error While Compressing Log File {segment} - {type(e).__name__}: {e}")
+
+        # Remove the oldest segments
+        if self.maxSegments >= 0:
+            compressedSegments = sorted(self.logPath.glob(f"{self.name}.*.jsonl.gz"))
+            for oldSegment in compressedSegments[:max(0, len(compressedSegments) - self.maxSegments)]:
+                try:
+                    oldSegment.unlink()
+                except OSError as e:
+                    print(f"Error While Removing Old Log File {oldSegment} - {type(e).__name__}: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from typing import Optional, Callable, Iterable, Type, TypeVar
+import asyncio
+import bisect
+import math
+
+from obsidian.log import Logger
+
+T = TypeVar("T", bound="AbstractMetric")
+
+# Default histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _formatValue(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _escapeLabel(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatLabels(labelNames: tuple[str, ...], labelValues: tuple[str, ...], extra: str = "") -> str:
+    labels = [f'{name}="{_escapeLabel(str(value))}"' for name, value in zip(labelNames, labelValues)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+# Base class for all metrics. Metrics with labels keep one child metric per combination of label values.
+class AbstractMetric:
+    TYPE: str = "untyped"
+
+    def __init__(self, name: str, description: str, labelNames: tuple[str, ...] = tuple()):
+        self.name: str = name
+        self.description: str = description
+        self.labelNames: tuple[str, ...] = labelNames
+        self._children: dict[tuple[str, ...], AbstractMetric] = {}
+
+    def labels(self: T, *labelValues: str) -> T:
+        child = self._children.get(labelValues)
+        if child is None:
+            if len(labelValues) != len(self.labelNames):
+                raise ValueError(f"Metric {self.name} Expects Labels {self.labelNames}, Got {labelValues}")
+            child = self._children[labelValues] = self._createChild()
+        return child
+
+    def _createChild(self):
+        return type(self)(self.name, self.description)
+
+    def samples(self) -> Iterable[tuple[str, tuple[str, ...], str, float]]:
+        # Returns (name suffix, label values, extra label, value) for every sample of the metric
+        if self.labelNames:
+            for labelValues, child in list(self._children.items()):
+                for suffix, _, extra, value in child.samples():
+                    yield suffix, labelValues, extra, value
+        else:
+            yield from self._ownSamples()
+
+    def _ownSamples(self) -> Iterable[tuple[str, tuple[str, ...], str, float]]:
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.TYPE}"]
+        for suffix, labelValues, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_formatLabels(self.labelNames, labelValues, extra)} {_formatValue(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(AbstractMetric):
+    TYPE = "counter"
+
+    def __init__(self, *args, function: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value: float = 0
+        # If set, the value is read when metrics are collected instead of being recorded.
+        # The function must only ever go up, like a recorded counter.
+        self.function: Optional[Callable[[], float]] = function
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def _ownSamples(self):
+        if self.function is not None:
+            yield "", tuple(), "", self.function()
+        else:
+            yield "", tuple(), "", self.value
+
+
+class Gauge(AbstractMetric):
+    TYPE = "gauge"
+
+    def __init__(self, *args, function: Optional[Callable[[], float | dict[tuple[str, ...], float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value: float = 0
+        # If set, the value is read when metrics are collected instead of being recorded.
+        # For gauges with labels, returns a dict of {label values: value}
+        self.function: Optional[Callable[[], float | dict[tuple[str, ...], float]]] = function
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def samples(self):
+        if self.function is None:
+            yield from super().samples()
+            return
+
+        result = self.function()
+        if isinstance(result, dict):
+            for labelValues, value in result.items():
+                yield "", labelValues, "", value
+        else:
+            yield "", tuple(), "", result
+
+    def _ownSamples(self):
+        yield "", tuple(), "", self.value
+
+
+class Histogram(AbstractMetric):
+    TYPE = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)  # Last slot is for values above every bucket
+        self.sum: float = 0
+        self.count: int = 0
+
+    def _createChild(self):
+        return Histogram(self.name, self.description, buckets=self.buckets)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def _ownSamples(self):
+        cumulative = 0
+        for bucket, bucketCount in zip(self.buckets, self.counts):
+            cumulative += bucketCount
+            yield "_bucket", tuple(), f'le="{_formatValue(float(bucket))}"', cumulative
+        yield "_bucket", tuple(), 'le="+Inf"', self.count
+        yield "_sum", tuple(), "", self.sum
+        yield "_count", tuple(), "", self.count
+
+
+class _MetricsManager:
+    def __init__(self):
+        # Recording is off by default. Instrumented code checks this flag before recording anything,
+        # so metrics cost a single attribute lookup when unused.
+        self.ENABLED: bool = False
+        self._metrics: dict[str, AbstractMetric] = {}
+
+    def _register(self, metricType: Type[T], name: str, description: str, labelNames: tuple[str, ...], **kwargs) -> T:
+        # Return existing metric if it was already registered (e.g. module was reloaded)
+        if name in self._metrics:
+            metric = self._metrics[name]
+            if not isinstance(metric, metricType):
+                raise ValueError(f"Metric {name} Already Registered As {type(metric).__name__}")
+            return metric
+
+        metric = metricType(name, description, labelNames, **kwargs)
+        self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labelNames: tuple[str, ...] = tuple(), function: Optional[Callable] = None) -> Counter:
+        counter = self._register(Counter, name, description, labelNames)
+        if function is not None:
+            counter.function = function
+        return counter
+
+    def gauge(self, name: str, description: str, labelNames: tuple[str, ...] = tuple(), function: Optional[Callable] = None) -> Gauge:
+        gauge = self._register(Gauge, name, description, labelNames)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name: str, description: str, labelNames: tuple[str, ...] = tuple(), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, description, labelNames, buckets=buckets)
+
+    def getMetric(self, name: str) -> AbstractMetric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        # Generates all metrics in the Prometheus text exposition format
+        output = []
+        for metric in list(self._metrics.values()):
+            try:
+                output.append(metric.render())
+            except Exception as e:
+                Logger.error(f"Error While Collecting Metric {metric.name} - {type(e).__name__}: {e}", module="metrics")
+        return "".join(output)
+
+    # Handles Dictionary Type Syntax
+    def __getitem__(self, *args, **kwargs) -> AbstractMetric:
+        return self.getMetric(*args, **kwargs)
+
+    # Handles Length Function
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+
+# Serves metrics over plain HTTP, for Prometheus (or curl) to scrape
+class MetricsServer:
+    def __init__(self, address: str, port: int, timeout: float = 5):
+        self.address: str = address
+        self.port: int = port
+        self.timeout: float = timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handleRequest, self.address, self.port)
+        Logger.info(f"Serving Metrics On http://{self.address}:{self.port}/metrics", module="metrics")
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _handleRequest(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Read request line, and skip over the headers
+            requestLine = await asyncio.wait_for(reader.readline(), self.timeout)
+            while True:
+                headerLine = await asyncio.wait_for(reader.readline(), self.timeout)
+                if headerLine in (b"\r\n", b"\n", b""):
+                    break
+
+            # Generate response
+            method, path, *_ = requestLine.decode("ascii", errors="replace").split() + ["", ""]
+            if method not in ("GET", "HEAD"):
+                status, body = "405 Method Not Allowed", b"Method Not Allowed\n"
+            elif path.split("?")[0] not in ("/", "/metrics"):
+                status, body = "404 Not Found", b"Not Found\n"
+            else:
+                status, body = "200 OK", MetricsManager.render().encode("utf-8")
+
+            # Send response
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n"
+                "\r\n".encode("ascii")
+            )
+            if method != "HEAD":
+                writer.write(body)
+            await asyncio.wait_for(writer.drain(), self.timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            Logger.error(f"Error While Serving Metrics - {type(e).__name__}: {e}", module="metrics")
+        finally:
+            writer.close()
+
+
+# Creates Global MetricsManager As Singleton
+MetricsManager = _MetricsManager()
@@ -1,6 +1,9 @@
+from dataclasses import dataclass, field
 from typing import Optional, Callable, Type, Any
+from contextvars import ContextVar
 from enum import Enum
 import inspect
+import time
 
 from obsidian.log import Logger
 from obsidian.errors import MixinError
@@ -13,9 +16,342 @@ class InjectionPoint(Enum):
     AFTER = "after"
 
 
+# Call statistics of one hook (or of a whole mixin chain), collected while instrumentation is enabled
+@dataclass
+class HookStats:
+    method: str  # Method the hook is applied to
+    hook: Optional[str]  # Name of the hook. None for the whole mixin chain
+    source: str  # Python module the hook was defined in
+    calls: int = 0
+    totalTime: float = 0  # Seconds spent in the hook, including hooks it called (i.e. through _super)
+    selfTime: float = 0  # Seconds spent in the hook, excluding other instrumented hooks. For a whole chain, this is the time spent outside of hooks
+
+    def record(self, elapsed: float, childTime: float):
+        self.calls += 1
+        self.totalTime += elapsed
+        self.selfTime += elapsed - childTime
+
+    def reset(self):
+        self.calls = 0
+        self.totalTime = 0
+        self.selfTime = 0
+
+
+# Time spent in child hooks of the hook currently running. Context variables keep concurrent tasks separate
+_activeHook: ContextVar[Optional[list[float]]] = ContextVar("_activeHook", default=None)
+
+
+# Wraps a hook so that its calls are timed into stats
+def _instrumentHook(hook: Callable, stats: HookStats, isAsync: bool) -> Callable:
+    if isAsync:
+        async def _asyncinstrumented(*args, **kwargs):
+            parent = _activeHook.get()
+            childTime = [0.0]
+            token = _activeHook.set(childTime)
+            start = time.perf_counter()
+            try:
+                return await hook(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _activeHook.reset(token)
+                stats.record(elapsed, childTime[0])
+                if parent is not None:
+                    parent[0] += elapsed
+        return _asyncinstrumented
+
+    def _instrumented(*args, **kwargs):
+        parent = _activeHook.get()
+        childTime = [0.0]
+        token = _activeHook.set(childTime)
+        start = time.perf_counter()
+        try:
+            return hook(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _activeHook.reset(token)
+            stats.record(elapsed, childTime[0])
+            if parent is not None:
+                parent[0] += elapsed
+    return _instrumented
+
+
+# A single mixin applied to a method.
+# Mixins are recorded so that every mixin of a method can later be compiled into one function.
+@dataclass
+class MixinLayer:
+    kind: str  # "override", "inject", "extend", or "attribute"
+    destination: Callable  # Function provided by the module
+    ctxArgs: dict[str, Any] = field(default_factory=dict)  # Additional context passed to the destination
+    at: Optional[InjectionPoint] = None  # Injection point (Only used by @Inject)
+    passResult: bool = False  # Pass output of the inner function as _output (Only used by @Inject)
+    passSuper: bool = False  # Pass the inner function as _super (Only used by @Override)
+    stats: Optional[HookStats] = None  # Created the first time the chain is instrumented
+
+    def describe(self) -> str:
+        kind = self.kind.title()
+        if self.at is not None:
+            kind += f" {self.at.value.title()}"
+        if self.passSuper:
+            kind += " (Super)"
+        if self.passResult:
+            kind += " (Result)"
+        return f"{kind} -> {getattr(self.destination, '__qualname__', self.destination)} ({getattr(self.destination, '__module__', 'Unknown')})"
+
+
+# Every mixin applied to one method, innermost first
+@dataclass
+class MixinChain:
+    parentClass: type
+    funcName: str
+    original: Callable  # Method before any mixins were applied
+    layers: list[MixinLayer] = field(default_factory=list)
+    installed: Optional[Callable] = None  # Function the mixin system last set on the parent class
+    nested: Optional[Callable] = None  # Outermost wrapper created by the mixins themselves, restored when the chain is no longer compiled
+    compilable: bool = True  # False if a mixin did not wrap the latest function, so the chain cannot be rebuilt from its layers
+    compiled: bool = False
+    instrumented: bool = False  # Whether the compiled function records call statistics
+    stats: Optional[HookStats] = None  # Statistics of the whole chain. Created the first time the chain is instrumented
+
+    @property
+    def name(self) -> str:
+        return f"{self.parentClass.__name__}.{self.funcName}"
+
+    # A single mixin is already just one wrapper around the original method, so compiling it only helps
+    # if the mixin can be installed without a wrapper at all (an override that takes no additional arguments)
+    @property
+    def benefitsFromCompiling(self) -> bool:
+        if len(self.layers) != 1:
+            return True
+        layer = self.layers[0]
+        return layer.kind == "override" and not layer.passSuper and not layer.ctxArgs
+
+    def describe(self) -> str:
+        status = "Compiled" if self.compiled else "Nested" if self.compilable else "Nested, Not Compilable"
+        if self.instrumented:
+            status += ", Instrumented"
+        lines = [f"{self.name} ({len(self.layers)} Mixins, {status})"]
+        # Outermost mixin runs first, so list it first
+        for layerNum, layer in enumerate(reversed(self.layers)):
+            lines.append(f"    {layerNum + 1}. {layer.describe()}")
+        return "\n".join(lines)
+
+
+# Kinds of hooks ran after the base function of a compiled mixin chain
+_AFTER = 0  # Returns output of the hook
+_AFTER_RESULT = 1  # Passes output of the base function as _output, returns output of the hook
+_EXTEND = 2  # Passes output of the base function as the only argument, returns output of the hook
+
+
+# Builds one function that runs the before hooks, the base function, then the after hooks.
+# The calls are unrolled into generated source, so the compiled function does no looping or branching of its own.
+def _buildFlattened(
+    base: Callable,
+    baseCtx: dict[str, Any],
+    befores: list[tuple[Callable, dict[str, Any]]],
+    afters: list[tuple[int, Callable, dict[str, Any]]],
+    isAsync: bool
+) -> Callable:
+    # If there is nothing to wrap the base function with, use it as is
+    if not befores and not afters and not baseCtx:
+        return base
+
+    namespace: dict[str, Any] = {}
+    awaitPrefix = "await " if isAsync else ""
+
+    # Helper to generate a call, only unpacking additional context if there is any
+    def generateCall(name: str, function: Callable, ctxArgs: dict[str, Any], extra: str = "") -> str:
+        namespace[name] = function
+        call = f"{awaitPrefix}{name}(*args, **kwargs"
+        if ctxArgs:
+            namespace[f"{name}Ctx"] = ctxArgs
+            call += f", **{name}Ctx"
+        return call + extra + ")"
+
+    lines = []
+    for hookNum, (hook, hookCtx) in enumerate(befores):
+        lines.append(generateCall(f"before{hookNum}", hook, hookCtx))
+    lines.append("output = " + generateCall("base", base, baseCtx))
+    for hookNum, (kind, hook, hookCtx) in enumerate(afters):
+        if kind == _EXTEND:
+            namespace[f"after{hookNum}"] = hook
+            lines.append(f"output = {awaitPrefix}after{hookNum}(output)")
+        else:
+            lines.append("output = " + generateCall(f"after{hookNum}", hook, hookCtx, ", _output=output" if kind == _AFTER_RESULT else ""))
+    lines.append("return output")
+
+    functionName = "_asyncflattened" if isAsync else "_flattened"
+    source = f"{'async ' if isAsync else ''}def {functionName}(*args, **kwargs):\n" + "".join(f"    {line}\n" for line in lines)
+    exec(compile(source, f"<mixin chain {getattr(base, '__qualname__', base)}>", "exec"), namespace)  # pylint: disable=exec-used
+    return namespace[functionName]
+
+
+# Compiles a chain of mixins into as few functions as possible.
+# Injections and extensions are inlined as before / after hooks. Overrides replace everything inside of them,
+# so the inner chain only has to be built as its own function when it is passed as _super (or when @Extend has additional context).
+# If instrument is set, every hook (and the chain as a whole) is wrapped to record call statistics.
+def _compileLayers(chain: MixinChain, instrument: bool = False) -> Callable:
+    isAsync = inspect.iscoroutinefunction(chain.original)
+    base: Callable = chain.original
+    baseCtx: dict[str, Any] = {}
+    befores: list[tuple[Callable, dict[str, Any]]] = []
+    afters: list[tuple[int, Callable, dict[str, Any]]] = []
+
+    for layer in chain.layers:
+        hook = layer.destination
+        if instrument:
+            if layer.stats is None:
+                layer.stats = HookStats(chain.name, getattr(hook, "__qualname__", str(hook)), getattr(hook, "__module__", "Unknown"))
+            hook = _instrumentHook(hook, layer.stats, isAsync)
+
+        if layer.kind == "inject" and layer.at == InjectionPoint.BEFORE:
+            # Outer before hooks run first
+            befores.insert(0, (hook, layer.ctxArgs))
+        elif layer.kind in ("inject", "attribute"):
+            afters.append((_AFTER_RESULT if layer.passResult else _AFTER, hook, layer.ctxArgs))
+        elif layer.kind == "extend" and not layer.ctxArgs:
+            afters.append((_EXTEND, hook, {}))
+        elif layer.kind == "extend":
+            # Additional context of @Extend is passed to the inner function, so everything so far becomes the base
+            base, baseCtx = _buildFlattened(base, baseCtx, befores, afters, isAsync), layer.ctxArgs
+            befores, afters = [], [(_EXTEND, hook, {})]
+        elif layer.kind == "override":
+            ctxArgs = dict(layer.ctxArgs)
+            if layer.passSuper:
+                ctxArgs["_super"] = _buildFlattened(base, baseCtx, befores, afters, isAsync)
+            base, baseCtx = hook, ctxArgs
+            befores, afters = [], []
+        else:
+            raise MixinError(f"Unknown Mixin Kind {layer.kind}")
+
+    compiledMethod = _buildFlattened(base, baseCtx, befores, afters, isAsync)
+    if instrument:
+        if chain.stats is None:
+            chain.stats = HookStats(chain.name, None, getattr(chain.original, "__module__", "Unknown"))
+        compiledMethod = _instrumentHook(compiledMethod, chain.stats, isAsync)
+    return compiledMethod
+
+
+# Keeps track of every mixin applied, so they can be compiled once all modules are loaded
+class _MixinRegistry:
+    def __init__(self):
+        self.chains: dict[tuple[type, str], MixinChain] = {}  # (Parent Class, Method Name) -> Mixin Chain
+        self.instrumented: bool = False  # Whether compiled chains record call statistics
+        self.flattened: bool = False  # Whether chains stay compiled when not instrumented (i.e. flattenMixins is enabled)
+
+    # Called by _overrideMethod every time a method is replaced
+    def record(self, parentClass: type, funcName: str, target: Callable, installed: Callable, layer: Optional[MixinLayer]):
+        chain = self.chains.get((parentClass, funcName))
+        if chain is None:
+            chain = self.chains[(parentClass, funcName)] = MixinChain(parentClass, funcName, target)
+        elif target is not chain.installed:
+            # The mixin wrapped an older version of the method, so the chain cannot be rebuilt from its layers
+            Logger.debug(f"Mixin For {chain.name} Does Not Wrap The Latest Method. Chain Will Not Be Compiled", module="mixin-compile")
+            chain.compilable = False
+
+        # Keep the nested wrappers, so they can be restored if the chain no longer needs to be compiled.
+        # Wrappers applied on top of a compiled function can not be restored that way
+        if chain.layers and (chain.compiled or chain.nested is None):
+            chain.nested = None
+        else:
+            chain.nested = installed
+
+        if layer is None:
+            chain.compilable = False
+        else:
+            chain.layers.append(layer)
+        chain.installed = installed
+        chain.compiled = False
+
+    # Replaces every mixin chain with a single compiled function (if it makes the chain faster). Returns number of chains compiled
+    def compileChains(self) -> int:
+        self.flattened = True
+        return self._updateChains()
+
+    # Recompiles every mixin chain with (or without) call statistics. Chains that cannot be compiled are never instrumented.
+    # If chains are not flattened, they are only compiled while instrumented, and put back to their nested wrappers afterwards.
+    # Returns number of chains recompiled
+    def setInstrumentation(self, enabled: bool) -> int:
+        Logger.info(f"{'Enabling' if enabled else 'Disabling'} Mixin Instrumentation", module="mixin-compile")
+        self.instrumented = enabled
+        return self._updateChains()
+
+    # Compiles (or restores the nested wrappers of) every chain to match the current flattening and instrumentation settings
+    def _updateChains(self) -> int:
+        compiledChains = 0
+        restoredChains = 0
+        for chain in self.chains.values():
+            if not chain.compilable:
+                continue
+            # Chains that would not get any faster are left nested, unless they have to be instrumented.
+            # Compiled chains that had mixins applied on top of them can not go back to being nested.
+            shouldCompile = (
+                self.instrumented
+                or (self.flattened and chain.benefitsFromCompiling)
+                or (chain.compiled and chain.nested is None)
+            )
+            if chain.compiled == shouldCompile and chain.instrumented == self.instrumented:
+                continue
+            if not chain.compiled and not shouldCompile:
+                continue
+            # Skip methods replaced by something other than the mixin system
+            if getattr(chain.parentClass, chain.funcName, None) is not chain.installed:
+                Logger.debug(f"Method {chain.name} Was Replaced Outside Of Mixins. Chain Will Not Be Compiled", module="mixin-compile")
+                chain.compilable = False
+                continue
+
+            if not shouldCompile:
+                setattr(chain.parentClass, chain.funcName, chain.nested)
+                chain.installed = chain.nested
+                chain.compiled = False
+                chain.instrumented = False
+                restoredChains += 1
+                continue
+
+            compiledMethod = _compileLayers(chain, instrument=self.instrumented)
+            # Spoof the signature of the original function. Overrides installed directly keep their own
+            if compiledMethod is not chain.layers[-1].destination:
+                try:
+                    compiledMethod.__signature__ = inspect.signature(chain.original)
+                except (TypeError, ValueError):
+                    pass
+            compiledMethod.__OBSIDIAN_OVERRIDE_CACHE__ = (chain.funcName, chain.parentClass)
+            setattr(chain.parentClass, chain.funcName, compiledMethod)
+            chain.installed = compiledMethod
+            chain.compiled = True
+            chain.instrumented = self.instrumented
+            compiledChains += 1
+
+        Logger.debug(f"Compiled {compiledChains} And Restored {restoredChains} Of {len(self.chains)} Mixin Chains", module="mixin-compile")
+        return compiledChains + restoredChains
+
+    # Returns statistics of every hook and chain that was called while instrumented
+    def getStats(self) -> list[HookStats]:
+        stats = []
+        for chain in self.chains.values():
+            stats.extend(layer.stats for layer in chain.layers if layer.stats is not None and layer.stats.calls)
+            if chain.stats is not None and chain.stats.calls:
+                stats.append(chain.stats)
+        return stats
+
+    def resetStats(self):
+        for chain in self.chains.values():
+            for layer in chain.layers:
+                if layer.stats is not None:
+                    layer.stats.reset()
+            if chain.stats is not None:
+                chain.stats.reset()
+
+    def describe(self) -> str:
+        return "\n".join(chain.describe() for chain in self.chains.values())
+
+
+# Creates Global MixinRegistry As Singleton
+MixinRegistry = _MixinRegistry()
+
+
 # Helper function used by @Override, @Extend, and @Inject.
 # Replaces one function in a class with another.
-def _overrideMethod(target: Callable, destination: Callable, abstract: bool = False):
+def _overrideMethod(target: Callable, destination: Callable, abstract: bool = False, layer: Optional[MixinLayer] = None):
     # When a method gets overridden multiple times,
     # the parent class and (original) class name gets destroyed and lost.
     # __OBSIDIAN_OVERRIDE_CACHE__ saves those two values the first time it gets overridden.
@@ -59,6 +395,9 @@ def _overrideMethod(target: Callable, destination: Callable, abstract: bool = Fa
     setattr(parentClass, funcName, overriddenMethod)
     Logger.debug(f"Saved {overriddenMethod} to {parentClass}", module="dynamic-method-override")
 
+    # Record the mixin, so the chain can be compiled once all modules are loaded
+    MixinRegistry.record(parentClass, funcName, target, overriddenMethod, layer)
+
 
 # Helper method to get parent class of method
 # Hybrid code by @Yoel http://stackoverflow.com/a/25959545 and @Stewori https://github.com/Stewori/pytypes
@@ -94,6 +433,7 @@ def Override(
             ctxArgs.update(additionalContext)  # Add additional context if it exists
         if passSuper:
             ctxArgs.update({"_super": target})  # Add super if passSuper is set
+        layer = MixinLayer("override", destination, dict(additionalContext or {}), passSuper=passSuper)
 
         # Check if both the target and the destination are either both async or both non async
         if inspect.iscoroutinefunction(target) is False and inspect.iscoroutinefunction(destination) is True:
@@ -111,7 +451,8 @@ def Override(
             _overrideMethod(
                 target,
                 _asyncoverride,
-                abstract=abstract
+                abstract=abstract,
+                layer=layer
             )
         # Both target and destination are non-async, implement the non-async override
         else:
@@ -125,7 +466,8 @@ def Override(
             _overrideMethod(
                 target,
                 _override,
-                abstract=abstract
+                abstract=abstract,
+                layer=layer
             )
 
         return destination
@@ -191,7 +533,8 @@ def Inject(
             _overrideMethod(
                 target,
                 _asyncinject,
-                abstract=abstract
+                abstract=abstract,
+                layer=MixinLayer("inject", destination, ctxArgs, at=at, passResult=passResult)
             )
         # Both target and destination are non-async, implement the non-async injection
         else:
@@ -226,7 +569,8 @@ def Inject(
             _overrideMethod(
                 target,
                 _inject,
-                abstract=abstract
+                abstract=abstract,
+                layer=MixinLayer("inject", destination, ctxArgs, at=at, passResult=passResult)
             )
 
         return destination
@@ -265,7 +609,8 @@ def Extend(
             _overrideMethod(
                 target,
                 _asyncextend,
-                abstract=abstract
+                abstract=abstract,
+                layer=MixinLayer("extend", destination, ctxArgs)
             )
         # Both target and destination are non-async, implement the non-async extension
         else:
@@ -279,7 +624,8 @@ def Extend(
             _overrideMethod(
                 target,
                 _extend,
-                abstract=abstract
+                abstract=abstract,
+                layer=MixinLayer("extend", destination, ctxArgs)
             )
 
         return destination
@@ -336,9 +682,13 @@ def addAttribute(
         oldInit(self, *args, **kwargs)
         setattr(self, name, default)
 
+    # When compiled, only the attribute needs to be set, as the old __init__ is already part of the chain
+    def _setAttribute(self, *args, **kwargs):
+        setattr(self, name, default)
+
     # Check if method has an init method to inject to
     if hasattr(target, "__init__"):
-        _overrideMethod(target.__init__, _attribute_init)
+        _overrideMethod(target.__init__, _attribute_init, layer=MixinLayer("attribute", _setAttribute))
     else:
         # Add init method to class
         setattr(target, "__init__", _attribute_init)
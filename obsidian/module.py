@@ -7,15 +7,20 @@ from pathlib import Path
 import importlib
 import pkgutil
 import fnmatch
+import json
+import time
+import sys
 
 from obsidian.cpe import CPEModuleManager
 from obsidian.utils.ptl import PrettyTableLite
 from obsidian.log import Logger
 from obsidian.config import AbstractConfig
+from obsidian.startup import StartupTimer
 from obsidian.constants import (
     MANAGERS_LIST,
     MODULES_IMPORT,
     MODULES_FOLDER,
+    MODULES_MANIFEST,
     SERVER_PATH
 )
 from obsidian.errors import (
@@ -139,10 +144,16 @@ class _ModuleManager(AbstractManager):
         self._ensureCore: bool = True
         self._initCpe: bool = False
         self._errorList: list[tuple[str, str]] = []  # Logging Which Modules Encountered Errors While Loading Up
+        self._moduleFiles: list[str] = []  # Module Files Imported, In Import Order
+        self._scannedDirectories: list[Path] = []  # Directories Scanned For Modules
+        self._moduleFileNames: dict[str, list[str]] = {}  # Module File -> Names Of Modules Registered By It
+        self._lazyModules: dict[str, LazyModule] = {}  # Lazy Modules Not Loaded Yet, Loaded On First Use
 
     # Function to import all modules
     # EnsureCore ensures core module is present
-    def initModules(self, ignorelist: list[str] = [], ensureCore: bool = True, initCPE: bool = False):
+    # UseManifest reuses the module list and dependency graph from the last start if no module files changed
+    # It also lets lazy modules be loaded on first use, as their commands are registered from the manifest
+    def initModules(self, ignorelist: list[str] = [], ensureCore: bool = True, initCPE: bool = False, useManifest: bool = False):
         # Setting Vars
         self._ensureCore = ensureCore
         self._moduleIgnorelist = ignorelist
@@ -152,8 +163,25 @@ class _ModuleManager(AbstractManager):
         Logger.info("=== (1/6) PreInitializing Modules ===", module="init-modules")
 
         # Initialization Part One => Scanning and Loading Modules using PkgUtils
-        Logger.info(f"Scanning modules in {MODULES_FOLDER}", module="module-import")
-        self._importModules()
+        # If nothing changed since the manifest was saved, the list of module files is taken from it instead
+        manifest = self._loadManifest() if useManifest else None
+        if manifest is None:
+            Logger.info(f"Scanning modules in {MODULES_FOLDER}", module="module-import")
+            self._importModules()
+        else:
+            Logger.info("Module Manifest Is Up To Date. Skipping Module Scan", module="module-import")
+            # Directories are not scanned, but they did not change since the manifest was saved
+            self._scannedDirectories = [Path(SERVER_PATH, directory) for directory in manifest["directories"]]
+            # Files of lazy modules are not imported until one of their commands is used
+            lazyFiles = {lazyModule["file"] for lazyModule in manifest["lazyModules"].values()}
+            self._importModules(moduleFiles=[moduleFile for moduleFile in manifest["moduleFiles"] if moduleFile not in lazyFiles])
+
+            # If the modules loaded do not match the manifest after all, it can not be used.
+            # Import the lazy module files as well, so their commands are not lost
+            if self._errorList or set(manifest["sortedModules"]) != set(self._modulePreloadDict):
+                Logger.info("Modules Loaded Do Not Match Module Manifest. Loading Lazy Modules At Startup", module="module-import")
+                self._importModules(moduleFiles=[moduleFile for moduleFile in manifest["moduleFiles"] if moduleFile in lazyFiles])
+                manifest = None
 
         # Initialization Part One and a Half => Checking CPE Support
         Logger.info("Checking for CPE Support", module="module-import")
@@ -164,21 +192,32 @@ class _ModuleManager(AbstractManager):
 
         # Initialization Part Two => Checking and Initializing Dependencies
         Logger.info("Checking and Initializing Dependencies...", module="module-resolve")
-        self._initDependencies()
+        with StartupTimer.measure("Module Loader", "Dependencies"):
+            self._initDependencies()
         Logger.info("Dependencies Initialized!", module="module-resolve")
 
+        # Cycles and the dependency graph only have to be rebuilt if the modules changed since the manifest was saved
+        cachedGraph = self._getCachedGraph(manifest)
+
         # Initialization Part Two and a Half => Resolving Dependency Cycles
-        Logger.info("Resolving Dependency Cycles...", module="module-verify")
-        self._resolveDependencyCycles()
-        Logger.info("Cycles Resolved!", module="module-verify")
+        if cachedGraph is None:
+            Logger.info("Resolving Dependency Cycles...", module="module-verify")
+            with StartupTimer.measure("Module Loader", "Dependency Cycles"):
+                self._resolveDependencyCycles()
+            Logger.info("Cycles Resolved!", module="module-verify")
 
         # --- Initialization Preparation ---
         Logger.info("=== (3/6) Preparing Initialization ===", module="init-modules")
 
         # Initialization Part Three => Building Dependency Graph
-        Logger.info("Building Dependency Graph...", module="module-prep")
-        self._buildDependencyGraph()
-        Logger.info("Dependency Graph Generated!", module="module-prep")
+        if cachedGraph is None:
+            Logger.info("Building Dependency Graph...", module="module-prep")
+            with StartupTimer.measure("Module Loader", "Dependency Graph"):
+                self._buildDependencyGraph()
+            Logger.info("Dependency Graph Generated!", module="module-prep")
+        else:
+            Logger.info("Using Dependency Graph From Module Manifest", module="module-prep")
+            self._sortedModuleGraph = cachedGraph
 
         Logger.info("Dependencies Resolved!", module="module-resolve")
         Logger.info("PreInitializing Done!", module="module-preinit")
@@ -198,9 +237,17 @@ class _ModuleManager(AbstractManager):
 
         # Initialization Part Five => Initialize Submodules
         Logger.info("Initializing Submodules...", module="submodule-init")
-        self._initSubmodules()
+        with StartupTimer.measure("Module Loader", "Submodules"):
+            self._initSubmodules()
         Logger.info("Submodules Initialized!", module="submodule-init")
 
+        # Initialization Part Five and a Half => Registering Placeholder Commands For Lazy Modules
+        # Lazy module files were not imported if the manifest was used, even if the dependency graph was rebuilt
+        if manifest is not None and manifest["lazyModules"]:
+            Logger.info("Registering Lazy Modules...", module="submodule-init")
+            self._registerLazyModules(manifest["lazyModules"])
+            Logger.info(f"Registered {len(self._lazyModules)} Lazy Modules!", module="submodule-init")
+
         # --- Finalizing Initialization ---
         Logger.info("=== (6/6) Finalizing Initialization ===", module="init-modules")
 
@@ -209,14 +256,22 @@ class _ModuleManager(AbstractManager):
         self._postInit()
         Logger.info("Post-Initializing Done!...", module="post-init")
 
+        # Save the manifest, so the next start can skip scanning and graph building, and load lazy modules on first use
+        if useManifest and cachedGraph is None:
+            self._saveManifest()
+
         Logger.info("Module Done Finalizing!", module="module-init")
 
         # Initialization Procedure Done!
 
     # Intermediate Function To Import All Modules
-    def _importModules(self):
-        # Initialize Temporary List of Files Imported
-        _moduleFiles = []
+    # If moduleFiles is given (i.e. from the manifest), only those are imported (on top of any imported before) and the modules folder is not scanned
+    def _importModules(self, moduleFiles: Optional[list[str]] = None):
+        # Reset List of Files Imported and Directories Scanned
+        if moduleFiles is None:
+            self._moduleFiles = []
+            self._scannedDirectories = []
+            self._moduleFileNames = {}
 
         # Helper method to load and initialize a discovered module
         # Takes in the module name as an absolute module path
@@ -236,9 +291,12 @@ class _ModuleManager(AbstractManager):
             try:
                 Logger.verbose(f"Module {moduleName} Not In Ignore List. Adding!", module="module-import")
                 # Import Module
-                _module = importlib.import_module(moduleName)
+                registered = set(self._modulePreloadDict)
+                with StartupTimer.measure("Module Import", moduleName):
+                    _module = importlib.import_module(moduleName)
                 # Appending To A List of Module Files to be Used Later
-                _moduleFiles.append(moduleName)
+                self._moduleFiles.append(moduleName)
+                self._moduleFileNames[moduleName] = [name for name in self._modulePreloadDict if name not in registered]
                 # Set the Imported Module into the Global Scope
                 globals()[moduleName] = _module
             except FatalError as e:
@@ -257,6 +315,8 @@ class _ModuleManager(AbstractManager):
         # Else, load each python file individually and continue iterating through subfolders
         def recursiveModuleLoader(path: Path):
             Logger.debug(f"Recursively Loading Modules From {path}", module="module-import")
+            # Keep track of scanned directories, so the manifest can tell when modules are added or removed
+            self._scannedDirectories.append(path)
             # Get the relative path of the module from the server path in dot notation
             relative_path = path.relative_to(Path(SERVER_PATH, MODULES_FOLDER))
 
@@ -298,10 +358,15 @@ class _ModuleManager(AbstractManager):
                     if folder.is_dir():
                         recursiveModuleLoader(folder)
 
-        # Begin recursive module discovery on the initial modules path
-        recursiveModuleLoader(Path(SERVER_PATH, MODULES_FOLDER))
+        if moduleFiles is None:
+            # Begin recursive module discovery on the initial modules path
+            recursiveModuleLoader(Path(SERVER_PATH, MODULES_FOLDER))
+        else:
+            # Module files are already known, so just import them
+            for moduleName in moduleFiles:
+                loadModule(moduleName)
 
-        Logger.verbose(f"Detected and Imported Module Files {_moduleFiles}", module="module-import")
+        Logger.verbose(f"Detected and Imported Module Files {self._moduleFiles}", module="module-import")
         # Check If Core Was Loaded
         if self._ensureCore:
             if "core" not in self._modulePreloadDict:
@@ -387,64 +452,7 @@ class _ModuleManager(AbstractManager):
     def _initDependencies(self):
         for moduleName, moduleType in list(self._modulePreloadDict.items()):
             try:
-                Logger.debug(f"Checking Dependencies for Module {moduleName}", module="module-resolve")
-                # Loop through all dependencies, check type, then check if exists
-                for dependency in moduleType.DEPENDENCIES:
-                    # Get Variables
-                    depName = dependency.NAME
-                    depVer = dependency.VERSION
-                    Logger.verbose(f"Checking if Dependency {depName} Exists", module="module-resolve")
-                    # Check if Dependency is "Loaded"
-                    if depName in self._modulePreloadDict:
-                        # Check if Version should be checked
-                        if depVer is None:
-                            Logger.verbose(f"Dependency {dependency} Satisfied (Version Check Not Specified)!", module="module-resolve")
-                            # No Version Check Needed
-                        elif depVer == self._modulePreloadDict[dependency.NAME].VERSION:
-                            Logger.verbose(f"Dependency {dependency} Satisfied!", module="module-resolve")
-                        else:
-                            raise DependencyError(f"Dependency '{dependency}' Has Unmatched Version! (Requirement: {depVer} | Has: {self._modulePreloadDict[dependency.NAME].VERSION})")
-                        # If All Passes, Link Module Class
-                        dependency.MODULE = self._modulePreloadDict[dependency.NAME]
-                    else:
-                        raise DependencyError(f"Dependency '{dependency}' Not Found!")
-
-                Logger.debug(f"Checking Soft/Optional Dependencies for Module {moduleName}", module="module-resolve")
-                # Keep track of dependencies to remove
-                invalid_soft_dependencies = []
-
-                # Loop through all soft dependencies, check type, then check if exists
-                for dependency in moduleType.SOFT_DEPENDENCIES:
-                    # Get Variables
-                    depName = dependency.NAME
-                    depVer = dependency.VERSION
-                    Logger.verbose(f"Checking if Soft/Optional Dependency {depName} Exists", module="module-resolve")
-                    # Check if Soft Dependency is "Loaded"
-                    if depName in self._modulePreloadDict:
-                        # Check if Version should be checked
-                        if depVer is None:
-                            Logger.verbose(f"Soft/Optional Dependency {dependency} Satisfied (Version Check Not Specified)!", module="module-resolve")
-                            # No Version Check Needed
-                        elif depVer == self._modulePreloadDict[dependency.NAME].VERSION:
-                            Logger.verbose(f"Soft/Optional Dependency {dependency} Satisfied!", module="module-resolve")
-                        else:
-                            Logger.warn(
-                                f"Soft/Optional Dependency '{dependency}' Has Unmatched Version! " + \
-                                f"(Requirement: {depVer} | Has: {self._modulePreloadDict[dependency.NAME].VERSION})",
-                                module="module-resolve"
-                            )
-                        # If All Passes, Link Module Class
-                        dependency.MODULE = self._modulePreloadDict[dependency.NAME]
-                    else:
-                        Logger.info(f"Soft/Optional Dependency '{dependency}' Not Found! Continuing...", module="module-resolve")
-                        invalid_soft_dependencies.append(dependency)
-
-                # Remove all invalid soft dependencies
-                if invalid_soft_dependencies:
-                    Logger.debug(f"Removing Invalid Soft/Optional Dependencies {invalid_soft_dependencies} From Module {moduleName}", module="module-resolve")
-                    for dependency in invalid_soft_dependencies:
-                        moduleType.SOFT_DEPENDENCIES.remove(dependency)
-
+                self._linkDependencies(moduleName, moduleType)
             except FatalError as e:
                 # Pass Down Fatal Error To Base Server
                 raise e
@@ -463,6 +471,66 @@ class _ModuleManager(AbstractManager):
                 if moduleName in self._moduleDict:
                     del self._moduleDict[moduleName]
 
+    # Checks that dependencies of a module are loaded, and links them to the module classes
+    def _linkDependencies(self, moduleName: str, moduleType: Type[AbstractModule]):
+        Logger.debug(f"Checking Dependencies for Module {moduleName}", module="module-resolve")
+        # Loop through all dependencies, check type, then check if exists
+        for dependency in moduleType.DEPENDENCIES:
+            # Get Variables
+            depName = dependency.NAME
+            depVer = dependency.VERSION
+            Logger.verbose(f"Checking if Dependency {depName} Exists", module="module-resolve")
+            # Check if Dependency is "Loaded"
+            if depName in self._modulePreloadDict:
+                # Check if Version should be checked
+                if depVer is None:
+                    Logger.verbose(f"Dependency {dependency} Satisfied (Version Check Not Specified)!", module="module-resolve")
+                    # No Version Check Needed
+                elif depVer == self._modulePreloadDict[dependency.NAME].VERSION:
+                    Logger.verbose(f"Dependency {dependency} Satisfied!", module="module-resolve")
+                else:
+                    raise DependencyError(f"Dependency '{dependency}' Has Unmatched Version! (Requirement: {depVer} | Has: {self._modulePreloadDict[dependency.NAME].VERSION})")
+                # If All Passes, Link Module Class
+                dependency.MODULE = self._modulePreloadDict[dependency.NAME]
+            else:
+                raise DependencyError(f"Dependency '{dependency}' Not Found!")
+
+        Logger.debug(f"Checking Soft/Optional Dependencies for Module {moduleName}", module="module-resolve")
+        # Keep track of dependencies to remove
+        invalid_soft_dependencies = []
+
+        # Loop through all soft dependencies, check type, then check if exists
+        for dependency in moduleType.SOFT_DEPENDENCIES:
+            # Get Variables
+            depName = dependency.NAME
+            depVer = dependency.VERSION
+            Logger.verbose(f"Checking if Soft/Optional Dependency {depName} Exists", module="module-resolve")
+            # Check if Soft Dependency is "Loaded"
+            if depName in self._modulePreloadDict:
+                # Check if Version should be checked
+                if depVer is None:
+                    Logger.verbose(f"Soft/Optional Dependency {dependency} Satisfied (Version Check Not Specified)!", module="module-resolve")
+                    # No Version Check Needed
+                elif depVer == self._modulePreloadDict[dependency.NAME].VERSION:
+                    Logger.verbose(f"Soft/Optional Dependency {dependency} Satisfied!", module="module-resolve")
+                else:
+                    Logger.warn(
+                        f"Soft/Optional Dependency '{dependency}' Has Unmatched Version! " + \
+                        f"(Requirement: {depVer} | Has: {self._modulePreloadDict[dependency.NAME].VERSION})",
+                        module="module-resolve"
+                    )
+                # If All Passes, Link Module Class
+                dependency.MODULE = self._modulePreloadDict[dependency.NAME]
+            else:
+                Logger.info(f"Soft/Optional Dependency '{dependency}' Not Found! Continuing...", module="module-resolve")
+                invalid_soft_dependencies.append(dependency)
+
+        # Remove all invalid soft dependencies
+        if invalid_soft_dependencies:
+            Logger.debug(f"Removing Invalid Soft/Optional Dependencies {invalid_soft_dependencies} From Module {moduleName}", module="module-resolve")
+            for dependency in invalid_soft_dependencies:
+                moduleType.SOFT_DEPENDENCIES.remove(dependency)
+
     # Intermediate Function to Resolve Circular Dependencies
     def _resolveDependencyCycles(self):
         # Helper Function To Run Down Module Dependency Tree To Check For Cycles
@@ -541,14 +609,15 @@ class _ModuleManager(AbstractManager):
             try:
                 Logger.debug(f"Initializing Module {moduleName}", module=f"{moduleName}-init")
                 # Initialize Module
-                initializedModule = module(
-                    module.NAME,
-                    module.DESCRIPTION,
-                    module.AUTHOR,
-                    module.VERSION,
-                    module.DEPENDENCIES,
-                    module.SOFT_DEPENDENCIES
-                )
+                with StartupTimer.measure("Module Init", moduleName):
+                    initializedModule = module(
+                        module.NAME,
+                        module.DESCRIPTION,
+                        module.AUTHOR,
+                        module.VERSION,
+                        module.DEPENDENCIES,
+                        module.SOFT_DEPENDENCIES
+                    )
                 # Setting Item in _moduleDict with Initialized Version of _modulePreloadDict!
                 self._moduleDict[moduleName] = initializedModule
                 Logger.info(f"Initialized Module {moduleName}", module="init-module")
@@ -579,33 +648,7 @@ class _ModuleManager(AbstractManager):
             # Get the module name
             moduleName = module.NAME
             try:
-                # Loop Through All Items within Module
-                Logger.debug(f"Checking All Items in {moduleName}", module=f"{moduleName}-submodule-init")
-                # Loop Through All Items In Class of Object
-                for item in module.__class__.__dict__.values():
-                    # Check If Item Has "obsidian_submodule" Flag
-                    if hasattr(item, "obsidian_submodule"):
-                        Logger.verbose(f"{item} Is A Submodule! Adding As {moduleName} Submodule.", module=f"{moduleName}-submodule-init")
-                        # Register Submodule Using information Provided by Submodule Class
-                        item.MANAGER.register(item, module)
-
-                        # Check if all methods are registered
-                        Logger.verbose(f"Checking if {item.MANAGER.NAME} {item.NAME} have all methods registered", module=f"{moduleName}-submodule-init")
-
-                        # Get list of base class methods
-                        baseMethods = [name for name, val in item.MANAGER.SUBMODULE.__dict__.items() if callable(val) and not name.startswith("__")]
-                        Logger.verbose(f"{item.MANAGER.NAME} Base Class has methods: {baseMethods}", module=f"{moduleName}-submodule-init")
-                        # Get list of currently registered methods
-                        submoduleMethods = [name for name, val in item.__dict__.items() if callable(val) and not name.startswith("__")]
-                        Logger.verbose(f"{item.MANAGER.NAME} {item.NAME} has methods: {submoduleMethods}", module=f"{moduleName}-submodule-init")
-
-                        # Loop through all methods and check if they are registered
-                        for methodName in baseMethods:
-                            if methodName not in submoduleMethods:
-                                if not methodName.startswith("_"):
-                                    Logger.warn(f"{item.MANAGER.NAME} {item.NAME} Does Not Have Method {methodName} Registered!", module=f"{moduleName}-submodule-init")
-                                    Logger.warn("This could cause issues when overriding methods!", module=f"{moduleName}-submodule-init")
-
+                self._registerSubmodules(module)
             except FatalError as e:
                 # Pass Down Fatal Error To Base Server
                 raise e
@@ -624,6 +667,36 @@ class _ModuleManager(AbstractManager):
                 if moduleName in self._moduleDict:
                     del self._moduleDict[moduleName]
 
+    # Registers every submodule defined in a module with its manager
+    def _registerSubmodules(self, module: AbstractModule):
+        moduleName = module.NAME
+        # Loop Through All Items within Module
+        Logger.debug(f"Checking All Items in {moduleName}", module=f"{moduleName}-submodule-init")
+        # Loop Through All Items In Class of Object
+        for item in module.__class__.__dict__.values():
+            # Check If Item Has "obsidian_submodule" Flag
+            if hasattr(item, "obsidian_submodule"):
+                Logger.verbose(f"{item} Is A Submodule! Adding As {moduleName} Submodule.", module=f"{moduleName}-submodule-init")
+                # Register Submodule Using information Provided by Submodule Class
+                item.MANAGER.register(item, module)
+
+                # Check if all methods are registered
+                Logger.verbose(f"Checking if {item.MANAGER.NAME} {item.NAME} have all methods registered", module=f"{moduleName}-submodule-init")
+
+                # Get list of base class methods
+                baseMethods = [name for name, val in item.MANAGER.SUBMODULE.__dict__.items() if callable(val) and not name.startswith("__")]
+                Logger.verbose(f"{item.MANAGER.NAME} Base Class has methods: {baseMethods}", module=f"{moduleName}-submodule-init")
+                # Get list of currently registered methods
+                submoduleMethods = [name for name, val in item.__dict__.items() if callable(val) and not name.startswith("__")]
+                Logger.verbose(f"{item.MANAGER.NAME} {item.NAME} has methods: {submoduleMethods}", module=f"{moduleName}-submodule-init")
+
+                # Loop through all methods and check if they are registered
+                for methodName in baseMethods:
+                    if methodName not in submoduleMethods:
+                        if not methodName.startswith("_"):
+                            Logger.warn(f"{item.MANAGER.NAME} {item.NAME} Does Not Have Method {methodName} Registered!", module=f"{moduleName}-submodule-init")
+                            Logger.warn("This could cause issues when overriding methods!", module=f"{moduleName}-submodule-init")
+
     # Intermediate Function to run Post-Initialization Scripts
     def _postInit(self):
         # Loop through all the submodules in the order of the sorted graph
@@ -635,7 +708,8 @@ class _ModuleManager(AbstractManager):
             try:
                 Logger.debug(f"Running Post-Initialization for Module {moduleName}", module=f"{moduleName}-postinit")
                 # Calling the Final Init function
-                module.postInit()
+                with StartupTimer.measure("Module PostInit", moduleName):
+                    module.postInit()
             except FatalError as e:
                 # Pass Down Fatal Error To Base Server
                 raise e
@@ -654,6 +728,230 @@ class _ModuleManager(AbstractManager):
                 if moduleName in self._moduleDict:
                     del self._moduleDict[moduleName]
 
+    # Registers placeholder commands for lazy modules in the manifest, so they show up in help and load on first use
+    def _registerLazyModules(self, lazyModules: dict[str, dict[str, Any]]):
+        from obsidian.commands import CommandManager  # pylint: disable=import-outside-toplevel
+
+        for moduleName, moduleInfo in lazyModules.items():
+            try:
+                lazyModule = LazyModule(
+                    moduleName,
+                    moduleInfo["description"],
+                    moduleInfo["author"],
+                    moduleInfo["version"],
+                    moduleInfo["file"],
+                    moduleInfo["commands"]
+                )
+                CommandManager.registerLazy(lazyModule)
+                self._lazyModules[moduleName] = lazyModule
+                Logger.debug(f"Registered Lazy Module {moduleName} With {len(lazyModule.COMMANDS)} Commands", module="lazy-module")
+            except FatalError as e:
+                # Pass Down Fatal Error To Base Server
+                raise e
+            except Exception as e:
+                # Handle Exception if Error Occurs
+                self._errorList.append((moduleName, "Init-Lazy"))  # Module Loaded WITH Errors
+                # If the Error is an Init Register Error (raised on purpose), Don't print out TB
+                Logger.error(f"Error While Registering Lazy Module {moduleName} - {type(e).__name__}: {e}\n", module="lazy-module", printTb=not isinstance(e, InitRegisterError))
+                Logger.warn("!!! Module Errors May Cause Compatibility Issues And/Or Data Corruption !!!\n", module="lazy-module")
+                Logger.warn(f"Skipping Module {moduleName}?", module="lazy-module")
+                Logger.askConfirmation()
+
+    # Loads a lazy module (and any lazy modules it depends on) the first time it is needed
+    # The placeholder commands of the module are replaced by the real ones
+    def loadLazyModule(self, moduleName: str) -> AbstractModule:
+        from obsidian.commands import CommandManager  # pylint: disable=import-outside-toplevel
+
+        # Check if module was already loaded
+        if moduleName in self._moduleDict:
+            return self._moduleDict[moduleName]
+        if moduleName not in self._lazyModules:
+            raise ModuleError(f"Module {moduleName} Is Not A Lazy Module!")
+
+        Logger.info(f"Loading Lazy Module {moduleName}", module="lazy-module")
+        startTime = time.perf_counter()
+        # Removing the module first prevents loading it twice if modules depend on each other
+        lazyModule = self._lazyModules.pop(moduleName)
+        CommandManager.unregisterLazy(lazyModule)
+        try:
+            # Import the module file, which registers the module class
+            importlib.import_module(lazyModule.MODULE_FILE)
+            moduleType = self._modulePreloadDict[moduleName]
+
+            # Load lazy dependencies first, then check and link dependencies as done during startup
+            for dependency in moduleType.DEPENDENCIES + moduleType.SOFT_DEPENDENCIES:
+                if dependency.NAME in self._lazyModules:
+                    self.loadLazyModule(dependency.NAME)
+            self._linkDependencies(moduleName, moduleType)
+
+            # Initialize module, register its submodules, then run post initialization
+            module = moduleType(
+                moduleType.NAME,
+                moduleType.DESCRIPTION,
+                moduleType.AUTHOR,
+                moduleType.VERSION,
+                moduleType.DEPENDENCIES,
+                moduleType.SOFT_DEPENDENCIES
+            )
+            self._moduleDict[moduleName] = module
+            self._registerSubmodules(module)
+            module.postInit()
+            self._sortedModuleGraph.append(moduleType)
+        except FatalError as e:
+            # Pass Down Fatal Error To Base Server
+            raise e
+        except Exception as e:
+            # Handle Exception if Error Occurs
+            self._errorList.append((moduleName, "Lazy-Load"))  # Module Loaded WITH Errors
+            Logger.error(f"Error While Loading Lazy Module {moduleName} - {type(e).__name__}: {e}\n", module="lazy-module", printTb=not isinstance(e, DependencyError))
+            Logger.warn("!!! Module Errors May Cause Compatibility Issues And/Or Data Corruption !!!\n", module="lazy-module")
+            # Remove Module
+            Logger.warn(f"Removing Module {moduleName} From Loader!", module="lazy-module")
+            if moduleName in self._modulePreloadDict:
+                del self._modulePreloadDict[moduleName]
+            if moduleName in self._moduleDict:
+                del self._moduleDict[moduleName]
+            raise ModuleError(f"Lazy Module {moduleName} Failed To Load") from e
+
+        Logger.info(f"Loaded Lazy Module {moduleName} In {(time.perf_counter() - startTime) * 1000:.0f}ms", module="lazy-module")
+        return module
+
+    # Returns the manifest entries of lazy modules that can be loaded on first use instead of at startup
+    def _getLazyManifest(self) -> dict[str, dict[str, Any]]:
+        # Only modules that just provide commands can be deferred, as all other submodules have to be registered at startup
+        deferred = set()
+        for moduleName, module in self._moduleDict.items():
+            if not module.LAZY:
+                continue
+            if CPEModuleManager.hasCPE(type(module)) or not all(
+                submodule.MANAGER.NAME == "Command" and not submodule.OVERRIDE and submodule.MANAGER._commandDict.get(submodule.NAME) is submodule
+                for submodule in module.SUBMODULES
+            ):
+                Logger.debug(f"Lazy Module {moduleName} Provides More Than Commands. Loading At Startup", module="module-manifest")
+                continue
+            deferred.add(moduleName)
+
+        # Modules needed by other modules at startup (or sharing a file with them) have to be loaded at startup too
+        changed = True
+        while changed:
+            changed = False
+            for moduleName, module in self._moduleDict.items():
+                if moduleName in deferred:
+                    continue
+                for dependency in module.DEPENDENCIES + module.SOFT_DEPENDENCIES:
+                    if dependency.NAME in deferred:
+                        Logger.debug(f"Lazy Module {dependency.NAME} Is Needed By {moduleName}. Loading At Startup", module="module-manifest")
+                        deferred.discard(dependency.NAME)
+                        changed = True
+            for moduleNames in self._moduleFileNames.values():
+                if not deferred.issuperset(moduleNames) and deferred.intersection(moduleNames):
+                    deferred.difference_update(moduleNames)
+                    changed = True
+
+        moduleFiles = {moduleName: moduleFile for moduleFile, moduleNames in self._moduleFileNames.items() for moduleName in moduleNames}
+        return {
+            moduleName: {
+                "file": moduleFiles[moduleName],
+                "description": self._moduleDict[moduleName].DESCRIPTION,
+                "author": self._moduleDict[moduleName].AUTHOR,
+                "version": self._moduleDict[moduleName].VERSION,
+                "commands": [
+                    {
+                        "name": command.NAME,
+                        "description": command.DESCRIPTION,
+                        "version": command.VERSION,
+                        "activators": command.ACTIVATORS,
+                        "op": command.OP
+                    }
+                    for command in self._moduleDict[moduleName].SUBMODULES
+                ]
+            }
+            for moduleName in sorted(deferred)
+        }
+
+    # Settings that change which modules get loaded. The manifest is only used if these match
+    def _getManifestKey(self) -> dict[str, Any]:
+        return {
+            "version": 2,
+            "python": sys.version,
+            "ignorelist": list(self._moduleIgnorelist),
+            "ensureCore": self._ensureCore,
+            "initCPE": self._initCpe
+        }
+
+    # Returns the saved module manifest, or None if it is missing or if any module file or folder changed since it was saved
+    def _loadManifest(self) -> Optional[dict[str, Any]]:
+        manifestPath = Path(SERVER_PATH, MODULES_MANIFEST)
+        try:
+            with open(manifestPath, "r", encoding="utf-8") as manifestFile:
+                manifest = json.load(manifestFile)
+            if manifest["key"] != self._getManifestKey():
+                Logger.debug("Module Manifest Was Saved With Different Settings", module="module-manifest")
+                return None
+            # Folder modification times change when files are added or removed, file modification times change when edited
+            for path, mtime in {**manifest["directories"], **manifest["files"]}.items():
+                if Path(SERVER_PATH, path).stat().st_mtime_ns != mtime:
+                    Logger.debug(f"{path} Changed Since Module Manifest Was Saved", module="module-manifest")
+                    return None
+            return manifest
+        except FileNotFoundError:
+            Logger.debug("Module Manifest Not Found Or Module File Removed", module="module-manifest")
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            Logger.warn(f"Error While Reading Module Manifest {manifestPath} - {type(e).__name__}: {e}", module="module-manifest")
+            return None
+
+    # Returns the dependency graph saved in the manifest, if it still matches the modules that were loaded
+    def _getCachedGraph(self, manifest: Optional[dict[str, Any]]) -> Optional[list[Type[AbstractModule]]]:
+        if manifest is None or self._errorList:
+            return None
+        sortedModules = manifest["sortedModules"]
+        if set(sortedModules) != set(self._modulePreloadDict):
+            Logger.debug("Modules Loaded Do Not Match Module Manifest. Rebuilding Dependency Graph", module="module-manifest")
+            return None
+        return [self._modulePreloadDict[moduleName] for moduleName in sortedModules]
+
+    # Saves the module files, their modification times, the dependency graph and the commands of lazy modules,
+    # so the next start can skip scanning and sorting, and only load lazy modules once they are used
+    def _saveManifest(self):
+        # Modules that failed to load would be skipped without warning next time, so only save clean starts
+        if self._errorList:
+            Logger.debug("Not Saving Module Manifest As Some Modules Failed To Load", module="module-manifest")
+            return
+
+        manifestPath = Path(SERVER_PATH, MODULES_MANIFEST)
+        try:
+            # Record every file of every imported module (including files imported by module packages)
+            files = {}
+            for name, module in list(sys.modules.items()):
+                moduleFile = getattr(module, "__file__", None)
+                if moduleFile and any(name == moduleName or name.startswith(moduleName + ".") for moduleName in self._moduleFiles):
+                    try:
+                        files[Path(moduleFile).relative_to(SERVER_PATH).as_posix()] = Path(moduleFile).stat().st_mtime_ns
+                    except ValueError:
+                        continue
+
+            lazyModules = self._getLazyManifest()
+            manifest = {
+                "key": self._getManifestKey(),
+                "moduleFiles": self._moduleFiles,
+                # Lazy modules are not loaded at startup, so they are left out of the dependency graph
+                "sortedModules": [module.NAME for module in self._sortedModuleGraph if module.NAME not in lazyModules],
+                "lazyModules": lazyModules,
+                "directories": {path.relative_to(SERVER_PATH).as_posix(): path.stat().st_mtime_ns for path in self._scannedDirectories},
+                "files": files
+            }
+
+            # Write to a temporary file first, so a crash never leaves a half written manifest
+            manifestPath.parent.mkdir(parents=True, exist_ok=True)
+            tempPath = manifestPath.with_suffix(".tmp")
+            with open(tempPath, "w", encoding="utf-8") as manifestFile:
+                json.dump(manifest, manifestFile, indent=4)
+            tempPath.replace(manifestPath)
+            Logger.debug(f"Saved Module Manifest To {manifestPath}", module="module-manifest")
+        except OSError as e:
+            Logger.warn(f"Error While Saving Module Manifest {manifestPath} - {type(e).__name__}: {e}", module="module-manifest")
+
     # Registration. Called by Module Decorator
     def register(
         self,
@@ -663,7 +961,8 @@ class _ModuleManager(AbstractManager):
         version: str,
         dependencies: Optional[list],
         soft_dependencies: Optional[list],
-        module: Type[AbstractModule]
+        module: Type[AbstractModule],
+        lazy: bool = False
     ) -> Type[AbstractModule]:
         Logger.info(f"Discovered Module {name}.", module="module-import")
         Logger.debug(f"Registering Module {name}", module="module-import")
@@ -693,6 +992,7 @@ class _ModuleManager(AbstractManager):
         module.VERSION = version
         module.DEPENDENCIES = dependencies
         module.SOFT_DEPENDENCIES = soft_dependencies
+        module.LAZY = lazy
         self._modulePreloadDict[name] = module
 
         return module
@@ -727,6 +1027,10 @@ class _ModuleManager(AbstractManager):
             for mName, mObject in self._moduleDict.items():
                 if mName.lower() == module.lower():
                     return mObject
+        # Lazy modules are loaded once they are asked for
+        if formatName(module) in self._lazyModules:
+            return self.loadLazyModule(formatName(module))
+        if ignoreCase:
             raise KeyError(module)
         return self._moduleDict[formatName(module)]
 
@@ -742,9 +1046,21 @@ class _ModuleManager(AbstractManager):
     def __len__(self) -> int:
         return len(self._moduleDict)
 
-    # Check if module exists
+    # Check if module exists (lazy modules count, as getModule loads them)
     def __contains__(self, item: str) -> bool:
-        return item in self._moduleDict
+        return item in self._moduleDict or item in self._lazyModules
+
+
+# Placeholder For A Lazy Module That Has Not Been Loaded Yet
+# Holds what the module manifest knows about the module and its commands
+@dataclass
+class LazyModule:
+    NAME: str
+    DESCRIPTION: str
+    AUTHOR: str
+    VERSION: str
+    MODULE_FILE: str  # Python module to import when loading the module
+    COMMANDS: list[dict[str, Any]]  # Name, description, version, activators and op status of each command
 
 
 # Dependency Object
@@ -772,6 +1088,7 @@ class Dependency:
 
 # Module Registration Decorator
 # Used In @Module
+# Lazy modules are only loaded once one of their commands is used, if they just provide commands and the module manifest is enabled
 def Module(
     name: str,
     description: str,
@@ -779,9 +1096,10 @@ def Module(
     version: str,
     dependencies: Optional[list] = None,
     soft_dependencies: Optional[list] = None,
+    lazy: bool = False
 ):
     def internal(cls):
-        ModuleManager.register(name, description, author, version, dependencies, soft_dependencies, cls)
+        ModuleManager.register(name, description, author, version, dependencies, soft_dependencies, cls, lazy=lazy)
         return cls
     return internal
 
@@ -628,7 +628,8 @@ class CoreModule(AbstractModule):
                 *args,
                 ID=0x0d,
                 FORMAT="!BB64s",
-                CRITICAL=False
+                CRITICAL=False,
+                DROPPABLE=True
             )
 
         async def serialize(self, message: str, playerId: int = 0):
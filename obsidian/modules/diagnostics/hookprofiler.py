@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import Optional
+from pathlib import Path
+import datetime
+import asyncio
+
+from obsidian.module import Module, AbstractModule, Dependency, ModuleManager
+from obsidian.commands import Command, AbstractCommand
+from obsidian.player import Player
+from obsidian.mixins import MixinRegistry, HookStats
+from obsidian.config import AbstractConfig
+from obsidian.constants import SERVER_PATH
+from obsidian.errors import CommandError
+from obsidian.log import Logger
+
+
+# Returns the name of the module a hook was registered by, falling back to its python module
+def _getHookOwner(stats: HookStats, moduleNames: dict[str, str]) -> str:
+    return moduleNames.get(stats.source, stats.source)
+
+
+# Returns a readable name for a hook. Hooks are usually defined in initMixins / postInit, so the outer part of the name is dropped
+def _getHookName(stats: HookStats) -> str:
+    if stats.hook is None:
+        return f"{stats.method} (Whole Chain)"
+    return f"{stats.method} <- {stats.hook.rsplit('.', 1)[-1]}"
+
+
+@Module(
+    "HookProfiler",
+    description="Measures time spent in mixin hooks registered by modules",
+    author="Obsidian",
+    version="1.0.0",
+    dependencies=[Dependency("core")],
+    lazy=True
+)
+class HookProfilerModule(AbstractModule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.config = self.initConfig(self.HookProfilerConfig)
+        self.startTime: Optional[datetime.datetime] = None
+
+    def startInstrumentation(self):
+        if MixinRegistry.instrumented:
+            raise CommandError("Hook Profiling Is Already Running!")
+        MixinRegistry.resetStats()
+        MixinRegistry.setInstrumentation(True)
+        self.startTime = datetime.datetime.now()
+
+    def stopInstrumentation(self):
+        if not MixinRegistry.instrumented:
+            raise CommandError("Hook Profiling Is Not Running!")
+        MixinRegistry.setInstrumentation(False)
+
+    # Returns (Owner, Hook Name, Stats) for every hook called, sorted by self time
+    def getResults(self) -> list[tuple[str, str, HookStats]]:
+        moduleNames = {type(module).__module__: module.NAME for module in ModuleManager._moduleDict.values()}
+        results = [(_getHookOwner(stats, moduleNames), _getHookName(stats), stats) for stats in MixinRegistry.getStats()]
+        return sorted(results, key=lambda item: item[2].selfTime, reverse=True)
+
+    def saveReport(self, path: Path, results: list[tuple[str, str, HookStats]]):
+        with open(path, "w", encoding="utf-8") as reportFile:
+            reportFile.write(f"Hook Profile Started {self.startTime}, Saved {datetime.datetime.now()}\n")
+            reportFile.write("Times are wall clock. Async hooks include time spent waiting.\n\n")
+            reportFile.write(f"{'Calls':>10} {'Total (ms)':>12} {'Self (ms)':>12} {'Self/Call (us)':>15}  Module | Hook\n")
+            for owner, hookName, stats in results:
+                reportFile.write(
+                    f"{stats.calls:>10} {stats.totalTime * 1000:>12.2f} {stats.selfTime * 1000:>12.2f} "
+                    f"{stats.selfTime / stats.calls * 1e6:>15.2f}  {owner} | {hookName}\n"
+                )
+
+    @Command(
+        "HookProfile",
+        description="Measures time spent in mixin hooks of each module. Usage: /hookprofile start, stop, reset, or dump",
+        version="v1.0.0"
+    )
+    class HookProfileCommand(AbstractCommand["HookProfilerModule"]):
+        def __init__(self, *args):
+            super().__init__(*args, ACTIVATORS=["hookprofile", "hooks"], OP=True)
+
+        async def execute(self, ctx: Player, action: str):
+            action = action.lower()
+            if action == "start":
+                self.module.startInstrumentation()
+                await ctx.sendMessage("&aHook Profiling Started! Use /hookprofile dump to see results")
+            elif action == "stop":
+                self.module.stopInstrumentation()
+                await ctx.sendMessage("&aHook Profiling Stopped! Results are kept until the next start or reset")
+            elif action == "reset":
+                MixinRegistry.resetStats()
+                self.module.startTime = datetime.datetime.now()
+                await ctx.sendMessage("&aHook Profile Reset!")
+            elif action == "dump":
+                results = self.module.getResults()
+                if not results:
+                    raise CommandError("No Hooks Were Called! Use /hookprofile start first")
+
+                # Save full results to a file, as there are usually too many to show in chat
+                reportPath = Path(SERVER_PATH, self.module.config.reportFolder)
+                reportPath.mkdir(parents=True, exist_ok=True)
+                reportFile = Path(reportPath, f"hooks-{datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.txt")
+                await asyncio.to_thread(self.module.saveReport, reportFile, results)
+                Logger.info(f"Saved Hook Profile To {reportFile}", module="hook-profiler")
+
+                output = [f"&aHook Profile Saved To {reportFile.name} &7(Sorted By Self Time)"]
+                for owner, hookName, stats in results[:self.module.config.summaryLines]:
+                    output.append(f"&e{stats.selfTime * 1000:.1f}ms &f{owner}: {hookName} &7({stats.calls} Calls)")
+                await ctx.sendMessage(output)
+            else:
+                raise CommandError(f"Unknown Action {action}. Use 'start', 'stop', 'reset', or 'dump'")
+
+    @dataclass
+    class HookProfilerConfig(AbstractConfig):
+        # Number of hooks shown in chat when dumping
+        summaryLines: int = 8
+        # Folder (relative to server folder) to save reports to
+        reportFolder: str = "profiles"
@@ -0,0 +1,260 @@
+from dataclasses import dataclass
+from collections import deque
+from typing import Optional, Any
+from pathlib import Path
+import tracemalloc
+import asyncio
+import sys
+import os
+
+from obsidian.module import Module, AbstractModule, Dependency
+from obsidian.commands import Command, AbstractCommand
+from obsidian.player import Player
+from obsidian.world import World, WorldMetadata
+from obsidian.mixins import Inject, InjectionPoint
+from obsidian.config import AbstractConfig
+from obsidian.metrics import MetricsManager
+from obsidian.constants import SERVER_PATH
+from obsidian.errors import CommandError
+from obsidian.server import Server
+from obsidian.log import Logger
+
+# World attributes accounted for separately, or that point to other (shared) objects
+KNOWN_WORLD_ATTRIBUTES = {"mapArray", "additionalMetadata", "worldManager", "generator", "worldFormat", "fileIO", "playerManager"}
+
+
+# Returns the current resident memory of the process in bytes, or None if unknown
+def getResidentMemory() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Fall back to peak memory usage on other platforms
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+# Estimates the memory used by a value and the data it holds.
+# Only looks inside plain containers (and world metadata), so references to servers, worlds, etc are not followed.
+def estimateSize(value: Any, depth: int = 4, seen: Optional[set[int]] = None) -> int:
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimateSize(key, depth - 1, seen) + estimateSize(item, depth - 1, seen)
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        for item in value:
+            size += estimateSize(item, depth - 1, seen)
+    elif isinstance(value, WorldMetadata):
+        size += estimateSize(vars(value), depth - 1, seen)
+    return size
+
+
+# Only count attributes holding data (i.e. buffers and caches added by modules), not references to other objects
+def _isDataAttribute(value: Any) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview, str, dict, list, tuple, set, frozenset, deque))
+
+
+def getWorldMemory(world: World) -> dict[str, int]:
+    return {
+        "map": sys.getsizeof(world.mapArray),
+        "metadata": estimateSize(world.additionalMetadata),
+        "other": sum(
+            estimateSize(value) for name, value in vars(world).items()
+            if name not in KNOWN_WORLD_ATTRIBUTES and _isDataAttribute(value)
+        )
+    }
+
+
+def getPlayerMemory(player: Player) -> dict[str, int]:
+    networkHandler = player.networkHandler
+    connected = networkHandler.isConnected and not networkHandler.writer.transport.is_closing()
+    return {
+        "buffers": sum(estimateSize(value) for value in vars(player).values() if _isDataAttribute(value)),
+        "outbound": networkHandler.dispatcher.getWriteBufferSize() if connected else 0,
+        "inbound": len(getattr(networkHandler.reader, "_buffer", b""))
+    }
+
+
+# Decides who owns an allocation from its traceback: the innermost module frame, then the innermost server frame.
+def _getAllocationOwner(traceback: tracemalloc.Traceback) -> str:
+    serverFile = None
+    for frame in reversed(traceback):
+        try:
+            source = Path(frame.filename).resolve().relative_to(SERVER_PATH).as_posix()
+        except ValueError:
+            continue
+        if source.startswith("modules/"):
+            return source
+        if serverFile is None:
+            serverFile = source
+    return serverFile or "other"
+
+
+def _formatBytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}" if unit != "B" else f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+@Module(
+    "MemoryUsage",
+    description="Reports memory used by worlds, players and modules",
+    author="Obsidian",
+    version="1.0.0",
+    dependencies=[Dependency("core")]
+)
+class MemoryUsageModule(AbstractModule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.config = self.initConfig(self.MemoryUsageConfig)
+        self.server: Optional[Server] = None
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    def postInit(self, **kwargs):
+        # Keep track of the server, so metrics can be collected
+        @Inject(target=Server.run, at=InjectionPoint.BEFORE)
+        async def trackServer(server_self, *args, **kwargs):
+            self.server = server_self
+
+        # Memory metrics are only calculated when collected
+        MetricsManager.gauge("obsidian_process_resident_bytes", "Resident memory of the server process", function=lambda: getResidentMemory() or 0)
+        MetricsManager.gauge("obsidian_world_memory_bytes", "Memory used by each world", ("world", "kind"), function=self._collectWorldMemory)
+        MetricsManager.gauge("obsidian_player_memory_bytes", "Memory used by all players", ("kind",), function=self._collectPlayerMemory)
+
+    def _collectWorldMemory(self) -> dict[tuple[str, ...], float]:
+        if self.server is None:
+            return {}
+        return {
+            (world.name, kind): size
+            for world in list(self.server.worldManager.worlds.values())
+            for kind, size in getWorldMemory(world).items()
+        }
+
+    def _collectPlayerMemory(self) -> dict[tuple[str, ...], float]:
+        if self.server is None:
+            return {}
+        totals: dict[tuple[str, ...], float] = {}
+        for player in self.server.playerManager.getPlayers():
+            for kind, size in getPlayerMemory(player).items():
+                totals[(kind,)] = totals.get((kind,), 0) + size
+        return totals
+
+    def startTracking(self):
+        if tracemalloc.is_tracing():
+            raise CommandError("Memory Tracking Is Already Running!")
+        Logger.info(f"Starting Memory Tracking With {self.config.traceFrames} Frames", module="memory-usage")
+        tracemalloc.start(self.config.traceFrames)
+        self.baseline = tracemalloc.take_snapshot()
+
+    def stopTracking(self):
+        if not tracemalloc.is_tracing():
+            raise CommandError("Memory Tracking Is Not Running!")
+        Logger.info("Stopping Memory Tracking", module="memory-usage")
+        tracemalloc.stop()
+        self.baseline = None
+
+    async def diffTracking(self) -> list[tuple[str, int, int]]:
+        # Returns (Owner, Size Difference, Count Difference) for every owner, largest growth first
+        if not tracemalloc.is_tracing() or self.baseline is None:
+            raise CommandError("Memory Tracking Is Not Running! Use /memorytrack start")
+        snapshot = tracemalloc.take_snapshot()
+        baseline = self.baseline
+
+        # Comparing snapshots can take a while on large heaps, so do it off the event loop
+        def compare() -> list[tuple[str, int, int]]:
+            ignoreTracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            differences = snapshot.filter_traces(ignoreTracemalloc).compare_to(baseline.filter_traces(ignoreTracemalloc), "traceback")
+            owners: dict[str, list[int]] = {}
+            for difference in differences:
+                totals = owners.setdefault(_getAllocationOwner(difference.traceback), [0, 0])
+                totals[0] += difference.size_diff
+                totals[1] += difference.count_diff
+            return sorted(((owner, size, count) for owner, (size, count) in owners.items()), key=lambda item: item[1], reverse=True)
+
+        return await asyncio.to_thread(compare)
+
+    @Command(
+        "Memory",
+        description="Shows memory used by worlds and players",
+        version="v1.0.0"
+    )
+    class MemoryCommand(AbstractCommand["MemoryUsageModule"]):
+        def __init__(self, *args):
+            super().__init__(*args, ACTIVATORS=["memory", "mem"], OP=True)
+
+        async def execute(self, ctx: Player):
+            output = []
+            residentMemory = getResidentMemory()
+            output.append(f"&aServer Memory: &f{_formatBytes(residentMemory) if residentMemory is not None else 'Unknown'}")
+
+            # Worlds, largest first
+            worlds = sorted(
+                ((world.name, getWorldMemory(world)) for world in ctx.server.worldManager.worlds.values()),
+                key=lambda item: sum(item[1].values()),
+                reverse=True
+            )
+            output.append(f"&aWorlds: &f{_formatBytes(sum(sum(usage.values()) for _, usage in worlds))}")
+            for worldName, usage in worlds[:self.module.config.summaryLines]:
+                output.append(f"&e{worldName}: &f{_formatBytes(usage['map'])} Map, {_formatBytes(usage['metadata'])} Meta, {_formatBytes(usage['other'])} Other")
+
+            # Players, largest first
+            players = sorted(
+                ((player.name, getPlayerMemory(player)) for player in ctx.server.playerManager.getPlayers()),
+                key=lambda item: sum(item[1].values()),
+                reverse=True
+            )
+            output.append(f"&aPlayers: &f{_formatBytes(sum(sum(usage.values()) for _, usage in players))}")
+            for playerName, usage in players[:self.module.config.summaryLines]:
+                output.append(f"&e{playerName}: &f{_formatBytes(usage['buffers'])} Buffers, {_formatBytes(usage['outbound'])} Out, {_formatBytes(usage['inbound'])} In")
+
+            # Send Response Back
+            await ctx.sendMessage(output)
+
+    @Command(
+        "MemoryTrack",
+        description="Tracks memory allocations by module. Usage: /memorytrack start, diff, or stop",
+        version="v1.0.0"
+    )
+    class MemoryTrackCommand(AbstractCommand["MemoryUsageModule"]):
+        def __init__(self, *args):
+            super().__init__(*args, ACTIVATORS=["memorytrack"], OP=True)
+
+        async def execute(self, ctx: Player, action: str):
+            action = action.lower()
+            if action == "start":
+                self.module.startTracking()
+                await ctx.sendMessage("&aMemory Tracking Started! Use /memorytrack diff to see what grew")
+            elif action == "stop":
+                self.module.stopTracking()
+                await ctx.sendMessage("&aMemory Tracking Stopped!")
+            elif action == "diff":
+                differences = await self.module.diffTracking()
+                output = ["&aMemory Growth Since Tracking Started"]
+                for owner, size, count in differences[:self.module.config.summaryLines]:
+                    output.append(f"&e{_formatBytes(size)} &f{owner} &7({count:+d} Blocks)")
+                await ctx.sendMessage(output)
+            else:
+                raise CommandError(f"Unknown Action {action}. Use 'start', 'diff', or 'stop'")
+
+    @dataclass
+    class MemoryUsageConfig(AbstractConfig):
+        # Number of worlds / players / modules shown in chat
+        summaryLines: int = 5
+        # Number of frames recorded per allocation while tracking. More frames attribute allocations better, but are slower
+        traceFrames: int = 10
@@ -0,0 +1,257 @@
+from dataclasses import dataclass
+from types import CodeType, FrameType
+from typing import Optional
+from pathlib import Path
+import threading
+import datetime
+import asyncio
+import cProfile
+import pstats
+import signal
+import time
+import sys
+
+from obsidian.module import Module, AbstractModule, Dependency
+from obsidian.commands import Command, AbstractCommand
+from obsidian.player import Player
+from obsidian.config import AbstractConfig
+from obsidian.constants import SERVER_PATH
+from obsidian.errors import CommandError
+from obsidian.log import Logger
+
+# Max number of frames recorded per sample. Deeper stacks are cut off at the outermost frames
+MAX_SAMPLE_DEPTH = 128
+
+
+# Returns a short name for a function, with its file relative to the server folder if possible
+def _describeFunction(filename: str, lineno: int, name: str, short: bool = False) -> str:
+    try:
+        filename = Path(filename).resolve().relative_to(SERVER_PATH).as_posix()
+    except ValueError:
+        pass
+    if short:
+        filename = Path(filename).name
+    return f"{name} ({filename}:{lineno})"
+
+
+# Profiles everything the event loop runs using cProfile. Accurate, but slows down the server while running
+class CpuProfiler:
+    MODE = "cpu"
+    EXTENSION = "prof"
+
+    def __init__(self, *args, **kwargs):
+        self.profile: cProfile.Profile = cProfile.Profile()
+
+    def start(self):
+        # cProfile only profiles the thread it was enabled from, which is the event loop thread
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path: Path, summaryLines: int) -> list[str]:
+        self.profile.dump_stats(str(path))
+
+        # Summarize functions with the most time spent in them (excluding time spent in functions they called)
+        # Time spent waiting in the selector is the event loop being idle, so it is reported separately
+        stats = pstats.Stats(self.profile).stats  # type: ignore
+        idleTime = sum(tottime for (_, _, name), (_, _, tottime, _, _) in stats.items() if "of 'select." in name)
+        busyStats = [(function, functionStats) for function, functionStats in stats.items() if "of 'select." not in function[2]]
+        busyTime = sum(tottime for _, (_, _, tottime, _, _) in busyStats) or 1
+        topFunctions = sorted(busyStats, key=lambda item: item[1][2], reverse=True)[:summaryLines]
+        return [f"&7Busy: {busyTime * 1000:.0f}ms, Idle: {idleTime * 1000:.0f}ms"] + [
+            f"&e{tottime / busyTime * 100:4.1f}% &f{_describeFunction(filename, lineno, name, short=True)}"
+            for (filename, lineno, name), (_, _, tottime, _, _) in topFunctions
+        ]
+
+
+# Periodically records what the event loop thread is running, writing them as collapsed stacks (for flame graphs).
+# Uses a profiling timer signal when possible, and falls back to sampling from a separate thread otherwise.
+class StackSampler:
+    MODE = "sample"
+    EXTENSION = "collapsed"
+
+    def __init__(self, interval: float):
+        self.interval: float = interval
+        self.counts: dict[tuple[CodeType, ...], int] = {}  # (Innermost Frame, ..., Outermost Frame) -> Number of Samples
+        self.totalSamples: int = 0
+        self._useSignal: bool = False
+        self._previousHandler = None
+        self._samplerThread: Optional[threading.Thread] = None
+        self._targetThreadId: int = threading.get_ident()
+        self._stopping: bool = False
+
+    def start(self):
+        self._targetThreadId = threading.get_ident()
+        # Signals are always handled on the main thread, so only use them if the event loop runs there
+        self._useSignal = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+        if self._useSignal:
+            self._previousHandler = signal.signal(signal.SIGPROF, self._onSignal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._samplerThread = threading.Thread(target=self._samplerLoop, name="StackSampler", daemon=True)
+            self._samplerThread.start()
+
+    def stop(self):
+        if self._useSignal:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previousHandler)
+        else:
+            self._stopping = True
+            if self._samplerThread is not None:
+                self._samplerThread.join()
+
+    def _onSignal(self, signum: int, frame: Optional[FrameType]):
+        self._sample(frame)
+
+    def _samplerLoop(self):
+        while not self._stopping:
+            time.sleep(self.interval)
+            self._sample(sys._current_frames().get(self._targetThreadId))  # pylint: disable=protected-access
+
+    def _sample(self, frame: Optional[FrameType]):
+        stack = []
+        while frame is not None and len(stack) < MAX_SAMPLE_DEPTH:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        key = tuple(stack)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.totalSamples += 1
+
+    def save(self, path: Path, summaryLines: int) -> list[str]:
+        # Write samples in the collapsed stack format, outermost frame first
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.counts.items():
+                frames = ";".join(_describeFunction(code.co_filename, code.co_firstlineno, code.co_name).replace(";", ":") for code in reversed(stack))
+                file.write(f"{frames} {count}\n")
+
+        # Summarize functions that were most often running when sampled
+        selfCounts: dict[CodeType, int] = {}
+        for stack, count in self.counts.items():
+            if stack:
+                selfCounts[stack[0]] = selfCounts.get(stack[0], 0) + count
+        topFunctions = sorted(selfCounts.items(), key=lambda item: item[1], reverse=True)[:summaryLines]
+        if self.totalSamples == 0:
+            return ["&70 Samples (Server Was Idle)"]
+        return [f"&7{self.totalSamples} Samples"] + [
+            f"&e{count / self.totalSamples * 100:4.1f}% &f{_describeFunction(code.co_filename, code.co_firstlineno, code.co_name, short=True)}"
+            for code, count in topFunctions
+        ]
+
+
+@Module(
+    "Profiler",
+    description="Profiles the running server on demand",
+    author="Obsidian",
+    version="1.0.0",
+    dependencies=[Dependency("core")],
+    lazy=True
+)
+class ProfilerModule(AbstractModule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.config = self.initConfig(self.ProfilerConfig)
+        self.profiler: Optional[CpuProfiler | StackSampler] = None
+        self.profileOwner: Optional[Player] = None
+        self._stopHandle: Optional[asyncio.TimerHandle] = None
+        self._stopTask: Optional[asyncio.Task] = None
+        self._stopping: bool = False
+
+    def startProfile(self, owner: Player, mode: str, duration: float):
+        # Only one profile can run at a time
+        if self.profiler is not None:
+            raise CommandError("A Profile Is Already Running! Use /profile stop")
+
+        if mode == CpuProfiler.MODE:
+            self.profiler = CpuProfiler()
+        elif mode == StackSampler.MODE:
+            self.profiler = StackSampler(self.config.sampleInterval)
+        else:
+            raise CommandError(f"Unknown Profile Mode {mode}. Use 'cpu' or 'sample'")
+
+        Logger.info(f"Starting {mode} Profile For {duration}s (Requested By {owner.name})", module="profiler")
+        self.profileOwner = owner
+        self.profiler.start()
+
+        # Make sure the profile does not run forever
+        self._stopHandle = asyncio.get_running_loop().call_later(duration, self._autoStopProfile)
+
+    def _autoStopProfile(self):
+        # Keep a reference to the task, so it is not garbage collected while the profile is saving
+        self._stopHandle = None
+        self._stopTask = asyncio.create_task(self.stopProfile())
+        self._stopTask.add_done_callback(self._onAutoStopDone)
+
+    def _onAutoStopDone(self, task: asyncio.Task):
+        # Retrieve exception so errors while saving the profile are not reported as unhandled
+        self._stopTask = None
+        if not task.cancelled() and task.exception() is not None:
+            Logger.error(f"Error While Automatically Stopping Profile - {type(task.exception()).__name__}: {task.exception()}", module="profiler", printTb=False)
+
+    async def stopProfile(self, requester: Optional[Player] = None):
+        profiler, owner = self.profiler, self.profileOwner
+        if profiler is None or self._stopping:
+            if requester is not None:
+                raise CommandError("No Profile Is Running!")
+            return
+
+        self._stopping = True
+        try:
+            profiler.stop()
+            if self._stopHandle is not None:
+                self._stopHandle.cancel()
+
+            # Save results and summarize them off the event loop, as this can take a while
+            profilePath = Path(SERVER_PATH, self.config.profileFolder)
+            profilePath.mkdir(parents=True, exist_ok=True)
+            profileFile = Path(profilePath, f"{profiler.MODE}-{datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.{profiler.EXTENSION}")
+            summary = await asyncio.to_thread(profiler.save, profileFile, self.config.summaryLines)
+            Logger.info(f"Saved {profiler.MODE} Profile To {profileFile}", module="profiler")
+        finally:
+            self.profiler = None
+            self.profileOwner = None
+            self._stopHandle = None
+            self._stopping = False
+
+        # Send results to whoever started and stopped the profile
+        output = [f"&aProfile Saved To {profileFile.name}"] + summary
+        for player in {requester, owner}:
+            if player is not None and player.networkHandler.isConnected:
+                await player.sendMessage(output)
+
+    @Command(
+        "Profile",
+        description="Profiles the server for a while. Usage: /profile start [cpu|sample] [seconds] or /profile stop",
+        version="v1.0.0"
+    )
+    class ProfileCommand(AbstractCommand["ProfilerModule"]):
+        def __init__(self, *args):
+            super().__init__(*args, ACTIVATORS=["profile"], OP=True)
+
+        async def execute(self, ctx: Player, action: str, mode: str = "cpu", seconds: Optional[int] = None):
+            if action.lower() == "start":
+                # Clamp duration, so a forgotten profile does not slow the server down forever
+                duration = self.module.config.defaultDuration if seconds is None else seconds
+                if duration <= 0:
+                    raise CommandError("Duration Must Be Positive!")
+                duration = min(duration, self.module.config.maxDuration)
+
+                self.module.startProfile(ctx, mode.lower(), duration)
+                await ctx.sendMessage(f"&aStarted {mode.lower()} Profile For {duration}s")
+            elif action.lower() == "stop":
+                await self.module.stopProfile(requester=ctx)
+            else:
+                raise CommandError(f"Unknown Action {action}. Use 'start' or 'stop'")
+
+    @dataclass
+    class ProfilerConfig(AbstractConfig):
+        # Seconds to profile for if not given
+        defaultDuration: int = 30
+        # Max seconds a profile can run for
+        maxDuration: int = 300
+        # Seconds between samples in sample mode
+        sampleInterval: float = 0.005
+        # Number of functions shown in chat once done
+        summaryLines: int = 8
+        # Folder (relative to server folder) to save profiles to
+        profileFolder: str = "profiles"
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from collections import deque
+from typing import Optional
+from pathlib import Path
+import traceback
+import threading
+import asyncio
+import time
+import sys
+
+from obsidian.module import Module, AbstractModule, Dependency
+from obsidian.commands import Command, AbstractCommand
+from obsidian.player import Player
+from obsidian.mixins import Inject, InjectionPoint
+from obsidian.config import AbstractConfig
+from obsidian.metrics import MetricsManager
+from obsidian.constants import SERVER_PATH
+from obsidian.server import Server
+from obsidian.log import Logger
+
+# Lag Metrics
+loopLagMetric = MetricsManager.histogram("obsidian_loop_lag_seconds", "Delay between when the lag monitor should have run and when it did")
+loopStallsMetric = MetricsManager.counter("obsidian_loop_stalls_total", "Number of times the event loop was blocked for longer than the lag threshold")
+
+
+# Returns the source file of a frame, relative to the server folder if possible
+def _relativeSource(filename: str) -> str:
+    try:
+        return Path(filename).resolve().relative_to(SERVER_PATH).as_posix()
+    except ValueError:
+        return filename
+
+
+# Figures out what part of the server a stack belongs to.
+# The innermost module frame wins (as that is usually what is hogging the loop), then the innermost server frame.
+def attributeStack(stack: traceback.StackSummary) -> str:
+    serverFrame = None
+    for frameSummary in reversed(stack):
+        source = _relativeSource(frameSummary.filename)
+        if source.startswith("modules/"):
+            return f"{source}:{frameSummary.lineno} ({frameSummary.name})"
+        if serverFrame is None and not Path(source).is_absolute():
+            serverFrame = f"{source}:{frameSummary.lineno} ({frameSummary.name})"
+    return serverFrame or "unknown"
+
+
+# Measures how late the event loop is in running a periodic task.
+# A separate watchdog thread notices when the loop is stuck, and logs what it is running at the time.
+class LoopLagMonitor:
+    def __init__(self, interval: float, threshold: float, window: float, dumpStacks: bool):
+        self.interval: float = interval  # Seconds between measurements
+        self.threshold: float = threshold  # Lag in seconds considered a stall
+        self.dumpStacks: bool = dumpStacks
+        self.samples: deque[float] = deque(maxlen=max(1, int(window / interval)))  # Recent lag measurements
+        self.stalls: int = 0  # Number of stalls since start
+        self.lastStall: Optional[tuple[float, float, str]] = None  # (Timestamp, Duration, Location) of the most recent stall
+        self._heartbeat: float = time.monotonic()  # When the current measurement started
+        self._reportedHeartbeat: Optional[float] = None  # Heartbeat of the stall last reported by the watchdog
+        self._stallLocation: Optional[str] = None  # Location of the stall the watchdog is currently reporting
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loopThreadId: Optional[int] = None
+        self._stopping: bool = False
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._loopThreadId = threading.get_ident()
+        if self.dumpStacks:
+            threading.Thread(target=self._watchdog, name="LagWatchdog", daemon=True).start()
+
+        try:
+            while True:
+                self._heartbeat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - self._heartbeat - self.interval)
+                self._record(lag)
+        finally:
+            self._stopping = True
+
+    def _record(self, lag: float):
+        self.samples.append(lag)
+        if MetricsManager.ENABLED:
+            loopLagMetric.observe(lag)
+
+        if lag >= self.threshold:
+            self.stalls += 1
+            location = self._stallLocation or "unknown"
+            self.lastStall = (time.time(), lag, location)
+            self._stallLocation = None
+            if MetricsManager.ENABLED:
+                loopStallsMetric.inc()
+            Logger.warn(f"Event Loop Was Blocked For {lag * 1000:.0f}ms (In {location})", module="server-lag")
+
+    def _watchdog(self):
+        # Check a few times per threshold, so stalls are caught while they are still happening
+        checkInterval = min(self.interval, self.threshold) / 2
+        while not self._stopping:
+            time.sleep(checkInterval)
+            heartbeat = self._heartbeat
+            stalledFor = time.monotonic() - heartbeat - self.interval
+            if stalledFor < self.threshold or self._reportedHeartbeat == heartbeat:
+                continue
+            self._reportedHeartbeat = heartbeat
+
+            try:
+                self._reportStall(stalledFor)
+            except Exception as e:
+                Logger.error(f"Error While Capturing Stalled Event Loop - {type(e).__name__}: {e}", module="server-lag", printTb=False)
+
+    def _reportStall(self, stalledFor: float):
+        # Grab what the event loop thread is doing right now
+        frame = sys._current_frames().get(self._loopThreadId)  # pylint: disable=protected-access
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        del frame
+        self._stallLocation = attributeStack(stack)
+
+        # Get the task being run, if any
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        taskName = task.get_name() if task is not None else "None"
+
+        Logger.warn(f"Event Loop Blocked For Over {stalledFor * 1000:.0f}ms In {self._stallLocation} (Task {taskName})", module="server-lag")
+        Logger.warn("Event Loop Stack:\n" + "".join(stack.format()).rstrip(), module="server-lag")
+
+    def getPercentiles(self, *percentiles: float) -> list[float]:
+        samples = sorted(self.samples)
+        if not samples:
+            return [0.0 for _ in percentiles]
+        return [samples[min(len(samples) - 1, int(len(samples) * percentile / 100))] for percentile in percentiles]
+
+
+@Module(
+    "ServerLag",
+    description="Monitors and reports event loop lag",
+    author="Obsidian",
+    version="1.0.0",
+    dependencies=[Dependency("core")]
+)
+class ServerLagModule(AbstractModule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.config = self.initConfig(self.ServerLagConfig)
+        self.monitor: Optional[LoopLagMonitor] = None
+        self.monitorTask: Optional[asyncio.Task] = None
+
+    def postInit(self, **kwargs):
+        # Check if the module is enabled
+        if not self.config.enabled:
+            Logger.info("The Lag Monitor is disabled! Not starting module.", module="server-lag")
+            return
+
+        if self.config.interval <= 0 or self.config.threshold <= 0:
+            Logger.warn("Lag Monitor Interval And Threshold Must Be Positive! Not starting module.", module="server-lag")
+            return
+
+        Logger.debug("Injecting lag monitor into ProjectObsidian", module="server-lag")
+
+        @Inject(target=Server.run, at=InjectionPoint.BEFORE)
+        async def startLagMonitor(server_self, *args, **kwargs):
+            self.monitor = LoopLagMonitor(self.config.interval, self.config.threshold, self.config.window, self.config.dumpStacks)
+            Logger.debug(f"Starting lag monitor every {self.config.interval}s", module="server-lag")
+            self.monitorTask = asyncio.create_task(self.monitor.run(), name="LagMonitor")
+
+    @Command(
+        "Lag",
+        description="Shows recent event loop lag",
+        version="v1.0.0"
+    )
+    class LagCommand(AbstractCommand["ServerLagModule"]):
+        def __init__(self, *args):
+            super().__init__(*args, ACTIVATORS=["lag"], OP=True)
+
+        async def execute(self, ctx: Player):
+            monitor = self.module.monitor
+            if monitor is None:
+                await ctx.sendMessage("&cLag Monitor Is Not Running!")
+                return
+
+            # Generate lag report
+            p50, p90, p99, peak = monitor.getPercentiles(50, 90, 99, 100)
+            output = []
+            output.append(f"&aEvent Loop Lag (Last {len(monitor.samples) * monitor.interval:.0f}s)")
+            output.append(f"&ep50: &f{p50 * 1000:.1f}ms &ep90: &f{p90 * 1000:.1f}ms &ep99: &f{p99 * 1000:.1f}ms &eMax: &f{peak * 1000:.1f}ms")
+            output.append(f"&eStalls Over {monitor.threshold * 1000:.0f}ms: &f{monitor.stalls}")
+            if monitor.lastStall is not None:
+                stallTime, stallDuration, stallLocation = monitor.lastStall
+                output.append(f"&eLast Stall: &f{stallDuration * 1000:.0f}ms, {time.time() - stallTime:.0f}s ago")
+                output.append(f"&7In {stallLocation}")
+
+            # Send Response Back
+            await ctx.sendMessage(output)
+
+    @dataclass
+    class ServerLagConfig(AbstractConfig):
+        # Determine whether or not the lag monitor runs
+        enabled: bool = True
+        # Seconds between lag measurements
+        interval: float = 0.1
+        # Lag in seconds before it is reported as a stall
+        threshold: float = 0.25
+        # Seconds of measurements to keep for /lag
+        window: float = 300
+        # Log the stack of the event loop when it stalls
+        dumpStacks: bool = True
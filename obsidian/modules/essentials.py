@@ -1,11 +1,11 @@
-from typing import Optional
+from typing import Any, Optional
 import inspect
 import random
 import math
 
 from obsidian.module import Module, AbstractModule, ModuleManager, Dependency
 from obsidian.constants import PY_VERSION, __version__
-from obsidian.types import _formatUsername, _formatIp
+from obsidian.types import _formatUsername, _formatIp, _formatIpRange
 from obsidian.player import Player
 from obsidian.world import World
 from obsidian.mapgen import AbstractMapGenerator, MapGeneratorStatus, MapGenerator
@@ -35,6 +35,29 @@ from obsidian.modules.core import CommandHelper
 class EssentialsModule(AbstractModule):
     def __init__(self, *args):
         super().__init__(*args)
+        # Commands and pages shown by help, for each op status. Cleared when commands or disabled commands change
+        self.helpCache: dict[tuple, Any] = {}
+        self.helpCacheVersion: tuple[int, int] = (-1, -1)  # (Disabled Commands Version, Command Registry Version)
+
+    # Returns the help cache, clearing it first if it was built for an older list of commands
+    def getHelpCache(self, ctx: Player) -> dict[tuple, Any]:
+        version = (ctx.server.config.disabledCommandsVersion, CommandManager.registryVersion)
+        if version != self.helpCacheVersion:
+            self.helpCache = {}
+            self.helpCacheVersion = version
+        return self.helpCache
+
+    # Returns the commands a player can see in help
+    # If user is not OP, filter out OP and Disabled commands
+    def getHelpCommands(self, ctx: Player) -> dict[str, AbstractCommand]:
+        helpCache = self.getHelpCache(ctx)
+        cacheKey = ("commands", ctx.opStatus)
+        if cacheKey not in helpCache:
+            cmdList = dict(CommandManager._commandDict)
+            if not ctx.opStatus:
+                cmdList = {k: v for k, v in cmdList.items() if (not v.OP) and (not ctx.server.config.isCommandDisabled(v.NAME))}
+            helpCache[cacheKey] = cmdList
+        return helpCache[cacheKey]
 
     #
     # MAP GENERATORS
@@ -117,10 +140,7 @@ class EssentialsModule(AbstractModule):
                 raise CommandError(f"{query} is not a plugin or a command.")
 
             # Generate and Parse list of commands
-            cmdList = CommandManager._commandDict
-            # If user is not OP, filter out OP and Disabled commands
-            if not ctx.opStatus:
-                cmdList = {k: v for k, v in cmdList.items() if (not v.OP) and (v.NAME not in ctx.playerManager.server.config.disabledCommands)}
+            cmdList = self.module.getHelpCommands(ctx)
 
             # Alias pageOrQuery to just page
             page = pageNumOrQuery
@@ -135,6 +155,12 @@ class EssentialsModule(AbstractModule):
             if page > numPages or page <= 0:
                 raise CommandError(f"There are only {numPages} pages of commands!")
 
+            # Reuse the page if it was already generated for the current list of commands
+            helpCache = self.module.getHelpCache(ctx)
+            cacheKey = ("page", ctx.opStatus, page)
+            if cacheKey in helpCache:
+                return await ctx.sendMessage(list(helpCache[cacheKey]))
+
             # Get a list of commands registered
             commands = tuple(cmdList.items())
 
@@ -151,7 +177,7 @@ class EssentialsModule(AbstractModule):
                 helpMessage = f"&d[{cmdName}] &e/{cmd.ACTIVATORS[0]}"
                 if cmd.OP:
                     helpMessage = "&4[OP] " + helpMessage
-                if cmd.NAME in ctx.server.config.disabledCommands:
+                if ctx.server.config.isCommandDisabled(cmd.NAME):
                     helpMessage = "&4[DISABLED] " + helpMessage
                 if len(cmd.ACTIVATORS) > 1:
                     helpMessage += f" &7(Aliases: {', '.join(['/'+c for c in cmd.ACTIVATORS][1:])})"
@@ -163,6 +189,7 @@ class EssentialsModule(AbstractModule):
             output.append(CommandHelper.centerMessage(f"&eTotal Commands: {numCommands}", color="&2"))
 
             # Send Message
+            helpCache[cacheKey] = tuple(output)
             await ctx.sendMessage(output)
 
     @Command(
@@ -176,12 +203,9 @@ class EssentialsModule(AbstractModule):
 
         async def execute(self, ctx: Player, module: AbstractModule, page: int = 1):
             # Generate and Parse list of commands
-            cmdList = CommandManager._commandDict
+            cmdList = self.module.getHelpCommands(ctx)
             # Filter to commands from only one plugin
             cmdList = {k: v for k, v in cmdList.items() if v.MODULE == module}
-            # If user is not OP, filter out OP and Disabled commands
-            if not ctx.opStatus:
-                cmdList = {k: v for k, v in cmdList.items() if (not v.OP) and (v.NAME not in ctx.playerManager.server.config.disabledCommands)}
 
             # Get information on the number of commands, pages, and commands per page
             numCommands = len(cmdList)
@@ -212,7 +236,7 @@ class EssentialsModule(AbstractModule):
                 helpMessage = f"&d[{cmdName}] &e/{cmd.ACTIVATORS[0]}"
                 if cmd.OP:
                     helpMessage = "&4[OP] " + helpMessage
-                if cmd.NAME in ctx.server.config.disabledCommands:
+                if ctx.server.config.isCommandDisabled(cmd.NAME):
                     helpMessage = "&4[DISABLED] " + helpMessage
                 if len(cmd.ACTIVATORS) > 1:
                     helpMessage += f" &7(Aliases: {', '.join(['/'+c for c in cmd.ACTIVATORS][1:])})"
@@ -302,7 +326,7 @@ class EssentialsModule(AbstractModule):
                 output.append("&4[NOTICE] &fThis Command Is For Operators and Admins Only!")
 
             # If command is disabled only, add a warning
-            if cmd.NAME in ctx.server.config.disabledCommands:
+            if ctx.server.config.isCommandDisabled(cmd.NAME):
                 output.append("&4[NOTICE] &fThis Command Is DISABLED!")
 
             output.append(CommandHelper.centerMessage(f"&ePlugin: {cmd.MODULE.NAME} v. {cmd.MODULE.VERSION}", color="&2"))
@@ -321,10 +345,7 @@ class EssentialsModule(AbstractModule):
 
         async def execute(self, ctx: Player, showAlias: bool = False):
             # Generate and Parse list of commands
-            cmdList = CommandManager._commandDict
-            # If user is not OP, filter out OP and Disabled commands
-            if not ctx.opStatus:
-                cmdList = {k: v for k, v in cmdList.items() if (not v.OP) and (v.NAME not in ctx.playerManager.server.config.disabledCommands)}
+            cmdList = self.module.getHelpCommands(ctx)
 
             # Generate command output
             output = []
@@ -942,8 +963,14 @@ class EssentialsModule(AbstractModule):
         def __init__(self, *args):
             super().__init__(*args, ACTIVATORS=["join", "joinworld", "wjoin", "jw", "wj"])
 
-        async def execute(self, ctx: Player, world: World):
-            await ctx.changeWorld(world)
+        async def execute(self, ctx: Player, world: str):
+            # In cluster mode, the world may be owned by another worker
+            if ctx.server.cluster is not None and ctx.server.cluster.isRemoteWorld(world.lower()):
+                await ctx.sendMessage(f"&eWhisking You Off To &b{world.lower()}&e...")
+                await ctx.server.cluster.handoffPlayer(ctx.networkHandler, world.lower())
+                return
+
+            await ctx.changeWorld(World._convertArgument(ctx.server, world))
 
     @Command(
         "ListWorlds",
@@ -968,6 +995,13 @@ class EssentialsModule(AbstractModule):
             # Generate Player List Output
             output += CommandHelper.formatList(worldList, processInput=lambda p: str(p.name), initialMessage="&e", separator=", ", lineStart="&e")
 
+            # In cluster mode, also list worlds owned by other workers
+            if ctx.server.cluster is not None:
+                remoteWorlds = sorted(name for name in ctx.server.cluster.worldOwners if ctx.server.cluster.isRemoteWorld(name))
+                if remoteWorlds:
+                    output.append("&7Worlds On Other Workers:")
+                    output += CommandHelper.formatList(remoteWorlds, initialMessage="&e", separator=", ", lineStart="&e")
+
             # Add Footer
             output.append(CommandHelper.centerMessage(f"&eServer Name: {ctx.server.name}", color="&2"))
 
@@ -1261,7 +1295,7 @@ class EssentialsModule(AbstractModule):
 
     @Command(
         "BanIp",
-        description="Bans an ip",
+        description="Bans an ip or an ip range (i.e. 10.0.0.0/8)",
         version="v1.0.0"
     )
     class BanIpCommand(AbstractCommand["EssentialsModule"]):
@@ -1269,11 +1303,11 @@ class EssentialsModule(AbstractModule):
             super().__init__(*args, ACTIVATORS=["banip"], OP=True)
 
         async def execute(self, ctx: Player, ip: str, *, reason: str = "You Have Been Banned By An Operator"):
-            # Check if IP is valid
+            # Check if IP or IP range is valid
             try:
-                ip = _formatIp(ip)
+                ip = _formatIpRange(ip)
             except TypeError:
-                raise CommandError(f"Ip {ip} is not a valid Ip!")
+                raise CommandError(f"Ip {ip} is not a valid Ip or Ip range!")
 
             # Check if Ip is already banned
             serverConfig = ctx.server.config
@@ -1285,35 +1319,50 @@ class EssentialsModule(AbstractModule):
             serverConfig.save()
 
             # If Ip Is Connected, Kick Players With That Ip
-            if ctx.playerManager.getPlayersByIp(ip):
-                await ctx.playerManager.kickPlayerByIp(ip, reason=reason)
+            if "/" not in ip:
+                if ctx.playerManager.getPlayersByIp(ip):
+                    await ctx.playerManager.kickPlayerByIp(ip, reason=reason)
+            else:
+                # Ranges can match multiple ips, so kick everyone who is now banned
+                for player in list(ctx.playerManager.players.values()):
+                    if serverConfig.isIpBanned(player.networkHandler.ip):
+                        await player.networkHandler.closeConnection(reason, notifyPlayer=True, chatMessage="Kicked By Server")
 
             # Send Response Back
             await ctx.sendMessage(f"&aIp {ip} Banned!")
 
     @Command(
         "PardonIp",
-        description="Pardons an Ip",
+        description="Pardons an Ip or an Ip range (i.e. 10.0.0.0/8)",
         version="v1.0.0"
     )
     class PardonIpCommand(AbstractCommand["EssentialsModule"]):
         def __init__(self, *args):
-            super().__init__(*args, ACTIVATORS=["pardonip"], OP=True)
+            super().__init__(*args, ACTIVATORS=["pardonip", "unbanip"], OP=True)
 
         async def execute(self, ctx: Player, ip: str):
-            # Check if IP is valid
+            # Check if IP or IP range is valid
             try:
-                ip = _formatIp(ip)
+                ip = _formatIpRange(ip)
             except TypeError:
-                raise CommandError(f"Ip {ip} is not a valid Ip!")
+                raise CommandError(f"Ip {ip} is not a valid Ip or Ip range!")
 
             # Check if Ip is Banned
+            # Ranges added by hand may not be normalized, so compare entries the same way they were parsed
             serverConfig = ctx.server.config
-            if ip not in serverConfig.bannedIps:
+            matchingEntries = []
+            for entry in serverConfig.bannedIps:
+                try:
+                    if _formatIpRange(entry) == ip:
+                        matchingEntries.append(entry)
+                except TypeError:
+                    continue
+            if not matchingEntries:
                 raise CommandError(f"Ip {ip} is not banned!")
 
             # Remove Ip From Banned Ips List
-            serverConfig.bannedIps.remove(ip)
+            for entry in matchingEntries:
+                serverConfig.bannedIps.remove(entry)
             serverConfig.save()
 
             # Send Response Back
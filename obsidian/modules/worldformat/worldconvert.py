@@ -16,7 +16,8 @@ from obsidian.modules.core import CommandHelper
     description="Helper commands for converting worlds between different formats",
     author="Obsidian",
     version="1.0.0",
-    dependencies=[Dependency("core")]
+    dependencies=[Dependency("core")],
+    lazy=True
 )
 class WorldConverterModule(AbstractModule):
     def __init__(self, *args):
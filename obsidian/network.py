@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-from typing import Type, Optional, Callable, TYPE_CHECKING
+import time
+from typing import Type, Optional, Callable, Any, TYPE_CHECKING
 
 from obsidian.log import Logger
+from obsidian.metrics import MetricsManager
 from obsidian.world import World
 from obsidian.player import Player
 from obsidian.cpe import CPEExtension
@@ -16,6 +18,7 @@ from obsidian.packet import (
 from obsidian.constants import (
     __version__,
     NET_TIMEOUT,
+    MAX_CPE_EXTENSIONS,
     CRITICAL_REQUEST_ERRORS,
     CRITICAL_RESPONSE_ERRORS
 )
@@ -29,10 +32,19 @@ from obsidian.types import (
 
 if TYPE_CHECKING:
     from obsidian.server import Server
+    from obsidian.admission import AdmissionTicket
+
+# Network Metrics
+packetsSentMetric = MetricsManager.counter("obsidian_packets_sent_total", "Number of packets sent to clients", ("packet",))
+packetsReceivedMetric = MetricsManager.counter("obsidian_packets_received_total", "Number of packets received from clients", ("packet",))
+bytesSentMetric = MetricsManager.counter("obsidian_bytes_sent_total", "Number of bytes sent to clients")
+packetsDroppedMetric = MetricsManager.counter("obsidian_packets_dropped_total", "Number of packets dropped for throttled clients", ("packet",))
+bytesReceivedMetric = MetricsManager.counter("obsidian_bytes_received_total", "Number of bytes received from clients")
+mapSendMetric = MetricsManager.histogram("obsidian_map_send_seconds", "Time taken to send a world to a player")
 
 
 class NetworkHandler:
-    def __init__(self, server: Server, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    def __init__(self, server: Server, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, admissionTicket: Optional[AdmissionTicket] = None):
         self.server: Server = server
         self.reader: asyncio.StreamReader = reader
         self.writer: asyncio.StreamWriter = writer
@@ -43,6 +55,8 @@ class NetworkHandler:
         self.isConnected: bool = True  # Connected Flag So Outbound Queue Buffer Can Stop
         self.inLoop: bool = False  # In Loop Flag so that functions know when to use a different implementation
         self.player: Optional[Player] = None
+        self.admissionTicket: Optional[AdmissionTicket] = admissionTicket  # Released once the player has finished logging in
+        self.handshakeDeadline: float = 0  # Time (monotonic) by which the client has to finish the login protocol
 
     async def initConnection(self, *args, **kwargs):
         try:
@@ -69,17 +83,23 @@ class NetworkHandler:
             except Exception as ex:
                 Logger.error(f"Close Connected Failed To Complete Successfully - {type(ex).__name__}: {ex}", module="network")
 
-    async def _initConnection(self):
+    async def _initConnection(self, handoff: Optional[dict[str, Any]] = None):
         # Log Connection
         Logger.info(f"New Connection From {self.connectionInfo}", module="network")
 
         # Check if user is IP banned
-        if self.ip in self.server.config.bannedIps:
+        if self.server.config.isIpBanned(self.ip):
             Logger.info(f"IP {self.connectionInfo} Is Banned. Kicking!", module="network")
             raise ClientError("Your IP Has Been Banned From The Server!")
 
+        # Connections handed off by another worker have already finished the login protocol
+        if handoff is not None:
+            Logger.debug(lambda: f"{self.connectionInfo} | Resuming Connection Handed Off By Another Worker", module="network")
+            await self._handleHandoff(handoff)
+            return
+
         # Start the server <-> client login protocol
-        Logger.debug(f"{self.connectionInfo} | Starting Client <-> Server Handshake", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Starting Client <-> Server Handshake", module="network")
         await self._handleInitialHandshake()
 
     async def _handleInitialHandshake(self):
@@ -87,9 +107,15 @@ class NetworkHandler:
         if not self.server.initialized or not self.server.worldManager or not self.server.playerManager:
             raise ServerError("Cannot Initialize Handshake Protocol When Server is not Initialized!")
 
+        # The whole login protocol has to be finished within the handshake timeout, not just each packet
+        self.handshakeDeadline = time.monotonic() + self.server.config.handshakeTimeout
+
         # Wait For Player Identification Packet
-        Logger.debug(f"{self.connectionInfo} | Waiting For Initial Player Information Packet", module="network")
-        protocolVersion, username, verificationKey, supportsCPE = await self.dispatcher.readPacket(Packets.Request.PlayerIdentification)
+        Logger.debug(lambda: f"{self.connectionInfo} | Waiting For Initial Player Information Packet", module="network")
+        protocolVersion, username, verificationKey, supportsCPE = await self.dispatcher.readPacket(
+            Packets.Request.PlayerIdentification,
+            timeout=self.getHandshakeTimeout()
+        )
 
         # Checking Client Protocol Version
         if protocolVersion > self.server.protocolVersion:
@@ -101,16 +127,22 @@ class NetworkHandler:
         if verificationKey != hashlib.md5(self.server.salt.encode() + username.encode()).hexdigest():
             authenticated = False
             Logger.warn(f"User {username} tried logging in with invalid verification key {verificationKey}!", module="network")
-            Logger.debug(f"{self.connectionInfo} | Login verification FAILED for Player {username}", module="network")
+            Logger.debug(lambda: f"{self.connectionInfo} | Login verification FAILED for Player {username}", module="network")
             if self.server.config.verifyLogin:
                 raise ClientError("Username Verification Failed!")
         else:
             authenticated = True
-            Logger.debug(f"{self.connectionInfo} | Login verified for Player {username}", module="network")
+            Logger.debug(lambda: f"{self.connectionInfo} | Login verified for Player {username}", module="network")
 
         # Create Player
-        Logger.debug(f"{self.connectionInfo} | Creating Player {username}", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Creating Player {username}", module="network")
         self.player = await self.server.playerManager.createPlayer(self, username, verificationKey, authenticated)
+        Logger.setPlayerContext(self.player)
+
+        # In cluster mode, also make sure the username is not in use on any other worker
+        if self.server.cluster is not None:
+            Logger.debug(lambda: f"{self.connectionInfo} | Reserving Player {username} In Cluster", module="network")
+            await self.server.cluster.reservePlayer(self.player.username)
 
         # If client supports CPE and if server enables CPE, start CPE negotiation
         # CPE stands for Classic Protocol Extension, and is defined here: https://wiki.vg/Classic_Protocol_Extension
@@ -119,28 +151,44 @@ class NetworkHandler:
             await self._handleCPENegotiation()
 
         # Send Server Information Packet
-        Logger.debug(f"{self.connectionInfo} | Sending Initial Server Information Packet", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Initial Server Information Packet", module="network")
         await self.dispatcher.sendPacket(Packets.Response.ServerIdentification, self.server.protocolVersion, self.server.name, self.server.motd, 0x00)
 
+        # In cluster mode, the default world may be owned by another worker. If so, hand the player off to it
+        if self.server.cluster is not None and self.server.cluster.isRemoteWorld(self.server.config.defaultWorld):
+            Logger.debug(lambda: f"{self.connectionInfo} | Default World Is On Another Worker. Handing Off Player", module="network")
+            await self.server.cluster.handoffPlayer(self, self.server.config.defaultWorld, login=True)
+            return
+
+        # Login protocol is done, free up handshake slot before sending the (potentially slow) world data
+        self.releaseAdmissionTicket()
+
+        # Join Default World
+        await self._handleServerJoin(self.server.worldManager.worlds[self.server.config.defaultWorld])
+
+    async def _handleServerJoin(self, defaultWorld: World):
+        # Check if player is not None
+        if self.player is None:
+            raise ServerError("Trying To Join Server Before Player Is Initialized!")
+
         # Sending World Data Of Default World
-        defaultWorld = self.server.worldManager.worlds[self.server.config.defaultWorld]
-        Logger.debug(f"{self.connectionInfo} | Preparing To Send World {defaultWorld.name}", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send World {defaultWorld.name}", module="network")
         await self.sendWorldData(defaultWorld)
 
         # Send global message that player has connected to the server
-        Logger.debug(f"{self.connectionInfo} | Sending Global Player Join Message", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Global Player Join Message", module="network")
         await self.player.playerManager.sendGlobalMessage(f"&2{self.player.name} connected to the server!")
 
         # Join Default World
-        Logger.debug(f"{self.connectionInfo} | Joining Default World {defaultWorld.name}", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Joining Default World {defaultWorld.name}", module="network")
         await self.player.joinWorld(defaultWorld)
 
         # Player Spawn Packet
-        Logger.debug(f"{self.connectionInfo} | Preparing To Send Spawn Player Information", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send Spawn Player Information", module="network")
         await self.dispatcher.sendPacket(
             Packets.Response.SpawnPlayer,
             255,
-            username,
+            self.player.name,
             self.player.posX,
             self.player.posY,
             self.player.posZ,
@@ -149,11 +197,52 @@ class NetworkHandler:
         )
 
         # Perform any post login actions
-        Logger.debug(f"{self.connectionInfo} | Performing Post Login Actions", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Performing Post Login Actions", module="network")
         await self._processPostLogin()
 
         # Setup And Begin Player Loop
-        Logger.debug(f"{self.connectionInfo} | Starting Player Loop", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Starting Player Loop", module="network")
+        await self._beginPlayerLoop()
+
+    async def _handleHandoff(self, state: dict[str, Any]):
+        # Check that the world is still here
+        world = self.server.worldManager.worlds.get(state["world"])
+        if world is None:
+            raise ClientError(f"World {state['world']} Not Found!")
+
+        # Recreate Player With The State Sent Over By The Previous Worker
+        Logger.debug(lambda: f"{self.connectionInfo} | Creating Player {state['displayName']}", module="network")
+        self.player = await self.server.playerManager.createPlayer(self, state["displayName"], state["verificationKey"], state["authenticated"])
+        Logger.setPlayerContext(self.player)
+        self.player.clientSoftware = state["clientSoftware"]
+        self.player.supportsCPE = state["supportsCPE"]
+        self.player._extensions = {CPEExtension(extName, extVersion) for extName, extVersion in state["extensions"]}
+
+        # Player handed off during login still has to finish joining the server
+        if state["login"]:
+            await self._handleServerJoin(world)
+            return
+
+        # Otherwise, finish the world change started by the previous worker
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send World {world.name}", module="change-world")
+        await self.sendWorldData(world)
+
+        Logger.debug(lambda: f"{self.connectionInfo} | Joining New World {world.name}", module="change-world")
+        await self.player.joinWorld(world)
+
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send Spawn Player Information", module="change-world")
+        await self.dispatcher.sendPacket(
+            Packets.Response.SpawnPlayer,
+            255,
+            self.player.name,
+            self.player.posX,
+            self.player.posY,
+            self.player.posZ,
+            self.player.posYaw,
+            self.player.posPitch
+        )
+
+        Logger.debug(lambda: f"{self.connectionInfo} | Starting Player Loop", module="network")
         await self._beginPlayerLoop()
 
     async def _handleCPENegotiation(self):
@@ -169,45 +258,61 @@ class NetworkHandler:
         self.player.supportsCPE = True
 
         # Send Server ExtInfo Packet
-        Logger.debug(f"{self.connectionInfo} | Sending Server CPE ExtInfo (Extension Info) Packet", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Server CPE ExtInfo (Extension Info) Packet", module="network")
         await self.dispatcher.sendPacket(Packets.Response.ServerExtInfo, f"ProjectObsidian - {__version__}", len(self.server.getSupportedCPE()))
 
         # Send ExtEntry Packet For Each Extension that server supports
-        Logger.debug(f"{self.connectionInfo} | Sending Server CPE ExtEntry (Extension Entry) Packets", module="network")
-        Logger.debug(f"{self.connectionInfo} | Server supports {len(self.server.getSupportedCPE())} extensions", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Server CPE ExtEntry (Extension Entry) Packets", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Server supports {len(self.server.getSupportedCPE())} extensions", module="network")
         for extension in self.server.getSupportedCPE():
-            Logger.debug(f"{self.connectionInfo} | Sending Server CPE ExtEntry for {extension.name} version {extension.version}", module="network")
+            if Logger.DEBUG:
+                Logger.debug(f"{self.connectionInfo} | Sending Server CPE ExtEntry for {extension.name} version {extension.version}", module="network")
             await self.dispatcher.sendPacket(Packets.Response.ServerExtEntry, extension.name, extension.version)
 
         # Receive Client ExtInfo Packet
-        Logger.debug(f"{self.connectionInfo} | Waiting For Player CPE ExtInfo (Extension Info) Packet", module="network")
-        clientSoftware, extensionCount = await self.dispatcher.readPacket(Packets.Request.PlayerExtInfo)
-        Logger.debug(f"{self.connectionInfo} | ExtInfo Received! Client supports {extensionCount} extensions", module="network")
-        Logger.debug(f"{self.connectionInfo} | Client is also running on software: {clientSoftware}", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Waiting For Player CPE ExtInfo (Extension Info) Packet", module="network")
+        clientSoftware, extensionCount = await self.dispatcher.readPacket(Packets.Request.PlayerExtInfo, timeout=self.getHandshakeTimeout())
+        if extensionCount > MAX_CPE_EXTENSIONS:
+            raise ClientError(f"Too Many CPE Extensions ({extensionCount})")
+        Logger.debug(lambda: f"{self.connectionInfo} | ExtInfo Received! Client supports {extensionCount} extensions", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Client is also running on software: {clientSoftware}", module="network")
         self.player.clientSoftware = clientSoftware
 
         # Receive Client ExtEntry Packets
         for extNum in range(extensionCount):
-            Logger.debug(f"{self.connectionInfo} | Waiting Client CPE ExtEntry #{extNum}", module="network")
-            extName, extVersion = await self.dispatcher.readPacket(Packets.Request.PlayerExtEntry)
-            Logger.debug(f"{self.connectionInfo} | ExtEntry Received! Client supports {extName} version {extVersion}", module="network")
+            if Logger.DEBUG:
+                Logger.debug(f"{self.connectionInfo} | Waiting Client CPE ExtEntry #{extNum}", module="network")
+            extName, extVersion = await self.dispatcher.readPacket(Packets.Request.PlayerExtEntry, timeout=self.getHandshakeTimeout())
+            if Logger.DEBUG:
+                Logger.debug(f"{self.connectionInfo} | ExtEntry Received! Client supports {extName} version {extVersion}", module="network")
             self.player._extensions.add(CPEExtension(extName, extVersion))
 
         # Finish CPE Negotiation
         Logger.info(f"{self.connectionInfo} | Finished CPE Negotiation", module="network")
 
+    # Seconds left for the client to finish the login protocol
+    def getHandshakeTimeout(self) -> float:
+        return max(self.handshakeDeadline - time.monotonic(), 0)
+
+    # Free up the handshake slot of this connection (if not already)
+    def releaseAdmissionTicket(self):
+        if self.admissionTicket is not None:
+            self.admissionTicket.release()
+
     async def _processPostLogin(self):
         # Check if player is not None
         if self.player is None:
             raise ServerError("Trying To Process Post Login Actions Before Player Is Initialized!")
 
         # Send MOTD to user
-        Logger.debug(f"{self.connectionInfo} | Sending MOTD", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending MOTD", module="network")
         await self.player.sendMOTD()
 
     async def _beginPlayerLoop(self):
         # Set the inLoop flag
         self.inLoop = True
+        # Login is complete, free up handshake slot (if not already)
+        self.releaseAdmissionTicket()
         # Called to handle Player Loop Packets
         # (Packets Sent During Normal Player Gameplay)
         while self.isConnected:
@@ -222,24 +327,27 @@ class NetworkHandler:
             raise ServerError(f"Player {self.player.name} Not In World")
 
         # Change Server Information To Include "Switching Server..."
-        Logger.debug(f"{self.connectionInfo} | Changing Server Information Packet", module="change-world")
+        Logger.debug(lambda: f"{self.connectionInfo} | Changing Server Information Packet", module="change-world")
         await self.dispatcher.sendPacket(Packets.Response.ServerIdentification, self.server.protocolVersion, self.server.name, f"Joining {world.name}...", 0x00)
 
         # Disconnect Player from Current World Manager and Remove worldPlayerManager from user
-        Logger.debug(f"{self.connectionInfo} | Removing Player From Current World {previousWorld.name}", module="change-world")
+        Logger.debug(lambda: f"{self.connectionInfo} | Removing Player From Current World {previousWorld.name}", module="change-world")
         await self.player.worldPlayerManager.removePlayer(self.player, reason=f"Switching World To {world.name}")
         self.player.worldPlayerManager = None
 
+        # Drop any position updates of players in the previous world
+        self.dispatcher.cancelMovementUpdates()
+
         # Sending World Data Of Default World
-        Logger.debug(f"{self.connectionInfo} | Preparing To Send World {world.name}", module="change-world")
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send World {world.name}", module="change-world")
         await self.sendWorldData(world)
 
         # Join Default World
-        Logger.debug(f"{self.connectionInfo} | Joining New World {world.name}", module="change-world")
+        Logger.debug(lambda: f"{self.connectionInfo} | Joining New World {world.name}", module="change-world")
         await self.player.joinWorld(world)
 
         # Player Spawn Packet
-        Logger.debug(f"{self.connectionInfo} | Preparing To Send Spawn Player Information", module="change-world")
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send Spawn Player Information", module="change-world")
         await self.dispatcher.sendPacket(
             Packets.Response.SpawnPlayer,
             255,
@@ -252,25 +360,28 @@ class NetworkHandler:
         )
 
     async def sendWorldData(self, world: World):
+        startTime = time.perf_counter()
+
         # Send Level Initialize Packet
-        Logger.debug(f"{self.connectionInfo} | Sending Level Initialize Packet", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Level Initialize Packet", module="network")
         await self.dispatcher.sendPacket(Packets.Response.LevelInitialize)
 
         # Preparing To Send Map
-        Logger.debug(f"{self.connectionInfo} | Preparing To Send Map", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Preparing To Send Map", module="network")
         worldGzip = world.gzipMap(includeSizeHeader=True)  # Generate GZIP
         # World Data Needs To Be Sent In Chunks Of 1024 Characters
         chunks = [worldGzip[i: i + 1024] for i in range(0, len(worldGzip), 1024)]
 
         # Looping Through All Chunks And Sending Data
-        Logger.debug(f"{self.connectionInfo} | Sending Chunk Data", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Chunk Data", module="network")
         for chunkCount, chunk in enumerate(chunks):
             # Sending Chunk Data
-            Logger.verbose(f"{self.connectionInfo} | Sending Chunk Data {chunkCount + 1} of {len(chunks)}", module="network")
+            if Logger.VERBOSE:
+                Logger.verbose(f"{self.connectionInfo} | Sending Chunk Data {chunkCount + 1} of {len(chunks)}", module="network")
             await self.dispatcher.sendPacket(Packets.Response.LevelDataChunk, chunk, percentComplete=int((100 / len(chunks)) * chunkCount))
 
         # Send Level Finalize Packet
-        Logger.debug(f"{self.connectionInfo} | Sending Level Finalize Packet", module="network")
+        Logger.debug(lambda: f"{self.connectionInfo} | Sending Level Finalize Packet", module="network")
         await self.dispatcher.sendPacket(
             Packets.Response.LevelFinalize,
             world.sizeX,
@@ -278,6 +389,9 @@ class NetworkHandler:
             world.sizeZ
         )
 
+        if MetricsManager.ENABLED:
+            mapSendMetric.observe(time.perf_counter() - startTime)
+
     async def closeConnection(self, reason: str, notifyPlayer: bool = False, chatMessage: Optional[str] = None):
         # Check if user has already been disconnected
         if not self.isConnected:
@@ -294,13 +408,17 @@ class NetworkHandler:
             Logger.debug(f"{self.connectionInfo} | Sending Global Player Leave Message", module="network")
             await self.player.playerManager.sendGlobalMessage(f"&2{self.player.name} disconnected from the server!")
 
+            # Free up username in the rest of the cluster
+            if self.server.cluster is not None:
+                self.server.cluster.releasePlayer(self.player.username)
+
         Logger.debug(f"Closing Connection {self.connectionInfo} For Reason {reason}", module="network")
         # Send Disconnect Message
         if notifyPlayer:
             try:
                 await self.dispatcher.sendPacket(Packets.Response.DisconnectPlayer, f"Disconnected: {reason}")
             except Exception as e:
-                if e not in CRITICAL_RESPONSE_ERRORS:
+                if type(e) not in CRITICAL_RESPONSE_ERRORS:
                     # Something Broke!
                     Logger.error(f"An Error Occurred While Disconnect Packet - {type(e).__name__}: {e}", module="network")
                 else:
@@ -309,6 +427,7 @@ class NetworkHandler:
 
         # Set Disconnect Flags
         self.isConnected = False
+        self.dispatcher.cancelMovementUpdates()
         self.writer.close()
 
 
@@ -317,6 +436,19 @@ class NetworkDispatcher:
         self.handler: NetworkHandler = handler
         # Dictionary: {(Key)<Type of AbstractRequestPacket> : (Values)list[tuple[<Future Event>, <Check Function>, <Should Continue Handling>]]}
         self._listeners: dict[Type[AbstractRequestPacket], list[tuple[asyncio.Future, Callable[..., bool], bool]]] = {}
+        # Write Backlog Tracking (Used To Determine How Fast The Client Can Receive Data)
+        self.drainRate: float = 0.0  # Estimated bytes per second the client is reading. 0 if unknown
+        self.stalledSince: Optional[float] = None  # Timestamp since when the client has had unsent data buffered
+        self.evicted: bool = False  # Flag set when the client got disconnected for not reading data fast enough
+        self._drainTask: Optional[asyncio.Task] = None  # Background task waiting for the client to read sent data
+        self._drainError: Optional[BaseException] = None  # Error raised while waiting for the client to read data, raised on the next send
+        self._bytesWritten: int = 0  # Total number of bytes handed to the transport
+        self._lastSample: tuple[float, int, int] = (time.monotonic(), 0, 0)  # (Timestamp, Bytes Written, Buffer Size) of the last drain rate sample
+        # Movement Update Coalescing
+        # Dictionary: {(Key)<Player Id> : (Values)<Latest Position Not Yet Sent>}
+        self._pendingMovements: dict[int, tuple[int, int, int, int, int]] = {}
+        self._lastMovementUpdate: dict[int, float] = {}  # Timestamp of the last position update sent per player id
+        self._movementFlushes: dict[int, asyncio.Task] = {}  # Scheduled (delayed) position updates per player id
 
     # NOTE: or call receivePacket
     # Used when exact packet is expected
@@ -329,18 +461,21 @@ class NetworkDispatcher:
     ):
         try:
             # Get Packet Data
-            Logger.verbose(f"Expected Packet {packet.ID} Size {packet.SIZE} from {self.handler.connectionInfo}", module="network")
+            Logger.verbose(lambda: f"Expected Packet {packet.ID} Size {packet.SIZE} from {self.handler.connectionInfo}", module="network")
             rawData = await asyncio.wait_for(
                 self.handler.reader.readexactly(
                     packet.SIZE
                 ), timeout
             )
-            Logger.verbose(f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | DATA: {rawData}", module="network")
+            Logger.verbose(lambda: f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | DATA: {rawData}", module="network")
+            if MetricsManager.ENABLED:
+                packetsReceivedMetric.labels(packet.NAME).inc()
+                bytesReceivedMetric.inc(len(rawData))
 
             # Check If Packet ID is Valid
             header = rawData[0]
             if checkId and header != packet.ID:
-                Logger.verbose(f"{self.handler.connectionInfo} | Packet Invalid!", module="network")
+                Logger.verbose(lambda: f"{self.handler.connectionInfo} | Packet Invalid!", module="network")
                 raise ClientError(f"Invalid Packet {header}")
 
             # Deserialize Packet
@@ -369,7 +504,7 @@ class NetworkDispatcher:
                     headerSize  # Size of packet header
                 ), timeout
             )
-            Logger.verbose(f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | Incoming Player Loop Packet Id {rawData}", module="network")
+            Logger.verbose(lambda: f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | Incoming Player Loop Packet Id {rawData}", module="network")
 
             # Convert Packet Header to Int
             packetHeader = int.from_bytes(rawData, byteorder="big")
@@ -378,7 +513,7 @@ class NetworkDispatcher:
             if packetHeader not in packetDict.keys():
                 # Ignore if ignoreUnknownPackets flag is set
                 if not ignoreUnknownPackets:
-                    Logger.debug(f"Player Sent Unknown Packet Header {rawData} ({packetHeader})", module="network")
+                    Logger.debug(lambda: f"Player Sent Unknown Packet Header {rawData} ({packetHeader})", module="network")
                     raise ClientError(f"Unknown Client Packet {packetHeader}")
 
             # Get packet using packetId
@@ -390,11 +525,14 @@ class NetworkDispatcher:
                     packet.SIZE - headerSize  # Size of packet body (packet minus header size)
                 ), timeout
             )
-            Logger.verbose(f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | DATA: {rawData}", module="network")
+            Logger.verbose(lambda: f"CLIENT -> SERVER | CLIENT: {self.handler.connectionInfo} | DATA: {rawData}", module="network")
+            if MetricsManager.ENABLED:
+                packetsReceivedMetric.labels(packet.NAME).inc()
+                bytesReceivedMetric.inc(len(rawData))
 
             # Check if packet is being listened to
             if type(packet) in self._listeners:
-                Logger.verbose(f"Checking Listeners For Packet {packet.NAME}", module="network")
+                Logger.verbose(lambda: f"Checking Listeners For Packet {packet.NAME}", module="network")
                 # Keep track on whether packet should continue to be processed after being handled
                 continueProcessing = True
                 # Get all the listeners
@@ -404,17 +542,20 @@ class NetworkDispatcher:
                     # Create a hacky "check failed" list to store unmatched listeners to be put back into the dict
                     checkFailed = []
                     for future, check, shouldContinue in listeners:
-                        Logger.verbose(f"({packet.NAME}) Checking Listener {check}", module="network")
+                        if Logger.VERBOSE:
+                            Logger.verbose(f"({packet.NAME}) Checking Listener {check}", module="network")
                         # If future is cancelled, remove listener
                         if future.cancelled():
-                            Logger.verbose(f"({check}) Listener Cancelled", module="network")
+                            if Logger.VERBOSE:
+                                Logger.verbose(f"({check}) Listener Cancelled", module="network")
                             continue
 
                         # Check if check function returns true
                         try:
                             checkResult = check(self.handler.player, rawData)
                         except Exception as e:
-                            Logger.verbose(f"({check}) Listener Error", module="network")
+                            if Logger.VERBOSE:
+                                Logger.verbose(f"({check}) Listener Error", module="network")
                             Logger.error("Error occurred while processing listener check function", module="network", printTb=False)
                             future.set_exception(e)
                             continue
@@ -428,7 +569,8 @@ class NetworkDispatcher:
 
                         # This check did not pass. Add to checkFailed list
                         if not future.done():
-                            Logger.verbose(f"({check}) Listener Condition Failed", module="network")
+                            if Logger.VERBOSE:
+                                Logger.verbose(f"({check}) Listener Condition Failed", module="network")
                             checkFailed.append((future, check, shouldContinue))
 
                     # Set the listeners list to the new list of failed listeners
@@ -453,7 +595,7 @@ class NetworkDispatcher:
         except asyncio.TimeoutError:
             # Some clients don't send info when not moving
             # Send Ping Packet (Make sure client is still connected)
-            Logger.debug(f"{self.handler.connectionInfo} | Sending Connection Ping", module="network")
+            Logger.debug(lambda: f"{self.handler.connectionInfo} | Sending Connection Ping", module="network")
             await self.handler.dispatcher.sendPacket(Packets.Response.Ping)
             # raise ClientError("Did Not Receive Packet In Time!")
         except Exception as e:
@@ -470,19 +612,242 @@ class NetworkDispatcher:
             # Generate Packet
             rawData = await packet.serialize(*args, **kwargs)
 
+            # Send Packet And Wait For Client To Receive It
+            if self.queueData(packet, rawData):
+                await asyncio.wait_for(asyncio.shield(self._drainTask), timeout)
+        except Exception as e:
+            # Making Sure These Errors Always Gets Raised (Ignore onError)
+            if packet.CRITICAL or type(e) in CRITICAL_RESPONSE_ERRORS:
+                raise e  # Pass Down Exception To Lower Layer
+            return packet.onError(e)
+
+    # Send packet without waiting for the client to receive it
+    async def queuePacket(
+        self,
+        packet: Type[AbstractResponsePacket],
+        *args,
+        **kwargs
+    ):
+        try:
+            # Generate Packet
+            rawData = await packet.serialize(*args, **kwargs)
+
             # Send Packet
-            Logger.verbose(f"SERVER -> CLIENT | CLIENT: {self.handler.connectionInfo} | ID: {packet.ID} {packet.NAME} | SIZE: {packet.SIZE} | DATA: {rawData}", module="network")
-            if self.handler.isConnected:
-                self.handler.writer.write(bytes(rawData))
-                await self.handler.writer.drain()
-            else:
-                Logger.debug(f"Packet {packet.NAME} Skipped Due To Closed Connection!", module="network")
+            self.queueData(packet, rawData)
         except Exception as e:
             # Making Sure These Errors Always Gets Raised (Ignore onError)
             if packet.CRITICAL or type(e) in CRITICAL_RESPONSE_ERRORS:
                 raise e  # Pass Down Exception To Lower Layer
             return packet.onError(e)
 
+    # Write already serialized packet data to the client. Returns whether the data was written.
+    # The client draining the data is handled in the background, so one slow client never holds up the sender.
+    def queueData(self, packet: Type[AbstractResponsePacket], rawData: bytearray | bytes) -> bool:
+        Logger.verbose(lambda: f"SERVER -> CLIENT | CLIENT: {self.handler.connectionInfo} | ID: {packet.ID} {packet.NAME} | SIZE: {packet.SIZE} | DATA: {rawData}", module="network")
+        if self.evicted:
+            raise ConnectionResetError("Connection Evicted")
+        if self._drainError is not None:
+            raise self._drainError
+        if not self.handler.isConnected:
+            Logger.debug(lambda: f"Packet {packet.NAME} Skipped Due To Closed Connection!", module="network")
+            return False
+
+        # Drop non-essential packets (such as chat) while the client is throttled, so its backlog stops growing
+        if packet.DROPPABLE and self.isThrottled():
+            Logger.verbose(lambda: f"Packet {packet.NAME} Dropped Due To Throttled Client {self.handler.connectionInfo}", module="network")
+            if MetricsManager.ENABLED:
+                packetsDroppedMetric.labels(packet.NAME).inc()
+            return False
+
+        # Write Packet Data
+        self.handler.writer.write(bytes(rawData))
+        self._bytesWritten += len(rawData)
+        if MetricsManager.ENABLED:
+            packetsSentMetric.labels(packet.NAME).inc()
+            bytesSentMetric.inc(len(rawData))
+
+        # Start waiting for client to read data (if not already)
+        if self._drainTask is None or self._drainTask.done():
+            self._drainTask = asyncio.create_task(self.waitForDrain())
+            self._drainTask.add_done_callback(self._onDrainDone)
+        return True
+
+    # Wait for the client to read sent data, enforcing the slow client policy
+    async def waitForDrain(self):
+        config = self.handler.server.config
+
+        # Check if all data has already been sent
+        bufferSize = self.getWriteBufferSize()
+        if bufferSize == 0:
+            self.stalledSince = None
+            return
+
+        # Keep track of how long the client has had unsent data
+        if self.stalledSince is None:
+            self.stalledSince = time.monotonic()
+        stallDuration = time.monotonic() - self.stalledSince
+
+        # Check if client has exceeded the max buffer size
+        if config.maxWriteBufferSize >= 0 and bufferSize > config.maxWriteBufferSize:
+            # If throttling, keep waiting for the client. Non-essential packets are dropped until it catches up.
+            if config.slowClientPolicy == "throttle":
+                Logger.verbose(lambda: f"{self.handler.connectionInfo} | Client Exceeded Max Write Buffer Size ({bufferSize} Bytes). Throttling.", module="network")
+            else:
+                self.evictSlowConsumer("Write Buffer Full", bufferSize, stallDuration)
+
+        # Wait for client to read data
+        try:
+            await asyncio.wait_for(self.handler.writer.drain(), config.sendTimeout)
+        except asyncio.TimeoutError:
+            self.evictSlowConsumer("Send Timed Out", self.getWriteBufferSize(), time.monotonic() - self.stalledSince)
+
+        # Client has caught up, so the next stall is timed from scratch
+        self.stalledSince = None
+
+    # Whether non-essential packets to this client should be dropped
+    def isThrottled(self) -> bool:
+        config = self.handler.server.config
+        return (
+            config.slowClientPolicy == "throttle"
+            and config.maxWriteBufferSize >= 0
+            and self.getWriteBufferSize() > config.maxWriteBufferSize
+        )
+
+    def _onDrainDone(self, task: asyncio.Task):
+        # Retrieve exception so errors of queued packets are not reported as unhandled.
+        # The error is stored so whoever sends the next packet gets it instead.
+        if not task.cancelled() and task.exception() is not None:
+            self._drainError = task.exception()
+            Logger.verbose(lambda: f"{self.handler.connectionInfo} | Error While Waiting For Client To Read Data - {type(self._drainError).__name__}", module="network")
+
+    # Disconnect a client that is not reading data fast enough
+    def evictSlowConsumer(self, reason: str, bufferSize: int, stallDuration: float):
+        if not self.evicted:
+            self.evicted = True
+            Logger.warn(
+                f"{self.handler.connectionInfo} | Evicting Slow Client ({reason}) - {bufferSize} Bytes Buffered, Stalled For {stallDuration:.2f} Seconds",
+                module="network"
+            )
+            # Abort the connection, discarding any buffered data. The player loop then handles cleaning up the player.
+            self.handler.writer.transport.abort()
+
+        raise ConnectionResetError("Connection Evicted")
+
+    # Number of bytes waiting in the transport to be sent to the client
+    def getWriteBufferSize(self) -> int:
+        return self.handler.writer.transport.get_write_buffer_size()
+
+    # Update the estimated rate at which the client is draining its write buffer
+    def sampleDrainRate(self):
+        # Only sample every 100ms so the estimate is not dominated by noise
+        now = time.monotonic()
+        lastTime, lastWritten, lastBuffer = self._lastSample
+        if now - lastTime < 0.1:
+            return
+
+        # Bytes drained = bytes buffered last sample + bytes written since - bytes still buffered
+        bufferSize = self.getWriteBufferSize()
+        drained = lastBuffer + (self._bytesWritten - lastWritten) - bufferSize
+        rate = max(drained, 0) / (now - lastTime)
+
+        # Smooth out the estimate with an exponentially weighted moving average
+        if self.drainRate == 0:
+            self.drainRate = rate
+        else:
+            self.drainRate = self.drainRate * 0.7 + rate * 0.3
+        self._lastSample = (now, self._bytesWritten, bufferSize)
+
+    # Determine how often position updates should be sent to this client
+    def getMovementInterval(self, distance: float = 0) -> float:
+        config = self.handler.server.config
+        interval = config.movementUpdateInterval
+
+        # Players that are far away do not need to be updated as often
+        if config.movementFarDistance >= 0 and distance > config.movementFarDistance:
+            interval = max(interval, config.movementFarInterval)
+
+        # If the client is falling behind, wait (roughly) until it has caught up with its backlog
+        bufferSize = self.getWriteBufferSize()
+        if bufferSize >= config.movementBacklogThreshold:
+            if self.drainRate > 0:
+                drainTime = min(bufferSize / self.drainRate, config.movementMaxInterval)
+            else:
+                drainTime = config.movementMaxInterval
+            Logger.verbose(lambda: f"{self.handler.connectionInfo} | Client Backlogged ({bufferSize} Bytes, {int(self.drainRate)} B/s). Throttling Movement For {drainTime:.3f}s", module="network")
+            interval = max(interval, drainTime)
+
+        # Throttled clients only get the slowest position updates
+        if self.isThrottled():
+            interval = max(interval, config.movementMaxInterval)
+
+        return interval
+
+    # Send a position update of another player. Unlike sendPacket, updates are coalesced and rate limited per client,
+    # so chat, block, and level packets are never stuck behind position traffic for slow clients.
+    async def sendMovementUpdate(
+        self,
+        playerId: int,
+        posX: int,
+        posY: int,
+        posZ: int,
+        posYaw: int,
+        posPitch: int,
+        distance: float = 0
+    ):
+        # Update drain rate estimate
+        self.sampleDrainRate()
+
+        # Store latest position. If an update is already scheduled, it will send this new position instead
+        self._pendingMovements[playerId] = (posX, posY, posZ, posYaw, posPitch)
+        if playerId in self._movementFlushes:
+            return
+
+        # Check if enough time has passed since the last update to send it right away
+        interval = self.getMovementInterval(distance)
+        elapsed = time.monotonic() - self._lastMovementUpdate.get(playerId, 0)
+        if elapsed >= interval:
+            await self._flushMovementUpdate(playerId)
+        else:
+            self._movementFlushes[playerId] = asyncio.create_task(self._delayedMovementUpdate(playerId, interval - elapsed))
+
+    async def _delayedMovementUpdate(self, playerId: int, delay: float):
+        await asyncio.sleep(delay)
+        # Remove task from scheduled updates before sending so new updates can be scheduled
+        self._movementFlushes.pop(playerId, None)
+        try:
+            await self._flushMovementUpdate(playerId)
+        except Exception as e:
+            if type(e) not in CRITICAL_RESPONSE_ERRORS:
+                # Something Broke!
+                Logger.error(f"An Error Occurred While Sending Position Update To {self.handler.connectionInfo} - {type(e).__name__}: {e}", module="network")
+            else:
+                # Bad Timing with Connection Closure. Ignoring
+                Logger.debug(lambda: f"Ignoring Error While Sending Position Update To {self.handler.connectionInfo}", module="network")
+
+    async def _flushMovementUpdate(self, playerId: int):
+        # Get latest position. If there is none, the update was cancelled
+        position = self._pendingMovements.pop(playerId, None)
+        if position is None:
+            return
+
+        # Send Position Update
+        self._lastMovementUpdate[playerId] = time.monotonic()
+        await self.queuePacket(Packets.Response.PlayerPositionUpdate, playerId, *position)
+
+    # Drop any pending position updates (either for one player id, or for all of them)
+    def cancelMovementUpdates(self, playerId: Optional[int] = None):
+        if playerId is None:
+            playerIds = set(self._pendingMovements) | set(self._movementFlushes) | set(self._lastMovementUpdate)
+        else:
+            playerIds = {playerId}
+
+        for cancelId in playerIds:
+            self._pendingMovements.pop(cancelId, None)
+            self._lastMovementUpdate.pop(cancelId, None)
+            task = self._movementFlushes.pop(cancelId, None)
+            if task is not None:
+                task.cancel()
+
     # Create Dispatch Listener to capture incoming packets
     def waitFor(
         self,
@@ -492,7 +857,7 @@ class NetworkDispatcher:
         timeout: Optional[float] = 600.0,  # Default 10 minute timeout
         shouldContinue: bool = False
     ):
-        Logger.debug(f"Creating New Listener For Packet {type(packet)}", module="network")
+        Logger.debug(lambda: f"Creating New Listener For Packet {type(packet)}", module="network")
         # Create Future Event
         future = asyncio.get_event_loop().create_future()
 
@@ -24,14 +24,14 @@ class PacketDirections(enum.Enum):
 
 # Packet Utils
 def unpackString(data: bytearray, encoding: str = "ascii") -> str:
-    Logger.verbose(f"Unpacking String {data}", module="packet")
+    Logger.verbose(lambda: f"Unpacking String {data}", module="packet")
     # Decode Data From Bytes To String
     # Remove Excess Zeros and Null characters
     return data.replace(b'\x00', b'').decode(encoding, errors="ignore").strip()
 
 
 def packageString(data: str, maxSize: int = 64, encoding: str = "ascii") -> bytearray:
-    Logger.verbose(f"Packing String {data}", module="packet")
+    Logger.verbose(lambda: f"Packing String {data}", module="packet")
     # Trim Text Down To maxSize
     # Fill Blank Space With Spaces Using ljust
     # Encode String Into Bytes Using Encoding
@@ -90,6 +90,7 @@ class AbstractRequestPacket(AbstractPacket[T], Generic[T]):
 class AbstractResponsePacket(AbstractPacket[T], Generic[T]):
     # Mandatory Values Defined In Packet Init
     DIRECTION = PacketDirections.REQUEST  # Network Direction (Response or Response)
+    DROPPABLE: bool = False  # Packet Can Be Skipped For Clients That Are Being Throttled
 
     def __repr__(self):
         return f"<ResponsePacket {self.NAME} ({self.ID})>"
@@ -2,15 +2,18 @@ from __future__ import annotations
 
 from typing import Optional, Type, Callable, Awaitable, Iterable, TYPE_CHECKING
 import asyncio
+import math
+import time
 
 from obsidian.packet import AbstractResponsePacket, Packets
 from obsidian.blocks import AbstractBlock, BlockManager
 from obsidian.world import World
 from obsidian.log import Logger
+from obsidian.metrics import MetricsManager
 from obsidian.cpe import CPEExtension
 from obsidian.commands import Commands, _parseArgs
 from obsidian.constants import Color, CRITICAL_RESPONSE_ERRORS
-from obsidian.types import UsernameType, _formatUsername
+from obsidian.types import UsernameType, IpType, _formatUsername
 from obsidian.utils.replace import restricted_replace
 from obsidian.errors import (
     ServerError,
@@ -27,12 +30,19 @@ if TYPE_CHECKING:
     from obsidian.server import Server
     from obsidian.network import NetworkHandler
 
+# Command Metrics
+commandsMetric = MetricsManager.counter("obsidian_commands_total", "Number of commands run by players", ("command",))
+commandErrorsMetric = MetricsManager.counter("obsidian_command_errors_total", "Number of commands that failed", ("command",))
+commandDurationMetric = MetricsManager.histogram("obsidian_command_seconds", "Time taken to parse and run a command")
+
 
 # The Overall Server Player Manager
 class PlayerManager:
     def __init__(self, server: Server, maxSize: Optional[int]):
         self.server: Server = server
         self.players: dict[UsernameType, Player] = {}  # Dict of Players with Usernames as Keys
+        self._playersByIp: dict[IpType, set[Player]] = {}  # Dict of Players with Ips as Keys
+        self._playersSnapshot: Optional[tuple[Player, ...]] = None  # Cached tuple of all players. Reset on join/leave
         # If maxSize is not specified, use server config
         if maxSize is None:
             self.maxSize: Optional[int] = server.config.serverMaxPlayers
@@ -46,7 +56,7 @@ class PlayerManager:
         verificationKey: str,
         authenticated: bool
     ) -> Player:
-        Logger.debug(f"Creating Player For Ip {network.connectionInfo}", module="player-manager")
+        Logger.debug(lambda: f"Creating Player For Ip {network.connectionInfo}", module="player-manager")
         # Check if name is alphanumeric
         if not displayName.replace("_", "").isalnum():
             raise ClientError("Invalid Character In Username")
@@ -55,7 +65,7 @@ class PlayerManager:
         username = _formatUsername(displayName)
 
         # Check if user is banned!
-        if username in self.server.config.bannedPlayers:
+        if self.server.config.isPlayerBanned(username):
             raise ClientError("You are banned.")
 
         # Checking if server is full
@@ -74,21 +84,26 @@ class PlayerManager:
 
         # Adding Player Class
         self.players[username] = player
+        self._playersByIp.setdefault(network.ip, set()).add(player)
+        self._playersSnapshot = None
         return player
 
     def getPlayers(self) -> Iterable[Player]:
-        return tuple(self.players.values())
+        # Rebuild snapshot only if players have joined or left since the last call
+        if self._playersSnapshot is None:
+            self._playersSnapshot = tuple(self.players.values())
+        return self._playersSnapshot
 
     def getPlayersByIp(self, ip: str) -> list[Player]:
-        Logger.verbose(f"Getting Players With Ip {ip}", module="player-manager")
-        # Loop through all players and find those who need to be kicked
-        matchingPlayers: list[Player] = []
-        for player in self.getPlayers():
-            if player.networkHandler.ip == ip:
-                matchingPlayers.append(player)
-        Logger.verbose(f"Found Players: {matchingPlayers}", module="player-manager")
+        Logger.verbose(lambda: f"Getting Players With Ip {ip}", module="player-manager")
+        matchingPlayers: list[Player] = list(self._playersByIp.get(IpType(ip), ()))
+        Logger.verbose(lambda: f"Found Players: {matchingPlayers}", module="player-manager")
         return matchingPlayers
 
+    def getPlayersByWorld(self, world: World) -> Iterable[Player]:
+        # Each world keeps track of its own players
+        return world.playerManager.getPlayers()
+
     async def deletePlayer(self, player: Player, reason: Optional[str] = None) -> bool:
         Logger.debug(f"Removing Player {player.name}", module="player-manager")
         # Remove Player From World If Necessary
@@ -97,10 +112,16 @@ class PlayerManager:
             await player.worldPlayerManager.removePlayer(player, reason=reason)
 
         # Remove Player From PlayerManager
-        for playerName, playerObj in self.players.items():
-            if player is playerObj:
-                del self.players[playerName]
-                break
+        if self.players.get(player.username) is player:
+            del self.players[player.username]
+            self._playersSnapshot = None
+
+        # Remove Player From Ip Index
+        ipPlayers = self._playersByIp.get(player.networkHandler.ip)
+        if ipPlayers is not None:
+            ipPlayers.discard(player)
+            if not ipPlayers:
+                del self._playersByIp[player.networkHandler.ip]
 
         Logger.debug(f"Successfully Removed Player {player.name}", module="player-manager")
         return True
@@ -145,16 +166,26 @@ class PlayerManager:
         **kwargs
     ) -> bool:
         # Send packet to ALL members connected to server (all worlds)
-        Logger.verbose(f"Sending Packet {packet.NAME} To All Connected Players", module="global-packet-dispatcher")
+        Logger.verbose(lambda: f"Sending Packet {packet.NAME} To All Connected Players", module="global-packet-dispatcher")
+        # Generate Packet Once For All Players
+        try:
+            rawData = await packet.serialize(*args, **kwargs)
+        except Exception as e:
+            if packet.CRITICAL or type(e) in CRITICAL_RESPONSE_ERRORS:
+                raise e  # Pass Down Exception To Lower Layer
+            packet.onError(e)
+            return False
+
         # Loop Through All Players
-        for player in tuple(self.getPlayers()):
+        # Packets are queued without waiting for each player to receive them, so slow players do not hold up the broadcast
+        for player in self.getPlayers():
             # Checking if player is not in ignoreList
             if player not in ignoreList:
                 try:
                     # Sending Packet To Player
-                    await player.networkHandler.dispatcher.sendPacket(packet, *args, **kwargs)
+                    player.networkHandler.dispatcher.queueData(packet, rawData)
                 except Exception as e:
-                    if e not in CRITICAL_RESPONSE_ERRORS:
+                    if type(e) not in CRITICAL_RESPONSE_ERRORS:
                         # Something Broke!
                         Logger.error(
                             f"An Error Occurred While Sending Global Packet {packet.NAME} To {player.networkHandler.connectionInfo} - {type(e).__name__}: {e}",
@@ -162,7 +193,8 @@ class PlayerManager:
                         )
                     else:
                         # Bad Timing with Connection Closure. Ignoring
-                        Logger.debug(f"Ignoring Error While Sending Global Packet {packet.NAME} To {player.networkHandler.connectionInfo}", module="global-packet-dispatcher")
+                        if Logger.DEBUG:
+                            Logger.debug(f"Ignoring Error While Sending Global Packet {packet.NAME} To {player.networkHandler.connectionInfo}", module="global-packet-dispatcher")
         return True  # Success!
 
     async def sendGlobalMessage(
@@ -216,6 +248,10 @@ class WorldPlayerManager:
         self.world: World = world
         self.playerManager: PlayerManager = playerManager
         self.playerSlots: list[Optional[Player]] = [None] * world.maxPlayers
+        self._freeIds: list[int] = list(reversed(range(world.maxPlayers)))  # Stack of free ids (lowest ids are handed out first)
+        self._activePlayers: list[Player] = []  # Dense list of players in world, kept in sync with playerSlots
+        self._activeIndex: dict[Player, int] = {}  # Position of each player in _activePlayers
+        self._playersSnapshot: Optional[tuple[Player, ...]] = None  # Cached tuple of all players in world. Reset on join/leave
 
     async def joinPlayer(self, player: Player, spawn: Optional[tuple[int, int, int, int, int]] = None) -> None:
         # Trying To Allocate Id
@@ -226,9 +262,9 @@ class WorldPlayerManager:
             raise ClientError(f"World {self.world.name} Is Full")
 
         # Adding Player To Players List Using Id
-        Logger.debug(f"Player {player.networkHandler.connectionInfo} Username {player.name} Id {playerId} Is Joining World {self.world.name}", module="world-player")
+        Logger.debug(lambda: f"Player {player.networkHandler.connectionInfo} Username {player.name} Id {playerId} Is Joining World {self.world.name}", module="world-player")
         player.playerId = playerId
-        self.playerSlots[playerId] = player
+        self.assignId(playerId, player)
 
         # If automaticallyDetermineSpawn is enabled, determine new spawn point
         if self.world.worldManager.server.config.automaticallyDetermineSpawn:
@@ -245,10 +281,10 @@ class WorldPlayerManager:
 
         # Check if spawn is specified. If not, use default spawn
         if spawn:
-            Logger.debug(f"Spawning Player At Specified Location {spawn}", module="world-player")
+            Logger.debug(lambda: f"Spawning Player At Specified Location {spawn}", module="world-player")
             posX, posY, posZ, yaw, pitch = spawn
         else:
-            Logger.debug(f"Spawning Player At Default Location {defaultSpawn}", module="world-player")
+            Logger.debug(lambda: f"Spawning Player At Default Location {defaultSpawn}", module="world-player")
             posX, posY, posZ, yaw, pitch = defaultSpawn
 
         # Check if player yaw and pitch is valid
@@ -291,7 +327,7 @@ class WorldPlayerManager:
         # Update User On Currently Connected Players
         await self.spawnCurrentPlayers(player)
 
-        Logger.debug(f"Finished Handling Player Join For {player.name} Id {player.playerId} Joined World {self.world.name}", module="world-player")
+        Logger.debug(lambda: f"Finished Handling Player Join For {player.name} Id {player.playerId} Joined World {self.world.name}", module="world-player")
 
         # Sending Join Chat Message
         await self.sendWorldMessage(f"&e{player.name} Joined The World &9(ID {player.playerId})&f")
@@ -321,7 +357,7 @@ class WorldPlayerManager:
                     player.posPitch,
                 )
             except Exception as e:
-                if e not in CRITICAL_RESPONSE_ERRORS:
+                if type(e) not in CRITICAL_RESPONSE_ERRORS:
                     # Something Broke!
                     Logger.error(
                         f"An Error Occurred While Sending World Packet {Packets.Response.SpawnPlayer.NAME} To {player.networkHandler.connectionInfo} - {type(e).__name__}: {e}",
@@ -329,7 +365,8 @@ class WorldPlayerManager:
                     )
                 else:
                     # Bad Timing with Connection Closure. Ignoring
-                    Logger.debug(f"Ignoring Error While Sending World Packet {Packets.Response.SpawnPlayer.NAME} To {player.networkHandler.connectionInfo}", module="world-packet-dispatcher")
+                    if Logger.DEBUG:
+                        Logger.debug(f"Ignoring Error While Sending World Packet {Packets.Response.SpawnPlayer.NAME} To {player.networkHandler.connectionInfo}", module="world-packet-dispatcher")
 
     async def removePlayer(self, player: Player, reason: Optional[str] = None) -> bool:
         Logger.debug(f"Removing Player {player.name} From World {self.world.name}", module="world-player")
@@ -340,6 +377,10 @@ class WorldPlayerManager:
         else:
             raise ServerError(f"Trying to Remove Player {player.name} With No Player Id")
 
+        # Drop any position updates of the player that have not been sent yet
+        for otherPlayer in self.getPlayers():
+            otherPlayer.networkHandler.dispatcher.cancelMovementUpdates(player.playerId)
+
         # Send Player Disconnect Packet To All Players (Except Joining User)
         await self.sendWorldPacket(
             Packets.Response.DespawnPlayer,
@@ -360,31 +401,46 @@ class WorldPlayerManager:
         return True
 
     def allocateId(self) -> int:
-        # Loop Through All Ids, Return Id That Is Not Free
+        # Pop Next Free Id From Free List
         Logger.debug("Trying To Allocate Id", module="id-allocator")
-        for idIndex, playerObj in enumerate(self.playerSlots):
-            if playerObj is None:
-                # Return Free ID
-                return idIndex
+        if not self._freeIds:
+            raise WorldError("Id Allocator Failed To Allocate Open Id")
+        return self._freeIds.pop()
 
-        raise WorldError("Id Allocator Failed To Allocate Open Id")
+    def assignId(self, playerId: int, player: Player) -> None:
+        # Add Player To Slot And Active Players List
+        self.playerSlots[playerId] = player
+        self._activeIndex[player] = len(self._activePlayers)
+        self._activePlayers.append(player)
+        self._playersSnapshot = None
 
     def deallocateId(self, playerId: int) -> None:
         # Check If Id Is Already Deallocated
-        if self.playerSlots[playerId] is None:
+        player = self.playerSlots[playerId]
+        if player is None:
             Logger.error(f"Trying To Deallocate Non Allocated Id {playerId}", module="id-allocator", printTb=False)
+            return
+
+        # Remove Player From Active Players List
+        # Swap the last player into the removed position to keep the list dense
+        index = self._activeIndex.pop(player)
+        lastPlayer = self._activePlayers.pop()
+        if lastPlayer is not player:
+            self._activePlayers[index] = lastPlayer
+            self._activeIndex[lastPlayer] = index
+
+        # Free Slot And Return Id To Free List
         self.playerSlots[playerId] = None
+        self._freeIds.append(playerId)
+        self._playersSnapshot = None
 
         Logger.debug(f"Deallocated Id {playerId}", module="id-allocator")
 
     def getPlayers(self) -> Iterable[Player]:
-        # Loop through all players
-        playersList = []
-        for player in self.playerSlots:
-            if player is not None:
-                # If its not none, its a player!
-                playersList.append(player)
-        return tuple(playersList)
+        # Rebuild snapshot only if players have joined or left since the last call
+        if self._playersSnapshot is None:
+            self._playersSnapshot = tuple(self._activePlayers)
+        return self._playersSnapshot
 
     async def sendWorldPacket(
         self,
@@ -394,8 +450,18 @@ class WorldPlayerManager:
         **kwargs
     ) -> bool:
         # Send packet to all members in world
-        Logger.verbose(f"Sending Packet {packet.NAME} To All Players On {self.world.name}", module="world-packet-dispatcher")
+        Logger.verbose(lambda: f"Sending Packet {packet.NAME} To All Players On {self.world.name}", module="world-packet-dispatcher")
+        # Generate Packet Once For All Players
+        try:
+            rawData = await packet.serialize(*args, **kwargs)
+        except Exception as e:
+            if packet.CRITICAL or type(e) in CRITICAL_RESPONSE_ERRORS:
+                raise e  # Pass Down Exception To Lower Layer
+            packet.onError(e)
+            return False
+
         # Loop Through All Players
+        # Packets are queued without waiting for each player to receive them, so slow players do not hold up the broadcast
         for player in self.getPlayers():
             # Checking if Player Exists
             if player is None:
@@ -407,14 +473,52 @@ class WorldPlayerManager:
 
             # Attempting to Send Packet
             try:
-                await player.networkHandler.dispatcher.sendPacket(packet, *args, **kwargs)
+                player.networkHandler.dispatcher.queueData(packet, rawData)
             except Exception as e:
-                if e not in CRITICAL_RESPONSE_ERRORS:
+                if type(e) not in CRITICAL_RESPONSE_ERRORS:
                     # Something Broke!
                     Logger.error(f"An Error Occurred While Sending World Packet {packet.NAME} To {player.networkHandler.connectionInfo} - {type(e).__name__}: {e}", module="world-packet-dispatcher")
                 else:
                     # Bad Timing with Connection Closure. Ignoring
-                    Logger.debug(f"Ignoring Error While Sending World Packet {packet.NAME} To {player.networkHandler.connectionInfo}", module="world-packet-dispatcher")
+                    if Logger.DEBUG:
+                        Logger.debug(f"Ignoring Error While Sending World Packet {packet.NAME} To {player.networkHandler.connectionInfo}", module="world-packet-dispatcher")
+        return True  # Success!
+
+    async def sendWorldMovement(
+        self,
+        player: Player,
+        ignoreList: set[Player] = set()
+    ) -> bool:
+        # Send position of player to all members in world
+        # Updates are rate limited per recipient based on distance and how fast the recipient can receive data
+        Logger.verbose(lambda: f"Sending Position Of Player {player.name} To All Players On {self.world.name}", module="world-packet-dispatcher")
+        # Loop Through All Players
+        for recipient in self.getPlayers():
+            # Checking if player is not in ignoreList
+            if recipient in ignoreList:
+                continue
+
+            # Attempting to Send Position Update
+            try:
+                # Positions are stored in fixed-point units of 1/32 blocks
+                distance = math.dist((player.posX, player.posY, player.posZ), (recipient.posX, recipient.posY, recipient.posZ)) / 32
+                await recipient.networkHandler.dispatcher.sendMovementUpdate(
+                    player.playerId,
+                    player.posX,
+                    player.posY,
+                    player.posZ,
+                    player.posYaw,
+                    player.posPitch,
+                    distance=distance
+                )
+            except Exception as e:
+                if type(e) not in CRITICAL_RESPONSE_ERRORS:
+                    # Something Broke!
+                    Logger.error(f"An Error Occurred While Sending Position Update To {recipient.networkHandler.connectionInfo} - {type(e).__name__}: {e}", module="world-packet-dispatcher")
+                else:
+                    # Bad Timing with Connection Closure. Ignoring
+                    if Logger.DEBUG:
+                        Logger.debug(f"Ignoring Error While Sending Position Update To {recipient.networkHandler.connectionInfo}", module="world-packet-dispatcher")
         return True  # Success!
 
     async def processPlayerMessage(
@@ -509,7 +613,7 @@ class Player:
 
     @property
     def opStatus(self) -> bool:
-        return self.username in self.playerManager.server.config.operatorsList
+        return self.playerManager.server.config.isOperator(self.username)
 
     def getSupportedCPE(self) -> set[CPEExtension]:
         # Check if player supports CPE
@@ -570,7 +674,7 @@ class Player:
         await self.networkHandler._processWorldChange(world, self.worldPlayerManager.world)
 
     async def setLocation(self, posX: int, posY: int, posZ: int, posYaw: int = 0, posPitch: int = 0, notifyPlayers: bool = True):
-        Logger.debug(f"Setting New Player Location for Player {self.name} (X: {posX}, Y: {posY}, Z: {posZ}, Yaw: {posYaw}, Pitch: {posPitch})", module="player")
+        Logger.debug(lambda: f"Setting New Player Location for Player {self.name} (X: {posX}, Y: {posY}, Z: {posZ}, Yaw: {posYaw}, Pitch: {posPitch})", module="player")
 
         # Checking If Player Is Joined To A World
         if self.worldPlayerManager is None:
@@ -586,15 +690,9 @@ class Player:
 
         # Send Location Update
         if notifyPlayers:
-            # Sending Player Position Update Packet To All Players
-            await self.worldPlayerManager.sendWorldPacket(
-                Packets.Response.PlayerPositionUpdate,
-                self.playerId,
-                posX,
-                posY,
-                posZ,
-                posYaw,
-                posPitch,
+            # Sending Player Position Update To All Players
+            await self.worldPlayerManager.sendWorldMovement(
+                self,
                 ignoreList={self}  # not sending to self as that is handled elsewhere
             )
 
@@ -610,7 +708,7 @@ class Player:
             )
 
     async def sendMessage(self, message: str | list):
-        Logger.debug(f"Sending Player {self.name} Message {message}", module="player-message")
+        Logger.debug(lambda: f"Sending Player {self.name} Message {message}", module="player-message")
         # If Message Is A List, Recursively Send All Messages Within
         if isinstance(message, list):
             Logger.debug("Sending List Of Messages To Player!", module="player-message")
@@ -622,11 +720,11 @@ class Player:
         await self.networkHandler.dispatcher.sendPacket(Packets.Response.SendMessage, str(message))
 
     async def checkBlockPlacement(self, blockX: int, blockY: int, blockZ: int, blockType: AbstractBlock) -> bool:
-        Logger.debug(f"Checking If Player Can Place Block {blockType.NAME} at ({blockX}, {blockY}, {blockZ})", module="player")
+        Logger.debug(lambda: f"Checking If Player Can Place Block {blockType.NAME} at ({blockX}, {blockY}, {blockZ})", module="player")
         # Create an easily-overridable method to check if user is allowed to place a block here
         # Users can either return a ClientError or return false
         # Check if this block is disabled
-        if blockType.ID in self.server.config.disallowedBlocks:
+        if self.server.config.isBlockDisallowed(blockType.ID):
             Logger.debug(f"Player {self.name} Trying To Place A Disabled Block", module="player")
             if self.opStatus:
                 await self.sendMessage("&4[WARNING] &fThis Block Is Disabled, But You Are an OP!")
@@ -643,7 +741,7 @@ class Player:
 
     async def handleBlockUpdate(self, blockX: int, blockY: int, blockZ: int, blockType: AbstractBlock):
         # Format, Process, and Handle incoming block update requests.
-        Logger.debug(f"Handling Block Placement From Player {self.name}", module="player")
+        Logger.debug(lambda: f"Handling Block Placement From Player {self.name}", module="player")
 
         # Checking If Player Is Joined To A World
         if self.worldPlayerManager is None:
@@ -678,7 +776,7 @@ class Player:
 
     async def handlePlayerMovement(self, posX: int, posY: int, posZ: int, posYaw: int, posPitch: int):
         # Format, Process, and Handle incoming player movement requests.
-        Logger.verbose(f"Handling Player Movement From Player {self.name}", module="player")
+        Logger.verbose(lambda: f"Handling Player Movement From Player {self.name}", module="player")
 
         # Checking If Player Is Joined To A World
         if self.worldPlayerManager is None:
@@ -692,15 +790,9 @@ class Player:
         self.posYaw = posYaw
         self.posPitch = posPitch
 
-        # Sending Player Position Update Packet To All Players
-        await self.worldPlayerManager.sendWorldPacket(
-            Packets.Response.PlayerPositionUpdate,
-            self.playerId,
-            posX,
-            posY,
-            posZ,
-            posYaw,
-            posPitch,
+        # Sending Player Position Update To All Players
+        await self.worldPlayerManager.sendWorldMovement(
+            self,
             ignoreList={self}  # not sending to self as that may cause some de-sync issues
         )
 
@@ -727,10 +819,10 @@ class Player:
 
     async def handlePlayerMessage(self, message: str):
         # Format, Process, and Handle incoming player message requests.
-        Logger.debug(f"Handling Player Message '{message}' From Player {self.name}", module="player")
+        Logger.debug(lambda: f"Handling Player Message '{message}' From Player {self.name}", module="player")
 
         # Parse player message for special tags
-        Logger.debug(f"Parsing Player Message {message}", module="player")
+        Logger.debug(lambda: f"Parsing Player Message {message}", module="player")
         message = self.parsePlayerMessage(message)
 
         # Check if message is valid
@@ -769,6 +861,9 @@ class Player:
             await self.worldPlayerManager.processPlayerMessage(self, message)
 
     async def handlePlayerCommand(self, cmdMessage: str):
+        startTime = time.perf_counter()
+        # Name of the command for metrics. Unknown commands are grouped together, so spamming random commands does not create new metrics
+        metricName = "unknown"
         try:
             # Format, Process, and Handle incoming player commands.
             Logger.debug(f"Handling Command From Player {self.name}", module="command")
@@ -780,11 +875,13 @@ class Player:
             Logger.info(f"Command {cmdName} Received From Player {self.name}", module="command")
 
             # Get Command Object
-            command = Commands.getCommandFromName(cmdName)
+            # Lazy commands are checked using their placeholder, so their module is only loaded for players allowed to run them
+            command = Commands.getCommandFromName(cmdName, loadLazy=False)
+            metricName = command.NAME
             Logger.debug(f"Handling Command {command.NAME} With Arguments {cmdArgs}", module="command")
 
             # Check if command is disabled
-            if command.NAME in self.playerManager.server.config.disabledCommands:
+            if self.playerManager.server.config.isCommandDisabled(command.NAME):
                 # If user is op, allow run but give warning
                 # Else, disallow run
                 if self.opStatus:
@@ -796,6 +893,9 @@ class Player:
             if command.OP and not self.opStatus:
                 raise CommandError("You Are Not An Operator!")
 
+            # Load lazy command (if not already)
+            command = Commands.loadLazyCommand(command)
+
             # Parse Command Arguments
             parsedArguments, parsedKwArgs = _parseArgs(self.server, command, cmdArgs)
 
@@ -808,12 +908,22 @@ class Player:
             except Exception as e:
                 Logger.error(f"Command {command.NAME} Raised An Error! {str(e)}", module="command")
                 await self.sendMessage("&cAn Unknown Internal Server Error Has Occurred!")
+                if MetricsManager.ENABLED:
+                    commandErrorsMetric.labels(metricName).inc()
         except CommandError as e:
             Logger.warn(f"Command From Player {self.name} {str(e)}", module="command")
             await self.sendMessage(f"&cError: {str(e)}")
+            if MetricsManager.ENABLED:
+                commandErrorsMetric.labels(metricName).inc()
         except Exception as e:
             Logger.error(f"Error While Parsing Command! {str(e)}")
             await self.sendMessage("&cAn Unknown Internal Server Error Has Occurred!")
+            if MetricsManager.ENABLED:
+                commandErrorsMetric.labels(metricName).inc()
+        finally:
+            if MetricsManager.ENABLED:
+                commandsMetric.labels(metricName).inc()
+                commandDurationMetric.observe(time.perf_counter() - startTime)
 
     async def getNextMessage(self, *args, checkAscii: bool = True, **kwargs) -> str:
         Logger.debug(f"Getting Next Message From Player {self.name}", module="player")
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional, Any
+import socket
+from typing import Optional, Any, TYPE_CHECKING
 from pathlib import Path
 import traceback
 import sys
@@ -15,7 +16,11 @@ from obsidian.packet import PacketManager, Packets
 from obsidian.errors import InitError, CPEError, ServerError, FatalError
 from obsidian.log import Logger
 from obsidian.network import NetworkHandler
+from obsidian.admission import AdmissionController
+from obsidian.metrics import MetricsManager, MetricsServer
 from obsidian.module import ModuleManager
+from obsidian.mixins import MixinRegistry
+from obsidian.startup import StartupTimer
 from obsidian.world import WorldManager
 from obsidian.worldformat import WorldFormatManager
 from obsidian.mapgen import MapGeneratorManager
@@ -32,6 +37,9 @@ from obsidian.constants import (
     SERVER_PATH
 )
 
+if TYPE_CHECKING:
+    from obsidian.cluster import ClusterWorker
+
 
 class Server:
     def __init__(
@@ -45,7 +53,9 @@ class Server:
         # None - Use Default Values
         # Str - Pass In Configuration File Location
         # ServerConfig - Pass In Already Parsed Server Configuration Class
-        config: Any[None, str, ServerConfig] = None
+        config: Any[None, str, ServerConfig] = None,
+        # Cluster Worker, If This Server Is One Of Multiple Worker Processes
+        cluster: Optional[ClusterWorker] = None
     ):
         self.address: str = address  # Ip Address Of Server
         self.port: int = port  # Port Number Of Server
@@ -62,6 +72,9 @@ class Server:
         self._server: Optional[asyncio.AbstractServer] = None  # Asyncio Server Object (initialized later)
         self._worldManager: Optional[WorldManager] = None  # World Manager Class (initialized later)
         self._playerManager: Optional[PlayerManager] = None  # Player Manager Class (initialized later)
+        self.admissionController: AdmissionController = AdmissionController(self)  # Rate Limits New Connections
+        self.cluster: Optional[ClusterWorker] = cluster  # Set When Running As A Worker Process
+        self.metricsServer: Optional[MetricsServer] = None  # Serves Metrics Over HTTP (If Enabled)
 
         # Init Color
         if color:
@@ -92,6 +105,8 @@ class Server:
             Logger.fatal("==================== FATAL ERROR! ====================", module="obsidian", printTb=False)
 
     async def _init(self):
+        StartupTimer.start()
+
         # Print out logo on startup
         Logger.info(f"{Color.LIGHT_MAGENTA_EX}========================================{Color.MAGENTA}====================================", module="init")
         Logger.info(f"{Color.LIGHT_MAGENTA_EX}    ____               _           __  {Color.MAGENTA}____  __         _     ___           ", module="init")
@@ -120,12 +135,30 @@ class Server:
         # Ensuring Config Path
         Path(SERVER_PATH, self.config.configPath).parent.mkdir(parents=True, exist_ok=True)
         # Initialize Config
-        self.config.init()
+        with StartupTimer.measure("Server", "Config"):
+            self.config.init()
 
         # Set up logging with data from config
         if self.config.logBuffer < 0:
             raise FatalError("Log Buffer Size Cannot Be Negative")
         Logger.setBufferSize(self.config.logBuffer)
+        if self.config.jsonLogging:
+            Logger.setupJsonLog(
+                Path(SERVER_PATH, "logs", "json"),
+                name="obsidian" if self.cluster is None else f"obsidian-worker-{self.cluster.workerId}",
+                maxSize=self.config.jsonLogMaxSize,
+                rotateInterval=self.config.jsonLogRotateInterval,
+                maxSegments=self.config.jsonLogMaxSegments
+            )
+        if self.config.asyncLogging:
+            try:
+                Logger.startWriter(queueSize=self.config.logQueueSize, overflowPolicy=self.config.logOverflowPolicy)
+            except ValueError as e:
+                raise FatalError(str(e))
+
+        # Check network settings, so a typo does not silently fall back to kicking slow clients
+        if self.config.slowClientPolicy not in ("kick", "throttle"):
+            raise FatalError(f"Unknown Slow Client Policy {self.config.slowClientPolicy}")
 
         # Setting Up File Structure
         Logger.info("Setting Up File Structure", module="init")
@@ -150,10 +183,19 @@ class Server:
         ModuleManager.initModules(
             ignorelist=self.config.moduleIgnoreList,
             ensureCore=True,
-            initCPE=self.supportsCPE
+            initCPE=self.supportsCPE,
+            useManifest=self.config.moduleManifest
         )
         Logger.info("All Modules Initialized!!!", module="init")
 
+        # Compile mixin chains, now that every module has applied its mixins
+        if self.config.flattenMixins:
+            Logger.info("Compiling Mixin Chains", module="init")
+            with StartupTimer.measure("Server", "Mixin Compile"):
+                MixinRegistry.compileChains()
+        if self.config.debugMixins:
+            Logger.info(f"Mixin Chains:\n{MixinRegistry.describe()}", module="init")
+
         Logger.info(f"{len(ModuleManager)} Modules Initialized", module="init")
         Logger.info(f"{len(PacketManager)} Packets Initialized", module="init")
         Logger.info(f"{len(WorldFormatManager)} World Formats Initialized", module="init")
@@ -212,15 +254,41 @@ class Server:
         Logger.info("Loading Worlds", module="init")
         self.worldManager.loadWorlds()
 
+        # Connect To Other Workers If Running In Cluster Mode
+        if self.cluster is not None:
+            Logger.info(f"Running As Worker {self.cluster.workerId} Of {self.cluster.workerCount}", module="init")
+            self.cluster.attach(self)
+
         # Create Asyncio Socket Server
         # When new connection occurs, run callback _getConnHandler
         Logger.info(f"Setting Up Server {self.name}", module="init")
-        self._server = await asyncio.start_server(self._getConnHandler(), self.address, self.port)
+        # In cluster mode, every worker listens on the same port and the kernel spreads new connections between them
+        self._server = await asyncio.start_server(
+            self._getConnHandler(),
+            self.address,
+            self.port,
+            backlog=self.config.listenBacklog,
+            reuse_port=self.cluster is not None
+        )
+        # Buffer sizes set on the listening socket are inherited by accepted connections before the tcp handshake finishes
+        for listenSocket in self._server.sockets:
+            self._configureSocket(listenSocket, listener=True)
+
+        # Set Up Metrics
+        if self.config.metricsEnabled:
+            Logger.info("Setting Up Metrics", module="init")
+            await self._setupMetrics()
 
         # Print out final initialization message
+        StartupTimer.finish()
+        StartupTimer.logReport(slowestSteps=self.config.startupReportSteps)
         Logger.info(f"Finished Initializing ProjectObsidian v. {__version__}", module="init")
         self.initialized = True
 
+        # Let the coordinator know this worker is ready
+        if self.cluster is not None:
+            self.cluster.announceReady()
+
     async def run(self):
         try:
             # Check if server is initialized and async server has started
@@ -235,19 +303,67 @@ class Server:
         except Exception as e:
             Logger.fatal(f"Error While Starting Server - {type(e).__name__}: {e}", module="server")
 
+    async def _setupMetrics(self):
+        # Server wide metrics are read when metrics are collected, so they do not need to be recorded
+        MetricsManager.gauge(
+            "obsidian_players", "Number of players in each world", ("world",),
+            function=lambda: {(world.name,): len(world.playerManager.getPlayers()) for world in self.worldManager.worlds.values()}
+        )
+        MetricsManager.gauge("obsidian_players_online", "Number of players online", function=lambda: len(self.playerManager.players))
+        MetricsManager.gauge("obsidian_worlds_loaded", "Number of worlds loaded", function=lambda: len(self.worldManager.worlds))
+        MetricsManager.gauge("obsidian_handshaking_connections", "Number of connections logging in", function=lambda: self.admissionController.handshakingConnections)
+        MetricsManager.counter("obsidian_log_messages_dropped_total", "Number of log messages dropped due to a full log queue", function=lambda: Logger.MESSAGES_DROPPED)
+        MetricsManager.ENABLED = True
+
+        # Start metrics server
+        if self.config.metricsPort != -1:
+            port = self.config.metricsPort + (self.cluster.workerId if self.cluster is not None else 0)
+            self.metricsServer = MetricsServer("127.0.0.1", port)
+            try:
+                await self.metricsServer.start()
+            except OSError as e:
+                raise FatalError(f"Failed To Start Metrics Server On Port {port} - {type(e).__name__}: {e}")
+
     def _getConnHandler(self):  # -> Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]
         # Callback function on new connection
         async def handler(reader, writer):
             # Check if server is still initialized (Might be in shutdown procedure)
             if self.initialized:
-                c = NetworkHandler(self, reader, writer)
-                await c.initConnection()
+                # Check if connection should be accepted before allocating anything for it
+                ticket = self.admissionController.admit(writer.get_extra_info("peername")[0])
+                if ticket is None:
+                    writer.transport.abort()
+                    return
+
+                try:
+                    self._configureSocket(writer.get_extra_info("socket"))
+                    c = NetworkHandler(self, reader, writer, admissionTicket=ticket)
+                    await c.initConnection()
+                finally:
+                    ticket.release()
             else:
                 Logger.warn("Player tried to connect when server is not initialized. Dropping connection.", module="connection-handler")
                 writer.close()
 
         return handler
 
+    def _configureSocket(self, sock: Optional[socket.socket], listener: bool = False):
+        # Socket may be unavailable depending on the transport
+        if sock is None:
+            return
+
+        try:
+            # Set TCP_NODELAY on connections (asyncio enables it by default)
+            if not listener and sock.family in (socket.AF_INET, socket.AF_INET6):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.config.tcpNoDelay))
+            # Set kernel buffer sizes
+            if self.config.socketSendBufferSize is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.config.socketSendBufferSize)
+            if self.config.socketReceiveBufferSize is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.config.socketReceiveBufferSize)
+        except OSError as e:
+            Logger.warn(f"Failed To Set Socket Options On {sock} - {type(e).__name__}: {e}", module="connection-handler")
+
     def getSupportedCPE(self) -> set[CPEExtension]:
         # Check if server supports CPE
         if not self.supportsCPE:
@@ -349,6 +465,8 @@ class Server:
             Logger.info("Stopping Connection Handler Loop", module="server-stop")
             if self.server is not None:
                 self.server.close()
+            if self.metricsServer is not None:
+                self.metricsServer.close()
 
             # Managing worlds
             if self.worldManager and saveWorlds:
@@ -369,6 +487,7 @@ class Server:
             # Closing Server
             Logger.info("Terminating Process", module="server-stop")
             Logger._log("Goodbye!")
+            Logger.stopWriter()
             sys.exit(0)
 
             # If server fails to stop, force terminate
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+import time
+
+from obsidian.log import Logger
+
+
+# Time taken by one step of server startup
+@dataclass
+class StartupStep:
+    phase: str  # Kind of step (i.e. "Module Import", "World Load")
+    name: str  # What the step worked on (i.e. module or world name)
+    duration: float  # Seconds
+
+
+# Records how long each phase of server startup takes, so slow modules and worlds can be found
+class _StartupTimer:
+    def __init__(self):
+        self.steps: list[StartupStep] = []
+        self.startTime: float = time.perf_counter()
+        self.endTime: Optional[float] = None
+
+    # Called when the server starts initializing
+    def start(self):
+        self.steps = []
+        self.startTime = time.perf_counter()
+        self.endTime = None
+
+    # Called when the server finished initializing
+    def finish(self):
+        self.endTime = time.perf_counter()
+
+    @contextmanager
+    def measure(self, phase: str, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Steps after startup (i.e. reloading worlds) are not recorded
+            if self.endTime is None:
+                self.steps.append(StartupStep(phase, name, time.perf_counter() - start))
+
+    @property
+    def totalTime(self) -> float:
+        return (self.endTime or time.perf_counter()) - self.startTime
+
+    # Returns phase -> (number of steps, total seconds), in the order the phases first ran
+    def getPhaseTotals(self) -> dict[str, tuple[int, float]]:
+        totals: dict[str, tuple[int, float]] = {}
+        for step in self.steps:
+            count, duration = totals.get(step.phase, (0, 0.0))
+            totals[step.phase] = (count + 1, duration + step.duration)
+        return totals
+
+    def getSlowestSteps(self, count: int) -> list[StartupStep]:
+        return sorted(self.steps, key=lambda step: step.duration, reverse=True)[:count]
+
+    def logReport(self, slowestSteps: int = 5):
+        Logger.info(f"Server Initialized In {self.totalTime:.2f}s", module="startup")
+        for phase, (count, duration) in self.getPhaseTotals().items():
+            Logger.info(f"{phase}: {duration * 1000:.0f}ms ({count} Steps)", module="startup")
+        if slowestSteps > 0:
+            Logger.info(
+                "Slowest Steps: " + ", ".join(f"{step.phase} {step.name} ({step.duration * 1000:.0f}ms)" for step in self.getSlowestSteps(slowestSteps)),
+                module="startup"
+            )
+        for step in self.steps:
+            Logger.debug(f"{step.phase} {step.name}: {step.duration * 1000:.1f}ms", module="startup")
+
+
+# Creates Global StartupTimer As Singleton
+StartupTimer = _StartupTimer()
@@ -1,4 +1,5 @@
 from typing import NewType, TypeVar
+import ipaddress
 import re
 
 # Regex for a valid IP
@@ -33,5 +34,17 @@ def _formatIp(ip: str) -> IpType:
     return IpType(ip)
 
 
+def _formatIpRange(ip: str) -> IpType:
+    # Plain ips are handled as usual
+    if "/" not in ip:
+        return _formatIp(ip)
+
+    # Validate CIDR range (i.e. 10.0.0.0/8), and normalize it so the same range is always stored the same way
+    address, _, prefixLength = ip.partition("/")
+    if not validIp.match(address) or not prefixLength.isdigit() or int(prefixLength) > 32:
+        raise TypeError("Invalid Ip Range Format")
+    return IpType(str(ipaddress.ip_network(f"{address}/{int(prefixLength)}", strict=False)))
+
+
 def formatName(name: str):
     return re.sub(r'\W+', '', name.replace(" ", "_").lower())
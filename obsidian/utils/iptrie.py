@@ -0,0 +1,63 @@
+##################################################################
+#
+# A binary prefix trie for matching ips against CIDR ranges.
+#
+##################################################################
+
+from typing import Iterable, Optional
+import ipaddress
+
+
+class IpPrefixTrie:
+    def __init__(self, networks: Iterable[str] = ()):
+        # One trie per ip version. Each node is [<Child For Bit 0>, <Child For Bit 1>, <Is End Of Range>]
+        self._roots: dict[int, list] = {4: [None, None, False], 6: [None, None, False]}
+        self._size: int = 0
+        for network in networks:
+            self.add(network)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, network: str):
+        # Parse network (raises ValueError if invalid)
+        parsedNetwork = ipaddress.ip_network(network, strict=False)
+        bits = int(parsedNetwork.network_address)
+        maxLength = parsedNetwork.max_prefixlen
+
+        # Walk down trie, creating nodes along the prefix
+        node = self._roots[parsedNetwork.version]
+        for bitIndex in range(parsedNetwork.prefixlen):
+            bit = (bits >> (maxLength - 1 - bitIndex)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+
+        # Mark end of range
+        if not node[2]:
+            node[2] = True
+            self._size += 1
+
+    def contains(self, ip: str) -> bool:
+        # Parse ip. Invalid ips cannot be in any range
+        try:
+            parsedIp = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        bits = int(parsedIp)
+        maxLength = parsedIp.max_prefixlen
+
+        # Walk down trie. Ip is in a range as soon as any prefix along the way is marked
+        node: Optional[list] = self._roots[parsedIp.version]
+        bitIndex = 0
+        while node is not None:
+            if node[2]:
+                return True
+            if bitIndex >= maxLength:
+                return False
+            node = node[(bits >> (maxLength - 1 - bitIndex)) & 1]
+            bitIndex += 1
+        return False
+
+    def __contains__(self, ip: str) -> bool:
+        return self.contains(ip)
@@ -0,0 +1,114 @@
+##################################################################
+#
+# A prefix trie for string keys, with prefix listing and
+# edit distance (typo) suggestions.
+#
+##################################################################
+
+from typing import Any, Generic, Iterator, Optional, TypeVar
+
+V = TypeVar("V")
+
+# Marks nodes that do not hold a value
+_EMPTY = object()
+
+
+class PrefixTrie(Generic[V]):
+    def __init__(self):
+        # Each node is [<Children By Character>, <Value Or _EMPTY>]
+        self._root: list = [{}, _EMPTY]
+        self._size: int = 0
+
+    def __len__(self):
+        return self._size
+
+    def _findNode(self, key: str) -> Optional[list]:
+        node = self._root
+        for char in key:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def add(self, key: str, value: V):
+        # Walk down trie, creating nodes along the key
+        node = self._root
+        for char in key:
+            children = node[0]
+            if char not in children:
+                children[char] = [{}, _EMPTY]
+            node = children[char]
+
+        if node[1] is _EMPTY:
+            self._size += 1
+        node[1] = value
+
+    def remove(self, key: str):
+        # Remember the path, so nodes left empty can be pruned
+        path = []
+        node = self._root
+        for char in key:
+            path.append((node, char))
+            node = node[0].get(char)
+            if node is None:
+                raise KeyError(key)
+        if node[1] is _EMPTY:
+            raise KeyError(key)
+
+        node[1] = _EMPTY
+        self._size -= 1
+        for parent, char in reversed(path):
+            child = parent[0][char]
+            if child[0] or child[1] is not _EMPTY:
+                break
+            del parent[0][char]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        node = self._findNode(key)
+        if node is None or node[1] is _EMPTY:
+            return default
+        return node[1]
+
+    def __contains__(self, key: str) -> bool:
+        node = self._findNode(key)
+        return node is not None and node[1] is not _EMPTY
+
+    # Yields (key, value) of every key starting with prefix, in alphabetical order
+    def withPrefix(self, prefix: str) -> Iterator[tuple[str, V]]:
+        node = self._findNode(prefix)
+        if node is None:
+            return
+        stack = [(prefix, node)]
+        while stack:
+            key, node = stack.pop()
+            if node[1] is not _EMPTY:
+                yield key, node[1]
+            # Children are pushed in reverse, so they are popped in order
+            for char in sorted(node[0], reverse=True):
+                stack.append((key + char, node[0][char]))
+
+    # Returns (distance, key, value) of every key within maxDistance edits (Levenshtein distance) of key, closest first
+    # Walks the trie computing one row of the edit distance table per node, skipping branches that are already too far
+    def closest(self, key: str, maxDistance: int) -> list[tuple[int, str, V]]:
+        results = []
+        firstRow = list(range(len(key) + 1))
+
+        def search(node: list, prefix: str, previousRow: list[int]):
+            for char, child in node[0].items():
+                row = [previousRow[0] + 1]
+                for column in range(1, len(key) + 1):
+                    row.append(min(
+                        row[column - 1] + 1,  # Insertion
+                        previousRow[column] + 1,  # Deletion
+                        previousRow[column - 1] + (key[column - 1] != char)  # Substitution
+                    ))
+                if child[1] is not _EMPTY and row[-1] <= maxDistance:
+                    results.append((row[-1], prefix + char, child[1]))
+                # Keys further down only get further away once every entry of the row is too far
+                if min(row) <= maxDistance:
+                    search(child, prefix + char, row)
+
+        if self._root[1] is not _EMPTY and len(key) <= maxDistance:
+            results.append((len(key), "", self._root[1]))
+        search(self._root, "", firstRow)
+        return sorted(results, key=lambda result: (result[0], result[1]))
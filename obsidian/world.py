@@ -11,8 +11,11 @@ import struct
 import random
 import asyncio
 import datetime
+import time
 
 from obsidian.log import Logger
+from obsidian.metrics import MetricsManager
+from obsidian.startup import StartupTimer
 from obsidian.blocks import BlockManager, Blocks, AbstractBlock
 from obsidian.worldformat import WorldFormats, AbstractWorldFormat
 from obsidian.mapgen import (
@@ -38,6 +41,11 @@ if TYPE_CHECKING:
     from obsidian.server import Server
     from obsidian.player import Player
 
+# World Metrics
+worldSaveMetric = MetricsManager.histogram("obsidian_world_save_seconds", "Time taken to save a world to disk")
+bulkBlockUpdateMetric = MetricsManager.histogram("obsidian_bulk_block_update_seconds", "Time taken to apply and send a bulk block update")
+bulkBlocksUpdatedMetric = MetricsManager.counter("obsidian_bulk_blocks_updated_total", "Number of blocks changed through bulk block updates")
+
 
 class WorldManager:
     def __init__(self, server: Server, ignorelist: set[str] = set()):
@@ -98,6 +106,8 @@ class WorldManager:
         # Check If World Already Exists
         if worldName in self.worlds:
             raise WorldError(f"Trying To Generate World With Already Existing Name {worldName}!")
+        if self.server.cluster is not None and self.server.cluster.isRemoteWorld(worldName):
+            raise WorldError(f"Trying To Generate World With Name {worldName} Already Existing On Another Worker!")
 
         # Creating Save File If World Is Persistent
         Logger.debug("Creating Save File If World Is Persistent", module="world-create")
@@ -154,6 +164,10 @@ class WorldManager:
         # Saving World
         Logger.info(f"Saving World {worldName}", module="world-create")
         self.worlds[worldName].saveMap()
+
+        # Let other workers know about the new world
+        if self.server.cluster is not None:
+            self.server.cluster.announceWorlds()
         return self.worlds[worldName]
 
     def generateMap(
@@ -219,6 +233,9 @@ class WorldManager:
                     # Also Check If World Is Ignored
                     elif saveName in self.ignorelist:
                         Logger.info(f"Ignoring World File {saveFile}. World Name Is On Ignore List!", module="world-load")
+                    # In cluster mode, each world is loaded by only one worker
+                    elif self.server.cluster is not None and not self.server.cluster.ownsWorldFile(saveName):
+                        Logger.debug(f"Ignoring World File {saveFile}. World Is Owned By Another Worker!", module="world-load")
 
                     # Also Check If World Name Is Already Loaded (Same File Names with Different Extensions)
                     elif saveName in self.worlds:
@@ -254,13 +271,14 @@ class WorldManager:
                         try:
                             Logger.info(f"Loading World {saveName}", module="world-load")
                             fileIO = open(saveFile, "rb+")
-                            self.worlds[saveName] = self.worldFormat.loadWorld(fileIO, self, persistent=self.persistent)
+                            with StartupTimer.measure("World Load", saveName):
+                                self.worlds[saveName] = self.worldFormat.loadWorld(fileIO, self, persistent=self.persistent)
                         except Exception as e:
                             Logger.error(f"Error While Loading World {saveFile} - {type(e).__name__}: {e}", module="world-load")
                             Logger.askConfirmation()
 
-            # Check If Default World Is Loaded
-            if self.server.config.defaultWorld not in self.worlds:
+            # Check If Default World Is Loaded (In cluster mode, only by the worker that owns it)
+            if self.server.config.defaultWorld not in self.worlds and (self.server.cluster is None or self.server.cluster.ownsWorldFile(self.server.config.defaultWorld)):
                 # Check if other worlds were loaded as well
                 if len(self.worlds) > 0:
                     if self.server.config.newWorldWarning:
@@ -279,17 +297,18 @@ class WorldManager:
                 defaultWorldName = self.server.config.defaultWorld
                 defaultGenerator = MapGenerators[self.server.config.defaultGenerator]
                 Logger.debug(f"Creating World {defaultWorldName}", module="world-load")
-                self.createWorld(
-                    defaultWorldName,
-                    self.server.config.worldSizeX,
-                    self.server.config.worldSizeY,
-                    self.server.config.worldSizeZ,
-                    self.server.config.worldSeed,
-                    defaultGenerator,
-                    persistent=self.persistent
-                )
-
-        else:
+                with StartupTimer.measure("World Create", defaultWorldName):
+                    self.createWorld(
+                        defaultWorldName,
+                        self.server.config.worldSizeX,
+                        self.server.config.worldSizeY,
+                        self.server.config.worldSizeZ,
+                        self.server.config.worldSeed,
+                        defaultGenerator,
+                        persistent=self.persistent
+                    )
+
+        elif self.server.cluster is None or self.server.cluster.ownsWorldFile(self.server.config.defaultWorld):
             Logger.warn("World Manager does not have a world save location!", module="world-load")
             # Create Non-Persistent Temporary World
             defaultWorldName = self.server.config.defaultWorld
@@ -569,7 +588,7 @@ class World:
 
     def getBlock(self, blockX: int, blockY: int, blockZ: int) -> AbstractBlock:
         # Gets Block Obj Of Requested Block
-        Logger.verbose(f"Getting World Block {blockX}, {blockY}, {blockZ}", module="world")
+        Logger.verbose(lambda: f"Getting World Block {blockX}, {blockY}, {blockZ}", module="world")
 
         # Check If Block Is Out Of Range
         if blockX >= self.sizeX or blockY >= self.sizeY or blockZ >= self.sizeZ:
@@ -578,7 +597,7 @@ class World:
 
     async def setBlock(self, blockX: int, blockY: int, blockZ: int, block: AbstractBlock, player: Optional[Player] = None, sendPacket: bool = True, updateSelf: bool = False) -> bool:
         # Handles Block Updates In Server + Checks If Block Placement Is Allowed
-        Logger.debug(f"Setting World Block {blockX}, {blockY}, {blockZ} to {block.ID}", module="world")
+        Logger.debug(lambda: f"Setting World Block {blockX}, {blockY}, {blockZ} to {block.ID}", module="world")
 
         # Check If Block Is Out Of Range
         if blockX >= self.sizeX or blockY >= self.sizeY or blockZ >= self.sizeZ:
@@ -608,6 +627,7 @@ class World:
     async def bulkBlockUpdate(self, blockUpdates: dict[tuple[int, int, int], AbstractBlock], sendPacket: bool = True):
         # Handles Bulk Block Updates In Server + Checks If Block Placement Is Allowed
         Logger.debug(f"Handling Bulk Block Update for {len(blockUpdates)} blocks", module="world")
+        startTime = time.perf_counter()
 
         # Set last modified date
         self.lastModified = datetime.datetime.now()
@@ -628,11 +648,13 @@ class World:
                 Logger.debug("Number of block updates exceed the map reload threshold. Sending map refresh instead.", module="world")
                 for player in self.playerManager.getPlayers():
                     await player.reloadWorld()
+                self._recordBulkBlockUpdate(len(blockUpdates), startTime)
                 return
 
             # Loop through each block and handle update
             for (blockX, blockY, blockZ), block in blockUpdates.items():
-                Logger.verbose(f"Setting World Block {blockX}, {blockY}, {blockZ} to {block.ID}", module="world")
+                if Logger.VERBOSE:
+                    Logger.verbose(f"Setting World Block {blockX}, {blockY}, {blockZ} to {block.ID}", module="world")
 
                 # If asynchronousBlockUpdates is enabled, run a 0 second sleep so that other tasks can operate
                 if self.worldManager.server.config.asynchronousBlockUpdates:
@@ -647,6 +669,14 @@ class World:
                     block.ID
                 )
 
+        self._recordBulkBlockUpdate(len(blockUpdates), startTime)
+
+    @staticmethod
+    def _recordBulkBlockUpdate(numBlocks: int, startTime: float):
+        if MetricsManager.ENABLED:
+            bulkBlockUpdateMetric.observe(time.perf_counter() - startTime)
+            bulkBlocksUpdatedMetric.inc(numBlocks)
+
     def getHighestBlock(self, blockX: int, blockZ: int, start: Optional[int] = None) -> int:
         # Returns the highest block
         # Set and Verify Scan Start Value
@@ -676,6 +706,7 @@ class World:
         with self.worldManager.lock:
             if self.persistent and self.fileIO:
                 Logger.info(f"Attempting To Save World {self.name}", module="world-save")
+                startTime = time.perf_counter()
                 savePath = Path(self.fileIO.name)
                 backupPath = savePath.with_suffix(savePath.suffix + ".bak")
 
@@ -704,6 +735,8 @@ class World:
                     Logger.debug(f"Removing backup file for world {self.name}", module="world-save")
                     backupPath.unlink()
 
+                if MetricsManager.ENABLED:
+                    worldSaveMetric.observe(time.perf_counter() - startTime)
                 return True
 
             Logger.warn(f"World {self.name} Is Not Persistent! Not Saving.", module="world-save")